@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Measure the account balance updates of persisting blocks.
+
+For every block the accounts touched by its transactions are read from their serialized form, credited with the
+outputs and debited with the spent outputs of the transactions, checked for deletion and serialized again, as
+`LevelDBBlockchain.Persist` does. `fixed8` keeps the balances the way `AccountState` used to, as `Fixed8` values in
+a dict keyed by `UInt256` that is scanned for every update, `int` is the current `AccountState`.
+
+The transfers are random by default. With `--chain` they are read from a synchronized chain instead, e.g. from a
+busy mainnet block range.
+
+Usage (with neo-python installed, e.g. `pip install -e .`):
+    python benchmarks/bench_balances.py [--blocks 100] [--transactions 500] [--accounts 2000]
+    python benchmarks/bench_balances.py --chain ~/.neopython/Chains/SC234 --start 2500000 --blocks 100
+"""
+import argparse
+import random
+import time
+from neo.Core.Blockchain import Blockchain
+from neo.Core.State.AccountState import AccountState
+from neo.IO.MemoryStream import StreamManager
+from neocore.IO.BinaryReader import BinaryReader
+from neocore.IO.BinaryWriter import BinaryWriter
+from neocore.Fixed8 import Fixed8
+from neocore.UInt160 import UInt160
+
+
+class Fixed8Account:
+    """The balance handling of `AccountState` before balances were kept as integers."""
+
+    def __init__(self, script_hash):
+        self.ScriptHash = script_hash
+        self.Balances = {}
+
+    def AddToBalance(self, assetId, fixed8_val):
+        found = False
+        for key, balance in self.Balances.items():
+            if key == assetId:
+                self.Balances[assetId] = self.Balances[assetId] + fixed8_val
+                found = True
+        if not found:
+            self.Balances[assetId] = fixed8_val
+
+    def SubtractFromBalance(self, assetId, fixed8_val):
+        found = False
+        for key, balance in self.Balances.items():
+            if key == assetId:
+                self.Balances[assetId] = self.Balances[assetId] - fixed8_val
+                found = True
+        if not found:
+            self.Balances[assetId] = fixed8_val * Fixed8(-1)
+
+    def AllBalancesZeroOrLess(self):
+        for key, fixed8 in self.Balances.items():
+            if fixed8.value > 0:
+                return False
+        return True
+
+    @staticmethod
+    def DeserializeFromDB(buffer):
+        reader = BinaryReader(StreamManager.GetReader(buffer))
+        reader.ReadByte()
+        account = Fixed8Account(reader.ReadUInt160())
+        reader.ReadBool()
+        reader.ReadVarInt()
+        for i in range(0, reader.ReadVarInt()):
+            assetid = reader.ReadUInt256()
+            account.Balances[assetid] = reader.ReadFixed8()
+        return account
+
+    def ToBytes(self):
+        ms = StreamManager.GetStream()
+        writer = BinaryWriter(ms)
+        # the format of an unfrozen account without votes
+        writer.WriteByte(0)
+        writer.WriteUInt160(self.ScriptHash)
+        writer.WriteBool(False)
+        writer.WriteVarInt(0)
+        writer.WriteVarInt(len(self.Balances))
+        for key, fixed8 in self.Balances.items():
+            writer.WriteUInt256(key)
+            writer.WriteFixed8(fixed8)
+        data = ms.getvalue()
+        StreamManager.ReleaseStream(ms)
+        return data
+
+
+def account_bytes(account):
+    ms = StreamManager.GetStream()
+    account.Serialize(BinaryWriter(ms))
+    data = ms.getvalue()
+    StreamManager.ReleaseStream(ms)
+    return data
+
+
+def random_transfers(blocks, transactions, accounts):
+    assets = [Blockchain.SystemShare().Hash, Blockchain.SystemCoin().Hash]
+    hashes = [UInt160(data=bytearray(i.to_bytes(20, 'little'))) for i in range(accounts)]
+
+    transfers = []
+    for i in range(blocks):
+        block = []
+        for j in range(transactions):
+            asset = random.choice(assets)
+            value = Fixed8(random.randint(1, 100000000))
+            # two spent outputs and two new outputs, as a payment with change
+            for script_hash in random.sample(hashes, 2):
+                block.append((script_hash, asset, value, False))
+            for script_hash in random.sample(hashes, 2):
+                block.append((script_hash, asset, value, True))
+        transfers.append(block)
+    return transfers
+
+
+def chain_transfers(path, start, blocks):
+    from neo.Implementations.Blockchains.LevelDB.LevelDBBlockchain import LevelDBBlockchain
+
+    chain = LevelDBBlockchain(path)
+    Blockchain.RegisterBlockchain(chain)
+
+    transfers = []
+    for height in range(start, start + blocks):
+        block = []
+        for tx in chain.GetBlockByHeight(height).FullTransactions:
+            for input in tx.inputs:
+                output = chain.GetTransaction(input.PrevHash.ToBytes())[0].outputs[input.PrevIndex]
+                block.append((output.ScriptHash, output.AssetId, output.Value, False))
+            for output in tx.outputs:
+                block.append((output.ScriptHash, output.AssetId, output.Value, True))
+        transfers.append(block)
+
+    chain.Dispose()
+    return transfers
+
+
+def measure(transfers, create, deserialize, serialize):
+    # every account starts out holding a large amount of each asset
+    assets = [Blockchain.SystemShare().Hash, Blockchain.SystemCoin().Hash]
+    stored = {}
+    for block in transfers:
+        for script_hash, asset, value, credit in block:
+            if script_hash.ToBytes() not in stored:
+                account = create(script_hash)
+                for asset_id in assets:
+                    account.AddToBalance(asset_id, Fixed8(10 ** 16))
+                stored[script_hash.ToBytes()] = serialize(account)
+
+    start = time.perf_counter()
+    for block in transfers:
+        accounts = {}
+        for script_hash, asset, value, credit in block:
+            key = script_hash.ToBytes()
+            account = accounts.get(key)
+            if account is None:
+                account = accounts[key] = deserialize(stored[key])
+            if credit:
+                account.AddToBalance(asset, value)
+            else:
+                account.SubtractFromBalance(asset, value)
+
+        for key, account in accounts.items():
+            if not account.AllBalancesZeroOrLess():
+                stored[key] = serialize(account)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blocks", type=int, default=100, help="Number of blocks")
+    parser.add_argument("--transactions", type=int, default=500, help="Number of random transactions in a block")
+    parser.add_argument("--accounts", type=int, default=2000, help="Number of random accounts")
+    parser.add_argument("--chain", help="Read the transfers of the blocks from a synchronized chain at this path")
+    parser.add_argument("--start", type=int, default=0, help="Height of the first block read from the chain")
+    args = parser.parse_args()
+
+    if args.chain:
+        transfers = chain_transfers(args.chain, args.start, args.blocks)
+    else:
+        transfers = random_transfers(args.blocks, args.transactions, args.accounts)
+    print("%d blocks, %d balance updates" % (len(transfers), sum(len(block) for block in transfers)))
+
+    for name, create, deserialize, serialize in [
+        ("fixed8", Fixed8Account, Fixed8Account.DeserializeFromDB, Fixed8Account.ToBytes),
+        ("int", AccountState, AccountState.DeserializeFromDB, account_bytes),
+    ]:
+        elapsed = measure(transfers, create, deserialize, serialize)
+        print("%8s %10.2f ms" % (name, elapsed * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Measure the cost of the change tracking in `DBCollection` for a block touching a growing number of keys.
+
+Every round simulates one block: all keys are read or created through `GetAndChange`, every fourth key
+is removed and the collection is committed into a write batch. The per key cost should stay flat as the
+number of touched keys grows.
+
+Usage (with neo-python installed, e.g. `pip install -e .`):
+    python benchmarks/bench_dbcollection.py [--keys 1000 2000 4000 8000 16000] [--backend leveldb|memory]
+
+Use `--backend memory` to leave out the cost of LevelDB itself.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from neo.Core.State.StorageItem import StorageItem
+from neo.Implementations.Blockchains.LevelDB.DBCollection import DBCollection
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Storage.StorageBackend import StorageBackend
+
+
+def run_block(db, keys):
+    storages = DBCollection(db, DBPrefix.ST_Storage, StorageItem, raw=True)
+    start = time.perf_counter()
+
+    storages.MarkForReset()
+    for key in keys:
+        item = storages.GetAndChange(key, StorageItem(value=key))
+        item.Value = key + b'\x01'
+
+    for key in keys[::4]:
+        storages.Remove(key)
+
+    with db.write_batch() as wb:
+        storages.Commit(wb)
+
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--keys", type=int, nargs='+', default=[1000, 2000, 4000, 8000, 16000],
+                        help="Number of keys touched per block")
+    parser.add_argument("--backend", choices=[StorageBackend.LEVELDB, StorageBackend.MEMORY], default=StorageBackend.LEVELDB,
+                        help="Storage backend to write to")
+    args = parser.parse_args()
+
+    path = tempfile.mkdtemp()
+    try:
+        db = StorageBackend.Open(path, args.backend)
+        print("%8s %12s %14s" % ("keys", "block (ms)", "per key (us)"))
+        for n in args.keys:
+            keys = [b'%020d' % i for i in range(n)]
+            # once to create the records, once against existing records
+            run_block(db, keys)
+            elapsed = run_block(db, keys)
+            print("%8d %12.2f %14.2f" % (n, elapsed * 1000, elapsed * 1000000 / n))
+        db.close()
+    finally:
+        shutil.rmtree(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Measure how fast `NeoNode` splits a received stream of messages.
+
+A stream of `block` messages is fed to the node in chunks of `--chunk` bytes, as a peer pushing blocks during a
+sync would. `concat` is the framing `NeoNode` used to have, which concatenated every chunk to the receive buffer,
+parsed each header from a new stream and sliced the buffer again for every message. `node` is the current
+`NeoNode.dataReceived`. Only the framing is measured, the messages are not processed.
+
+The stream is made of synthetic blocks by default. `--record` reads a recorded stream instead, the bytes exactly
+as received from a peer, and `--save` writes the synthetic one so it can be replayed.
+
+Usage (with neo-python installed, e.g. `pip install -e .`):
+    python benchmarks/bench_framing.py [--blocks 500] [--transactions 50] [--chunk 65536] [--save FILE]
+    python benchmarks/bench_framing.py --record FILE
+"""
+import argparse
+import time
+from neo.Core.Blockchain import Blockchain
+from neo.Core.Block import Block
+from neo.Core.CoinReference import CoinReference
+from neo.Core.TX.Transaction import ContractTransaction, TransactionOutput
+from neo.Core.Witness import Witness
+from neo.IO.MemoryStream import StreamManager
+from neo.Network.Message import Message
+from neo.Network.NeoNode import NeoNode
+from neocore.IO.BinaryReader import BinaryReader
+from neocore.IO.BinaryWriter import BinaryWriter
+from neocore.Fixed8 import Fixed8
+from neocore.UInt160 import UInt160
+from neocore.UInt256 import UInt256
+
+
+def create_stream(blocks, count):
+    genesis = Blockchain.GenesisBlock()
+    asset = genesis.Transactions[-1].outputs[0].AssetId
+
+    data = bytearray()
+    prev_hash = genesis.Hash
+    for index in range(1, blocks + 1):
+        transactions = [genesis.Transactions[0]]
+        for i in range(count):
+            coin = UInt256(data=bytearray((index * count + i).to_bytes(32, 'little')))
+            tx = ContractTransaction(inputs=[CoinReference(coin, 0)],
+                                     outputs=[TransactionOutput(asset, Fixed8(i + 1), UInt160(data=bytearray(20)))])
+            tx.scripts = [Witness(bytearray(b'\x40' + b'\x01' * 64), bytearray(b'\x21' + b'\x02' * 33 + b'\xac'))]
+            transactions.append(tx)
+
+        block = Block(prev_hash, genesis.Timestamp + 15 * index, index, 0, genesis.NextConsensus, genesis.Script,
+                      transactions, build_root=True)
+        prev_hash = block.Hash
+
+        ms = StreamManager.GetStream()
+        Message('block', block).Serialize(BinaryWriter(ms))
+        data += ms.getvalue()
+        StreamManager.ReleaseStream(ms)
+    return bytes(data)
+
+
+class ConcatFraming:
+    """The framing of `NeoNode` before the receive buffer was extended in place."""
+
+    def __init__(self):
+        self.buffer_in = bytearray()
+        self.received = 0
+
+    def dataReceived(self, data):
+        self.buffer_in = self.buffer_in + data
+        while self.CheckDataReceived():
+            pass
+
+    def CheckDataReceived(self):
+        currentLength = len(self.buffer_in)
+        if currentLength < 24:
+            return False
+
+        ms = StreamManager.GetReader(self.buffer_in[:24])
+        reader = BinaryReader(ms)
+        m = Message()
+        m.Magic = reader.ReadUInt32()
+        m.Command = reader.ReadFixedString(12).decode('utf-8')
+        m.Length = reader.ReadUInt32()
+        m.Checksum = reader.ReadUInt32()
+        StreamManager.ReleaseStream(ms)
+
+        messageExpectedLength = 24 + m.Length
+        if currentLength < messageExpectedLength:
+            return False
+
+        mdata = self.buffer_in[:messageExpectedLength]
+        self.buffer_in = self.buffer_in[messageExpectedLength:]
+
+        stream = StreamManager.GetReader(mdata)
+        message = Message()
+        message.Deserialize(BinaryReader(stream))
+        StreamManager.ReleaseStream(stream)
+        self.received += 1
+        return True
+
+
+class CountingNode(NeoNode):
+
+    def __init__(self):
+        super(CountingNode, self).__init__()
+        self.received = 0
+
+    def MessageReceived(self, m):
+        self.received += 1
+
+
+def measure(node, data, chunk):
+    start = time.perf_counter()
+    for i in range(0, len(data), chunk):
+        node.dataReceived(data[i:i + chunk])
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blocks", type=int, default=500, help="Number of synthetic blocks")
+    parser.add_argument("--transactions", type=int, default=50, help="Number of transactions in a synthetic block")
+    parser.add_argument("--chunk", type=int, default=65536, help="Number of bytes received at once")
+    parser.add_argument("--record", help="Read a recorded stream from this file")
+    parser.add_argument("--save", help="Write the synthetic stream to this file")
+    args = parser.parse_args()
+
+    if args.record:
+        with open(args.record, 'rb') as f:
+            data = f.read()
+    else:
+        data = create_stream(args.blocks, args.transactions)
+        if args.save:
+            with open(args.save, 'wb') as f:
+                f.write(data)
+    print("%d bytes in chunks of %d bytes" % (len(data), args.chunk))
+
+    for name, node in [("concat", ConcatFraming()), ("node", CountingNode())]:
+        elapsed = measure(node, data, args.chunk)
+        print("%8s %10.2f ms %8d messages" % (name, elapsed * 1000, node.received))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Measure how long `LevelDBBlockchain` takes to open a chain with many headers, with and without the header
+index snapshot.
+
+A synthetic chain database is created holding only what startup reads: the stored header hash lists, the
+current header and the system records. It is opened once without a snapshot (rebuilding the header index from
+the stored hash lists and writing the snapshot on `Dispose`) and once more using the snapshot.
+
+Usage (with neo-python installed, e.g. `pip install -e .`):
+    python benchmarks/bench_startup.py [--headers 2000000]
+"""
+import argparse
+import binascii
+import hashlib
+import shutil
+import tempfile
+import time
+import plyvel
+from neo.Core.Blockchain import Blockchain
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Implementations.Blockchains.LevelDB.DBSchema import DBSchema
+from neo.Implementations.Blockchains.LevelDB.LevelDBBlockchain import LevelDBBlockchain
+
+
+def create_chain(path, count):
+    genesis = Blockchain.GenesisBlock()
+    hashes = [genesis.Hash.ToBytes()]
+    hashes += [binascii.hexlify(hashlib.sha256(i.to_bytes(4, 'little')).digest()) for i in range(1, count)]
+
+    db = plyvel.DB(path, create_if_missing=True)
+    with db.write_batch() as wb:
+        for start in range(0, count - count % 2000, 2000):
+            wb.put(DBPrefix.IX_HeaderHashList + start.to_bytes(4, 'little'),
+                   DBSchema.SerializeHeaderHashList(hashes[start:start + 2000], True))
+
+        # only the current header has to be stored for startup
+        header = genesis.Header
+        header.Index = count - 1
+        wb.put(DBPrefix.DATA_Block + hashes[-1], bytes(8) + DBSchema.Serialize(header, True))
+        wb.put(DBPrefix.SYS_CurrentHeader, hashes[-1] + (count - 1).to_bytes(4, 'little'))
+        wb.put(DBPrefix.SYS_CurrentBlock, hashes[0] + bytes(4))
+        wb.put(DBPrefix.SYS_OutputIndex, b'\x01')
+        wb.put(DBPrefix.SYS_Version, DBSchema.RAW)
+    db.close()
+
+
+def open_chain(path):
+    start = time.perf_counter()
+    chain = LevelDBBlockchain(path)
+    elapsed = time.perf_counter() - start
+    height = chain.HeaderHeight
+    chain.Dispose()
+    return elapsed, height
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--headers", type=int, default=2000000, help="Number of headers in the chain")
+    args = parser.parse_args()
+
+    path = tempfile.mkdtemp()
+    try:
+        create_chain(path, args.headers)
+
+        elapsed, height = open_chain(path)
+        print("without snapshot: %8.2f s (header height %s)" % (elapsed, height))
+
+        elapsed, height = open_chain(path)
+        print("with snapshot:    %8.2f s (header height %s)" % (elapsed, height))
+    finally:
+        shutil.rmtree(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Measure block decoding with the stream a deserialization site gets from `StreamManager`.
+
+A synthetic block of contract transactions is serialized once and decoded repeatedly. `pooled` fills a released
+stream from the pool with the block data, as `StreamManager.GetStream(data)` used to do, `reader` wraps the data
+with `StreamManager.GetReader` as the deserialization sites do now. Both are measured for `bytes` input, as read
+from the database, and for `bytearray` input, as sliced from the network buffer. The time to get the stream is
+reported separately, as the decode itself is dominated by the deserialization code.
+
+Usage (with neo-python installed, e.g. `pip install -e .`):
+    python benchmarks/bench_stream.py [--transactions 1000] [--rounds 20]
+"""
+import argparse
+import gc
+import time
+from neo.Core.Blockchain import Blockchain
+from neo.Core.Block import Block
+from neo.Core.CoinReference import CoinReference
+from neo.Core.TX.Transaction import ContractTransaction, TransactionOutput
+from neo.Core.Witness import Witness
+from neo.IO.MemoryStream import StreamManager, MemoryStream
+from neocore.IO.BinaryReader import BinaryReader
+from neocore.IO.BinaryWriter import BinaryWriter
+from neocore.Fixed8 import Fixed8
+from neocore.UInt160 import UInt160
+from neocore.UInt256 import UInt256
+
+
+def create_block(count):
+    genesis = Blockchain.GenesisBlock()
+    asset = genesis.Transactions[-1].outputs[0].AssetId
+
+    transactions = [genesis.Transactions[0]]
+    for i in range(count):
+        prev_hash = UInt256(data=bytearray(i.to_bytes(32, 'little')))
+        tx = ContractTransaction(inputs=[CoinReference(prev_hash, 0), CoinReference(prev_hash, 1)],
+                                 outputs=[TransactionOutput(asset, Fixed8(i + 1), UInt160(data=bytearray(20)))] * 2)
+        tx.scripts = [Witness(bytearray(b'\x40' + b'\x01' * 64), bytearray(b'\x21' + b'\x02' * 33 + b'\xac'))]
+        transactions.append(tx)
+
+    block = Block(genesis.Hash, genesis.Timestamp + 15, 1, 0, genesis.NextConsensus, genesis.Script, transactions,
+                  build_root=True)
+
+    ms = StreamManager.GetStream()
+    block.Serialize(BinaryWriter(ms))
+    data = ms.getvalue()
+    StreamManager.ReleaseStream(ms)
+    return data
+
+
+def pooled_stream(data, pool=[MemoryStream()]):
+    # a single pooled stream, refilled the way released streams used to be
+    mstream = pool[0]
+    mstream.Cleanup()
+    mstream.write(data)
+    mstream.seek(0)
+    return mstream
+
+
+def measure(data, get_stream, rounds):
+    best_get = best_decode = None
+    for i in range(rounds):
+        start = time.perf_counter()
+        stream = get_stream(data)
+        got = time.perf_counter()
+        block = Block()
+        block.Deserialize(BinaryReader(stream))
+        done = time.perf_counter()
+
+        best_get = got - start if best_get is None else min(best_get, got - start)
+        best_decode = done - start if best_decode is None else min(best_decode, done - start)
+    return best_get, best_decode
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--transactions", type=int, default=1000, help="Number of transactions in the block")
+    parser.add_argument("--rounds", type=int, default=20, help="Number of decodes, the fastest one is reported")
+    args = parser.parse_args()
+
+    data = create_block(args.transactions)
+    print("block of %d transactions, %d bytes" % (args.transactions + 1, len(data)))
+
+    # collections in the middle of a decode would dominate the differences
+    gc.disable()
+    print("%10s %10s %14s %14s" % ("input", "stream", "get (us)", "decode (ms)"))
+    for name, value in [("bytes", data), ("bytearray", bytearray(data))]:
+        for stream_name, get_stream in [("pooled", pooled_stream), ("reader", StreamManager.GetReader)]:
+            elapsed_get, elapsed = measure(value, get_stream, args.rounds)
+            print("%10s %10s %14.2f %14.2f" % (name, stream_name, elapsed_get * 1000000, elapsed * 1000))
+    gc.enable()
+
+
+if __name__ == "__main__":
+    main()
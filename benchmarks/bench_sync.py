@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Simulate a block sync from peers of different speeds and measure how long it takes.
+
+The nodes are connected through `TestTransportEndpoint`s to simulated peers that answer every `getdata` with the
+requested blocks, after their latency and at their speed, on a simulated clock. The chain knows the headers of all
+blocks up front and persists every block as soon as it follows the chain height. The block loops of the nodes run
+every `sync_mode` seconds of simulated time and `NodeLeader.BlockheightCheck` every 240 s, as they would on the
+reactor.
+
+`legacy` is the block requesting `NeoNode` used to have, where every node scanned for blocks not requested by
+another node and asked for `BREQPART` of them on its own. `scheduler` is the current `NeoNode`, where the
+`BlockScheduler` of the leader hands out the blocks by the measured speed of the peers.
+
+A peer is given as `LATENCY/BLOCK_TIME` in seconds, or `stall` for a peer that never sends a block.
+
+Usage (with neo-python installed, e.g. `pip install -e .`):
+    python benchmarks/bench_sync.py [--blocks 5000] [--peers 0.05/0.002 0.1/0.01 0.3/0.1 stall] [--limit 3600]
+"""
+import argparse
+import time
+from twisted.internet import defer, task
+from twisted.internet.address import IPv4Address
+from twisted.internet.endpoints import connectProtocol
+from twisted.test import proto_helpers
+from neo.Core.Blockchain import Blockchain
+from neo.Core.Block import Block
+from neo.IO.Helper import Helper as IOHelper
+from neo.Network.Message import Message
+from neo.Network.NeoNode import NeoNode
+from neo.Network.NodeLeader import NodeLeader
+from neo.Network.Payloads.InvPayload import InvPayload
+from neo.Network.Payloads.VersionPayload import VersionPayload
+from neo.Network.InventoryType import InventoryType
+from neo.Network.Utils import TestTransportEndpoint
+from neo.Settings import settings
+
+
+def create_blocks(count):
+    genesis = Blockchain.GenesisBlock()
+
+    hashes = [genesis.Hash.ToBytes()]
+    messages = {}
+    prev_hash = genesis.Hash
+    for index in range(1, count + 1):
+        block = Block(prev_hash, genesis.Timestamp + 15 * index, index, 0, genesis.NextConsensus, genesis.Script,
+                      [genesis.Transactions[0]], build_root=True)
+        prev_hash = block.Hash
+        hashes.append(block.Hash.ToBytes())
+        messages[block.Hash.ToBytes()] = Message('block', block).ToRawBytes()
+    return hashes, messages
+
+
+class SimulatedChain(Blockchain):
+    """A chain that knows all headers and keeps its blocks in memory."""
+
+    def __init__(self, hashes):
+        self._hashes = hashes
+        self._height = 0
+        self._cache = {}
+        self._blockrequests = set()
+
+    @property
+    def Height(self):
+        return self._height
+
+    @property
+    def HeaderHeight(self):
+        return len(self._hashes) - 1
+
+    def GetHeaderHash(self, height):
+        if height < len(self._hashes):
+            return self._hashes[height]
+        return None
+
+    def ContainsBlock(self, index):
+        return index <= self._height
+
+    def ContainsCachedBlock(self, hash):
+        return hash in self._cache
+
+    def AddBlock(self, block):
+        self._cache[block.Hash.ToBytes()] = block
+        self.PersistBlocks()
+        return True
+
+    def PersistBlocks(self):
+        next_hash = self.GetHeaderHash(self._height + 1)
+        if next_hash not in self._cache:
+            self.BlockSearchTries += 1
+        while next_hash in self._cache:
+            self.BlockSearchTries = 0
+            del self._cache[next_hash]
+            self._height += 1
+            next_hash = self.GetHeaderHash(self._height + 1)
+
+
+class SimulatedPeer(proto_helpers.StringTransport):
+    """The transport of a node, answering its block requests as a remote peer would."""
+
+    def __init__(self, clock, messages, address, latency, block_time):
+        super(SimulatedPeer, self).__init__(peerAddress=address)
+        self.clock = clock
+        self.messages = messages
+        self.latency = latency
+        self.block_time = block_time
+        self.busy_until = 0
+        self.sent = 0
+
+    def write(self, data):
+        command = Message.HeaderFormat.unpack_from(data)[1].rstrip(b'\x00')
+        if command != b'getdata' or self.block_time is None or self.disconnecting:
+            return
+
+        inventory = IOHelper.AsSerializableWithType(data[Message.HeaderSize:], 'neo.Network.Payloads.InvPayload.InvPayload')
+        # the peer sends the blocks one after the other, after the blocks it is still sending
+        when = max(self.clock.seconds() + self.latency, self.busy_until)
+        for hash in inventory.Hashes:
+            when += self.block_time
+            self.clock.callLater(when - self.clock.seconds(), self.send, self.messages[hash.encode('utf-8')])
+        self.busy_until = when
+
+    def send(self, data):
+        if not self.disconnecting:
+            self.sent += 1
+            self.protocol.dataReceived(data)
+
+
+class SimulatedNode(NeoNode):
+
+    def Disconnect(self, reason=None, isDead=True):
+        # the connection is dropped right away instead of through the reactor
+        self.disconnecting = True
+        self.transport.loseConnection()
+        self.stop_block_loop()
+        self.ReleaseBlockRequests()
+        self.leader.RemoveConnectedPeer(self)
+        return defer.succeed(None)
+
+
+class LegacyNode(SimulatedNode):
+
+    def DoAskForMoreBlocks(self):
+        # the block requesting of `NeoNode` before the `BlockScheduler`
+        hashes = []
+        hashstart = Blockchain.Default().Height + 1
+        current_header_height = Blockchain.Default().HeaderHeight + 1
+
+        do_go_ahead = False
+        if Blockchain.Default().BlockSearchTries > 100 and len(Blockchain.Default().BlockRequests) > 0:
+            do_go_ahead = True
+
+        if settings.BLOCK_CACHE_WINDOW:
+            current_header_height = min(current_header_height, hashstart - 1 + settings.BLOCK_CACHE_WINDOW)
+
+        while hashstart <= current_header_height and len(hashes) < self.leader.BREQPART:
+            hash = Blockchain.Default().GetHeaderHash(hashstart)
+            if hash is not None and Blockchain.Default().ContainsCachedBlock(hash):
+                hashstart += 1
+                continue
+
+            requested = hash in Blockchain.Default().BlockRequests or hash in self.myblockrequests
+            if hash is not None and (do_go_ahead or not requested):
+                Blockchain.Default().BlockRequests.add(hash)
+                self.myblockrequests.add(hash)
+                hashes.append(hash)
+            hashstart += 1
+
+        if len(hashes) > 0:
+            self.SendSerializedMessage(Message("getdata", InvPayload(InventoryType.Block, hashes)))
+
+
+def run(node_class, hashes, messages, peers, limit):
+    clock = task.Clock()
+    chain = SimulatedChain(hashes)
+    Blockchain.DeregisterBlockchain()
+    Blockchain.RegisterBlockchain(chain)
+    NodeLeader.Reset()
+    # the blocks are decoded right away, as no reactor runs to hand back the results of worker threads
+    settings.DECODE_WORKERS = 0
+    leader = NodeLeader.Instance(reactor=clock)
+
+    transports = []
+    for i, (latency, block_time) in enumerate(peers):
+        address = IPv4Address('TCP', '127.0.0.1', 20000 + i)
+        transport = SimulatedPeer(clock, messages, address, latency, block_time)
+        leader.peers_connecting += 1
+        d = connectProtocol(TestTransportEndpoint(clock, f"127.0.0.1:{20000 + i}", transport), node_class())
+        d.addCallback(handshake)
+        transports.append(transport)
+
+    def persist_loop():
+        chain.PersistBlocks()
+        clock.callLater(0.1, persist_loop)
+
+    def block_loop(node):
+        if node.disconnecting:
+            return
+        if node.block_loop and node.block_loop.running:
+            node.AskForMoreBlocks()
+        clock.callLater(node.sync_mode, block_loop, node)
+
+    persist_loop()
+    for transport in transports:
+        clock.callLater(transport.protocol.sync_mode, block_loop, transport.protocol)
+    leader.start_blockheight_loop()
+
+    start = time.perf_counter()
+    while chain.Height < chain.HeaderHeight and clock.seconds() < limit:
+        clock.advance(max(clock.getDelayedCalls()[0].getTime() - clock.seconds(), 0))
+    elapsed = time.perf_counter() - start
+
+    leader.stop_blockheight_loop()
+    return chain.Height, clock.seconds(), elapsed, transports
+
+
+def handshake(node):
+    version = Message('version', VersionPayload(settings.NODE_PORT, node.remote_nodeid + 1, 'simulated'))
+    node.dataReceived(version.ToRawBytes() + Message('verack').ToRawBytes())
+
+
+def parse_peer(value):
+    if value == 'stall':
+        return 0, None
+    latency, block_time = value.split('/')
+    return float(latency), float(block_time)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blocks", type=int, default=5000, help="Number of blocks to sync")
+    parser.add_argument("--peers", nargs='+', default=['0.05/0.002', '0.1/0.01', '0.3/0.1', 'stall'],
+                        help="The peers, as LATENCY/BLOCK_TIME in seconds or `stall`")
+    parser.add_argument("--limit", type=float, default=3600, help="Simulated seconds after which the sync is stopped")
+    args = parser.parse_args()
+
+    peers = [parse_peer(value) for value in args.peers]
+    hashes, messages = create_blocks(args.blocks)
+    print("%d blocks from %d peers" % (args.blocks, len(peers)))
+
+    print("%10s %8s %12s %12s   %s" % ("", "height", "sync (s)", "wall (s)", "blocks sent by each peer"))
+    for name, node_class in [("legacy", LegacyNode), ("scheduler", SimulatedNode)]:
+        height, simulated, elapsed, transports = run(node_class, hashes, messages, peers, args.limit)
+        sent = " ".join("%6d" % transport.sent for transport in transports)
+        print("%10s %8d %12.1f %12.1f   %s" % (name, height, simulated, elapsed, sent))
+
+
+if __name__ == "__main__":
+    main()
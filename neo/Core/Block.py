@@ -28,6 +28,9 @@ class Block(BlockBase, InventoryMixin):
 
     _header = None
 
+    # length of the signed header at the start of the wire data
+    _header_length = 0
+
     __is_trimmed = False
     #  < summary >
     #  资产清单的类型
@@ -110,6 +113,8 @@ class Block(BlockBase, InventoryMixin):
         if not self._header:
             self._header = Header(self.PrevHash, self.MerkleRoot, self.Timestamp,
                                   self.Index, self.ConsensusData, self.NextConsensus, self.Script)
+            if self._wire_data is not None:
+                self._header.SetWireData(self._wire_data[:self._header_length] + b'\x00', self._unsigned_length)
 
         return self._header
 
@@ -133,10 +138,10 @@ class Block(BlockBase, InventoryMixin):
         Returns:
             Fixed8:
         """
-        amount = Fixed8.Zero()
+        amount = 0
         for tx in self.Transactions:
-            amount += tx.SystemFee()
-        return amount
+            amount += tx.SystemFee().value
+        return Fixed8(amount)
 
     def LoadTransactions(self):
         """
@@ -154,7 +159,9 @@ class Block(BlockBase, InventoryMixin):
         Args:
             reader (neo.IO.BinaryReader):
         """
+        start = reader.stream.tell()
         super(Block, self).Deserialize(reader)
+        header_end = reader.stream.tell()
 
         self.Transactions = []
         transaction_length = reader.ReadVarInt()
@@ -166,6 +173,8 @@ class Block(BlockBase, InventoryMixin):
         if len(self.Transactions) < 1:
             raise Exception('Invalid format %s ' % self.Index)
 
+        self._RetainBlockData(reader.stream, start, header_end)
+
     def Deserialize(self, reader):
         """
         Deserialize full object.
@@ -173,7 +182,9 @@ class Block(BlockBase, InventoryMixin):
         Args:
             reader (neo.IO.BinaryReader):
         """
+        start = reader.stream.tell()
         super(Block, self).Deserialize(reader)
+        header_end = reader.stream.tell()
 
         self.Transactions = []
         byt = reader.ReadVarInt()
@@ -189,6 +200,13 @@ class Block(BlockBase, InventoryMixin):
         if MerkleTree.ComputeRoot([tx.Hash for tx in self.Transactions]) != self.MerkleRoot:
             raise Exception("Merkle Root Mismatch")
 
+        self._RetainBlockData(reader.stream, start, header_end)
+
+    def _RetainBlockData(self, stream, start, header_end):
+        # the unsigned length was kept when the header was deserialized, the data now spans the transactions too
+        self._RetainWireData(stream, start, start + self._unsigned_length)
+        self._header_length = header_end - start
+
     def Equals(self, other):
         """
         Test for equality.
@@ -218,7 +236,7 @@ class Block(BlockBase, InventoryMixin):
         """
         block = Block()
         block.__is_trimmed = True
-        ms = StreamManager.GetStream(byts)
+        ms = StreamManager.GetReader(byts)
         reader = BinaryReader(ms)
 
         block.DeserializeUnsigned(reader)
@@ -258,6 +276,7 @@ class Block(BlockBase, InventoryMixin):
         logger.debug("Rebuilding merkle root!")
         if self.Transactions is not None and len(self.Transactions) > 0:
             self.MerkleRoot = MerkleTree.ComputeRoot([tx.Hash for tx in self.Transactions])
+            self.ResetWireData()
 
     def Serialize(self, writer):
         """
@@ -266,6 +285,10 @@ class Block(BlockBase, InventoryMixin):
         Args:
             writer (neo.IO.BinaryWriter):
         """
+        if self._wire_data is not None:
+            writer.WriteBytes(self._wire_data, unhex=False)
+            return
+
         super(Block, self).Serialize(writer)
         writer.WriteSerializableArray(self.Transactions)
 
@@ -285,24 +308,49 @@ class Block(BlockBase, InventoryMixin):
         # json['sys_fee'] = GetBlockchain().GetSysFeeAmount(self.Hash)
         return json
 
-    def Trim(self):
+    def Trim(self, raw=False):
         """
         Returns a byte array that contains only the block header and transaction hash.
 
+        Args:
+            raw (bool): return the serialized bytes instead of their hex representation.
+
         Returns:
             bytes:
         """
         ms = StreamManager.GetStream()
         writer = BinaryWriter(ms)
-        self.SerializeUnsigned(writer)
-        writer.WriteByte(1)
-        self.Script.Serialize(writer)
+        if self._wire_data is not None:
+            writer.WriteBytes(self._wire_data[:self._header_length], unhex=False)
+        else:
+            self.SerializeUnsigned(writer)
+            writer.WriteByte(1)
+            self.Script.Serialize(writer)
 
         writer.WriteHashes([tx.Hash.ToBytes() for tx in self.Transactions])
-        retVal = ms.ToArray()
+        if raw:
+            retVal = ms.getvalue()
+        else:
+            retVal = ms.ToArray()
         StreamManager.ReleaseStream(ms)
         return retVal
 
+    def VerifyFormat(self):
+        """
+        Verify the parts of the block that do not depend on the chain, e.g. on a worker thread.
+        The merkle root is already verified when the block is deserialized.
+
+        Returns:
+            bool: True if valid. False otherwise.
+        """
+        # first TX has to be a miner transaction. other tx after that cant be miner tx
+        if len(self.Transactions) < 1 or self.Transactions[0].Type != TransactionType.MinerTransaction:
+            return False
+        for tx in self.Transactions[1:]:
+            if tx.Type == TransactionType.MinerTransaction:
+                return False
+        return True
+
     def Verify(self, completely=False):
         """
         Verify the integrity of the block.
@@ -319,12 +367,8 @@ class Block(BlockBase, InventoryMixin):
 
         from neo.Blockchain import GetBlockchain, GetConsensusAddress
 
-        # first TX has to be a miner transaction. other tx after that cant be miner tx
-        if self.Transactions[0].Type != TransactionType.MinerTransaction:
+        if not self.VerifyFormat():
             return False
-        for tx in self.Transactions[1:]:
-            if tx.Type == TransactionType.MinerTransaction:
-                return False
 
         if completely:
             bc = GetBlockchain()
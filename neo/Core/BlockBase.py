@@ -1,7 +1,6 @@
-from .Mixins import VerifiableMixin
+from .Mixins import VerifiableMixin, WireDataMixin
 from neocore.Cryptography.Helper import bin_dbl_sha256
 from neocore.Cryptography.Crypto import Crypto
-import binascii
 from neo.Core.Helper import Helper
 from neo.Blockchain import GetBlockchain, GetGenesis
 from neo.Core.Witness import Witness
@@ -9,7 +8,7 @@ from neocore.UInt256 import UInt256
 from neo.Core.Size import Size as s
 
 
-class BlockBase(VerifiableMixin):
+class BlockBase(WireDataMixin, VerifiableMixin):
     #  <summary>
     #  区块版本
     #  </summary>
@@ -54,9 +53,7 @@ class BlockBase(VerifiableMixin):
             UInt256: containing the hash of the data.
         """
         if not self.__hash:
-            hashdata = self.RawData()
-            ba = bytearray(binascii.unhexlify(hashdata))
-            hash = bin_dbl_sha256(ba)
+            hash = bin_dbl_sha256(self.GetUnsignedData())
             self.__hash = UInt256(data=hash)
 
         return self.__hash
@@ -118,7 +115,9 @@ class BlockBase(VerifiableMixin):
             reader (neo.IO.BinaryReader):
         """
         self.__hash = None
+        start = reader.stream.tell()
         self.DeserializeUnsigned(reader)
+        unsigned_end = reader.stream.tell()
         byt = reader.ReadByte()
         if int(byt) != 1:
             raise Exception('Incorrect format')
@@ -126,6 +125,7 @@ class BlockBase(VerifiableMixin):
         witness = Witness()
         witness.Deserialize(reader)
         self.Script = witness
+        self._RetainWireData(reader.stream, start, unsigned_end)
 
     def DeserializeUnsigned(self, reader):
         """
@@ -149,6 +149,10 @@ class BlockBase(VerifiableMixin):
         Args:
             writer (neo.IO.BinaryWriter):
         """
+        if self._wire_data is not None:
+            writer.WriteBytes(self._wire_data[:self._unsigned_length], unhex=False)
+            return
+
         writer.WriteUInt32(self.Version)
         writer.WriteUInt256(self.PrevHash)
         writer.WriteUInt256(self.MerkleRoot)
@@ -12,6 +12,7 @@ from neo.Core.TX.IssueTransaction import IssueTransaction
 from neo.Core.Witness import Witness
 from neo.VM.OpCode import PUSHF, PUSHT
 from neo.Core.State.SpentCoinState import SpentCoin
+from neo.Core.GasBonus import GasBonus
 from neo.SmartContract.Contract import Contract
 from neo.Settings import settings
 from collections import Counter
@@ -19,6 +20,18 @@ from neocore.Fixed8 import Fixed8
 from neocore.Cryptography.ECCurve import ECDSA
 from neocore.UInt256 import UInt256
 from functools import lru_cache
+from contextlib import contextmanager
+import threading
+
+
+class PrunedDataError(Exception):
+    """
+    Raised when a block or transaction is requested whose data was dropped by a pruned node.
+    """
+
+    def __init__(self, message, height):
+        super(PrunedDataError, self).__init__(message)
+        self.Height = height
 
 
 class Blockchain:
@@ -36,6 +49,9 @@ class Blockchain:
 
     _instance = None
 
+    # read views pinned by `ReadView`, per thread
+    _pinned = threading.local()
+
     _blockrequests = set()
 
     _paused = False
@@ -133,8 +149,13 @@ class Blockchain:
         Get the default registered blockchain instance.
 
         Returns:
-            obj: Currently set to `neo.Implementations.Blockchains.LevelDB.LevelDBBlockchain`.
+            obj: Currently set to `neo.Implementations.Blockchains.LevelDB.LevelDBBlockchain`, or the read view
+                 pinned on the calling thread by `ReadView`.
         """
+        view = getattr(Blockchain._pinned, 'view', None)
+        if view is not None:
+            return view
+
         if Blockchain._instance is None:
             Blockchain._instance = Blockchain()
             Blockchain.GenesisBlock().RebuildMerkleRoot()
@@ -211,71 +232,39 @@ class Blockchain:
     def CalculateBonus(inputs, height_end):
         unclaimed = []
 
-        for hash, group in groupby(inputs, lambda x: x.PrevHash):
-            tx, height_start = Blockchain.Default().GetTransaction(hash)
+        for coinref in inputs:
+            output, height_start = Blockchain.Default().GetOutput(coinref.PrevHash, coinref.PrevIndex)
 
-            if tx is None:
+            if height_start < 0:
                 raise Exception("Could Not calculate bonus")
 
             if height_start == height_end:
                 continue
 
-            for coinref in group:
-                if coinref.PrevIndex >= len(tx.outputs) or tx.outputs[coinref.PrevIndex].AssetId != Blockchain.SystemShare().Hash:
-                    raise Exception("Invalid coin reference")
-                spent_coin = SpentCoin(output=tx.outputs[coinref.PrevIndex], start_height=height_start,
-                                       end_height=height_end)
-                unclaimed.append(spent_coin)
+            if output is None or output.AssetId != Blockchain.SystemShare().Hash:
+                raise Exception("Invalid coin reference")
+            spent_coin = SpentCoin(output=output, start_height=height_start, end_height=height_end)
+            unclaimed.append(spent_coin)
 
         return Blockchain.CalculateBonusInternal(unclaimed)
 
     @staticmethod
     def CalculateBonusInternal(unclaimed):
-        amount_claimed = Fixed8.Zero()
-
-        decInterval = Blockchain.DECREMENT_INTERVAL
-        genAmount = Blockchain.GENERATION_AMOUNT
-        genLen = len(genAmount)
-
-        for coinheight, group in groupby(unclaimed, lambda x: x.Heights):
-            amount = 0
-            ustart = int(coinheight.start / decInterval)
-
-            if ustart < genLen:
-
-                istart = coinheight.start % decInterval
-                uend = int(coinheight.end / decInterval)
-                iend = coinheight.end % decInterval
-
-                if uend >= genLen:
-                    iend = 0
-
-                if iend == 0:
-                    uend -= 1
-                    iend = decInterval
-
-                while ustart < uend:
-                    amount += (decInterval - istart) * genAmount[ustart]
-                    ustart += 1
-                    istart = 0
-
-                amount += (iend - istart) * genAmount[ustart]
-
-            endamount = Blockchain.Default().GetSysFeeAmountByHeight(coinheight.end - 1)
-            startamount = 0 if coinheight.start == 0 else Blockchain.Default().GetSysFeeAmountByHeight(
-                coinheight.start - 1)
-            amount += endamount - startamount
-
-            outputSum = 0
+        """
+        Calculate the GAS bonus of spent NEO coins.
 
-            for spentcoin in group:
-                outputSum += spentcoin.Value.value
+        Args:
+            unclaimed (list): of neo.Core.State.SpentCoinState.SpentCoin items.
 
-            outputSum = outputSum / 100000000
-            outputSumFixed8 = Fixed8(int(outputSum * amount))
-            amount_claimed += outputSumFixed8
+        Returns:
+            Fixed8:
+        """
+        engine = GasBonus(Blockchain.Default().GetSysFeeAmountByHeight, Blockchain.DECREMENT_INTERVAL, Blockchain.GENERATION_AMOUNT)
 
-        return amount_claimed
+        per_coin, total = engine.Calculate([coin.StartHeight for coin in unclaimed],
+                                           [coin.EndHeight for coin in unclaimed],
+                                           [coin.Value.value for coin in unclaimed])
+        return total
 
     def OnNotify(self, notification):
         self.Notify.on_change(notification)
@@ -427,6 +416,26 @@ class Blockchain:
     def GetTransaction(self, hash):
         return None, 0
 
+    def GetOutput(self, hash, index):
+        """
+        Get a single output of a stored transaction.
+
+        Args:
+            hash (UInt256 or bytes): transaction hash.
+            index (int): position of the output in the transaction.
+
+        Returns:
+            tuple: (TransactionOutput, int) the output and the height of the block holding the transaction.
+                The output is None if the transaction has no such output, the height is -1 if the transaction
+                is not found.
+        """
+        tx, height = self.GetTransaction(hash)
+        if tx is None:
+            return None, -1
+        if index >= len(tx.outputs):
+            return None, height
+        return tx.outputs[index], height
+
     def GetUnclaimed(self, hash):
         # abstract
         pass
@@ -439,6 +448,25 @@ class Blockchain:
         # abstract
         pass
 
+    def GetAddressUnspents(self, script_hash, start=None, count=None):
+        """
+        Iterate over the unspent outputs of an address, a page at a time.
+
+        Args:
+            script_hash (UInt160): address to list the outputs of.
+            start (CoinReference): (Optional) continue after this output, usually the last one of the previous page.
+            count (int): (Optional) maximum number of outputs to return.
+
+        Raises:
+            Exception: if the implementation does not keep an index of the unspent outputs of every address.
+
+        Returns:
+            generator: of (CoinReference, TransactionOutput, int) tuples, the last item being the height of the block
+                holding the output.
+        """
+        # abstract
+        raise Exception("Listing unspent outputs by address is not supported")
+
     def GetVotes(self, transactions):
         # abstract
         pass
@@ -453,6 +481,71 @@ class Blockchain:
     def BlockCacheCount(self):
         pass
 
+    def ContainsCachedBlock(self, hash):
+        """
+        Determine if a block received ahead of the chain height is waiting to be persisted.
+
+        Args:
+            hash (bytes): hash of the block.
+
+        Returns:
+            bool:
+        """
+        return False
+
+    @property
+    def DB(self):
+        # abstract
+        return None
+
+    @property
+    def StateCache(self):
+        # abstract
+        return None
+
+    @property
+    def BlockCache(self):
+        # abstract
+        return None
+
+    @property
+    def PrunedHeight(self):
+        """
+        Get the height of the last block whose transactions may have been pruned.
+
+        Returns:
+            int: -1 if the chain is not pruned.
+        """
+        return -1
+
+    def GetReadView(self):
+        """
+        Get a read only view of the chain as of the last committed block.
+
+        Returns:
+            Blockchain: the chain itself, unless the implementation supports snapshot isolated reads.
+        """
+        return self
+
+    @staticmethod
+    @contextmanager
+    def ReadView():
+        """
+        Serve every `Blockchain.Default()` call made by the current thread from one read view, so a request
+        sees a single consistent block height while blocks keep being persisted.
+
+        Example:
+            with Blockchain.ReadView() as chain:
+                height = chain.Height
+        """
+        previous = getattr(Blockchain._pinned, 'view', None)
+        view = Blockchain.Default().GetReadView()
+        Blockchain._pinned.view = view
+        try:
+            yield view
+        finally:
+            Blockchain._pinned.view = previous
+
     def Pause(self):
         self._paused = True
 
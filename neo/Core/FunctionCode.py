@@ -2,6 +2,8 @@ from neocore.IO.Mixins import SerializableMixin
 from neocore.Cryptography.Crypto import Crypto
 from neocore.BigInteger import BigInteger
 from neo.SmartContract.ContractParameterType import ContractParameterType, ToName
+from neo.Core.Size import Size as s
+from neo.Core.Size import GetVarSize
 
 
 class FunctionCode(SerializableMixin):
@@ -75,6 +77,15 @@ class FunctionCode(SerializableMixin):
 
         return self._scriptHash
 
+    def Size(self):
+        """
+        Get the total size in bytes of the object.
+
+        Returns:
+            int: size.
+        """
+        return GetVarSize(self.Script) + GetVarSize(self.ParameterList) + s.uint8
+
     def Deserialize(self, reader):
         """
         Deserialize full object.
@@ -0,0 +1,128 @@
+from neocore.Fixed8 import Fixed8
+
+
+class GasBonus:
+    """
+    Batched calculation of the GAS generated by NEO held from one block height to another.
+
+    The GAS generated per block is constant within a decrement interval, so the generation between two heights is
+    resolved in constant time from a table of the generation of all intervals before each interval, instead of
+    walking the intervals in between. System fees come from a lookup of the cumulative fees by height.
+
+    Results are identical to the historic per group calculation, including its rounding: coins are grouped by
+    consecutive equal (start, end) heights and the bonus of a group is truncated from `sum / 10^8 * amount`.
+    """
+
+    def __init__(self, sys_fee, decrement_interval, generation_amount):
+        """
+        Create an instance.
+
+        Args:
+            sys_fee (callable): returns the cumulative system fee, in Fixed8 units, of all blocks up to and including
+                                the given height. E.g. `Blockchain.GetSysFeeAmountByHeight`.
+            decrement_interval (int): number of blocks after which the generation per block decreases.
+            generation_amount (list): GAS generated per block in each decrement interval.
+        """
+        self.DecrementInterval = decrement_interval
+        self.GenerationAmount = list(generation_amount)
+
+        # generation of all complete intervals before each interval
+        self._interval_prefix = [0]
+        for amount in self.GenerationAmount:
+            self._interval_prefix.append(self._interval_prefix[-1] + amount * decrement_interval)
+
+        self._sys_fee = sys_fee
+
+    def Generation(self, start, end):
+        """
+        Get the GAS generated per NEO from block `start` up to block `end`, excluding system fees.
+
+        Args:
+            start (int): height the NEO was received at.
+            end (int): height the NEO was spent at.
+
+        Returns:
+            int:
+        """
+        interval = self.DecrementInterval
+        generation = self.GenerationAmount
+
+        ustart = start // interval
+        if ustart >= len(generation):
+            return 0
+
+        istart = start % interval
+        uend = end // interval
+        iend = end % interval
+
+        if uend >= len(generation):
+            iend = 0
+
+        if iend == 0:
+            uend -= 1
+            iend = interval
+
+        if ustart >= uend:
+            return (iend - istart) * generation[ustart]
+
+        return (interval - istart) * generation[ustart] + \
+            self._interval_prefix[uend] - self._interval_prefix[ustart + 1] + iend * generation[uend]
+
+    def Amount(self, start, end):
+        """
+        Get the GAS generated per NEO from block `start` up to block `end`, including the system fees.
+
+        Args:
+            start (int): height the NEO was received at.
+            end (int): height the NEO was spent at.
+
+        Returns:
+            int:
+        """
+        amount = self.Generation(start, end) + self._sys_fee(end - 1)
+        if start > 0:
+            amount -= self._sys_fee(start - 1)
+        return amount
+
+    def Calculate(self, starts, ends, values):
+        """
+        Calculate the bonus of a set of coins.
+
+        Args:
+            starts (list): heights the coins were received at.
+            ends (list): heights the coins were spent at.
+            values (list): NEO amounts of the coins, in Fixed8 units.
+
+        Returns:
+            tuple: (list, Fixed8) the bonus of each coin as if it were claimed on its own, and the bonus of all coins.
+        """
+        amounts = {}
+        per_coin = []
+        total = 0
+
+        group = None
+        group_sum = 0
+        group_amount = 0
+
+        for start, end, value in zip(starts, ends, values):
+            heights = (start, end)
+
+            amount = amounts.get(heights)
+            if amount is None:
+                amount = amounts[heights] = self.Amount(start, end)
+
+            per_coin.append(Fixed8(int(value / 100000000 * amount)))
+
+            if heights != group:
+                if group is not None:
+                    total += int(group_sum / 100000000 * group_amount)
+                group = heights
+                group_sum = 0
+                group_amount = amount
+
+            group_sum += value
+
+        if group is not None:
+            total += int(group_sum / 100000000 * group_amount)
+
+        return per_coin, Fixed8(total)
@@ -35,9 +35,11 @@ class Header(BlockBase):
         Args:
             reader (neo.IO.BinaryReader):
         """
+        start = reader.stream.tell()
         super(Header, self).Deserialize(reader)
         if reader.ReadByte() != 0:
             raise Exception('Incorrect Header Format')
+        self._RetainWireData(reader.stream, start, start + self._unsigned_length)
 
     def Equals(self, other):
         """
@@ -69,16 +71,20 @@ class Header(BlockBase):
         """
         header = Header()
 
-        ms = StreamManager.GetStream(data)
+        ms = StreamManager.GetReader(data)
 
         reader = BinaryReader(ms)
         header.DeserializeUnsigned(reader)
+        unsigned_length = ms.tell()
         reader.ReadByte()
 
         witness = Witness()
         witness.Deserialize(reader)
         header.Script = witness
 
+        # the stored block is followed by its transaction hashes instead of the zero byte ending a header
+        header.SetWireData(ms.getvalue()[:ms.tell()] + b'\x00', unsigned_length)
+
         StreamManager.ReleaseStream(ms)
 
         return header
@@ -99,5 +105,9 @@ class Header(BlockBase):
         Args:
             writer (neo.IO.BinaryWriter):
         """
+        if self._wire_data is not None:
+            writer.WriteBytes(self._wire_data, unhex=False)
+            return
+
         super(Header, self).Serialize(writer)
         writer.WriteByte(0)
@@ -201,7 +201,7 @@ class Helper:
                     return False
 
             state_reader = GetStateReader()
-            script_table = CachedScriptTable(DBCollection(blockchain._db, DBPrefix.ST_Contract, ContractState))
+            script_table = CachedScriptTable(DBCollection(blockchain.DB, DBPrefix.ST_Contract, ContractState))
 
             engine = ApplicationEngine(TriggerType.Verification, verifiable, script_table, state_reader, Fixed8.Zero())
             engine.LoadScript(verification)
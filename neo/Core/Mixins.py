@@ -1,4 +1,7 @@
+from io import BytesIO
 from neocore.IO.Mixins import SerializableMixin
+from neocore.IO.BinaryWriter import BinaryWriter
+from neo.IO.MemoryStream import StreamManager
 from abc import ABC, abstractmethod
 
 
@@ -44,6 +47,99 @@ class VerifiableMixin(ABC, SerializableMixin):
         pass
 
 
+class WireDataMixin:
+    """
+    Keeps the bytes an object was deserialized from, so hashing, storing and relaying it does not have to serialize
+    it again.
+
+    Only canonical bytes are kept, bytes that serialize the object exactly as `Serialize` would. Otherwise the object
+    would be hashed differently from the same object received in canonical form.
+
+    Assigning one of the `WireField` attributes of an object drops the bytes. Changing an attribute in place, e.g.
+    appending to one of its lists, or assigning any other attribute, has to be followed by `ResetWireData`, as it has
+    to be followed by a reset of the cached hash. Otherwise the object is serialized as it was received.
+    """
+
+    _wire_data = None
+    _unsigned_length = 0
+
+    def GetWireData(self):
+        """
+        Get the serialized object as it was deserialized.
+
+        Returns:
+            bytes: or None if the object was not deserialized or was changed since.
+        """
+        return self._wire_data
+
+    def SetWireData(self, data, unsigned_length):
+        """
+        Set the serialized object.
+
+        Args:
+            data (bytes): the full serialized object.
+            unsigned_length (int): length of the unsigned data at the start of `data`.
+        """
+        self._wire_data = data
+        self._unsigned_length = unsigned_length
+
+    def ResetWireData(self):
+        """Drop the serialized object, after changing it in place."""
+        self._wire_data = None
+
+    def GetUnsignedData(self):
+        """
+        Get the serialized unsigned data, as hashed and signed.
+
+        Returns:
+            bytes:
+        """
+        if self._wire_data is not None:
+            return self._wire_data[:self._unsigned_length]
+
+        ms = StreamManager.GetStream()
+        self.SerializeUnsigned(BinaryWriter(ms))
+        data = ms.getvalue()
+        StreamManager.ReleaseStream(ms)
+        return data
+
+    def _RetainWireData(self, stream, start, unsigned_end):
+        """
+        Keep the bytes read from `stream` since `start`, if the stream holds them in memory and they are canonical.
+
+        Args:
+            stream (io.BytesIO): the stream the object was deserialized from.
+            start (int): position of the object in the stream.
+            unsigned_end (int): position where the unsigned data of the object ends.
+        """
+        self._wire_data = None
+        self._unsigned_length = unsigned_end - start
+        if not isinstance(stream, BytesIO):
+            return
+
+        # every field has a single encoding but the var ints, and a var int encoded with more bytes than needed makes
+        # the data longer than the serialized object
+        length = stream.tell() - start
+        if length == self.Size():
+            self._wire_data = stream.getvalue()[start:start + length]
+
+
+class WireField:
+    """
+    An attribute of a `WireDataMixin` object that drops the kept bytes of the object when it is assigned.
+
+    The value is kept in the instance dictionary under the name of the attribute, and only assigning it goes through
+    the descriptor, reading it costs nothing extra. Deserializing writes the instance dictionary directly.
+    """
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.name] = value
+        instance._wire_data = None
+
+
 class EquatableMixin:
 
     def __eq__(self, other):
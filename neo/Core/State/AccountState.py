@@ -1,6 +1,6 @@
-import sys
 from .StateBase import StateBase
 from neocore.Fixed8 import Fixed8
+from neocore.UInt256 import UInt256
 from neocore.IO.BinaryReader import BinaryReader
 from neo.IO.MemoryStream import StreamManager
 from neocore.Cryptography.Crypto import Crypto
@@ -11,10 +11,13 @@ from neo.Core.Size import GetVarSize
 
 
 class AccountState(StateBase):
-    ScriptHash = None
-    IsFrozen = False
-    Votes = []
-    Balances = {}
+    """
+    Balances are kept as integer amounts of the smallest unit, keyed by the 32 bytes of the asset id, so updating them
+    while persisting a block does not create `Fixed8` or `UInt256` objects. `Balances` and the balance methods
+    convert from and to those types.
+    """
+
+    __slots__ = ('ScriptHash', 'IsFrozen', 'Votes', '_balances')
 
     def __init__(self, script_hash=None, is_frozen=False, votes=None, balances=None):
         """
@@ -35,11 +38,26 @@ class AccountState(StateBase):
         else:
             self.Votes = votes
 
-        if balances is None:
-            self.Balances = {}
-        else:
+        self._balances = {}
+        if balances is not None:
             self.Balances = balances
 
+    @property
+    def Balances(self):
+        """
+        Get the balances.
+
+        Returns:
+            dict:
+                Key (UInt256): assetID.
+                Value (Fixed8): balance.
+        """
+        return {UInt256(data=bytearray(key)): Fixed8(value) for key, value in self._balances.items()}
+
+    @Balances.setter
+    def Balances(self, balances):
+        self._balances = {bytes(key.Data): value.value for key, value in balances.items()}
+
     @property
     def Address(self):
         """
@@ -67,7 +85,9 @@ class AccountState(StateBase):
         Returns:
             AccountState:
         """
-        return AccountState(self.ScriptHash, self.IsFrozen, self.Votes, self.Balances)
+        account = AccountState(self.ScriptHash, self.IsFrozen, self.Votes)
+        account._balances = dict(self._balances)
+        return account
 
     def FromReplica(self, replica):
         """
@@ -87,7 +107,7 @@ class AccountState(StateBase):
         Returns:
             int: size.
         """
-        return super(AccountState, self).Size() + s.uint160 + s.uint8 + GetVarSize(self.Votes) + GetVarSize(len(self.Balances)) + (len(self.Balances) * (32 + 8))
+        return super(AccountState, self).Size() + s.uint160 + s.uint8 + GetVarSize(self.Votes) + GetVarSize(len(self._balances)) + (len(self._balances) * (32 + 8))
 
     @staticmethod
     def DeserializeFromDB(buffer):
@@ -100,7 +120,7 @@ class AccountState(StateBase):
         Returns:
             AccountState:
         """
-        m = StreamManager.GetStream(buffer)
+        m = StreamManager.GetReader(buffer)
         reader = BinaryReader(m)
         account = AccountState()
         account.Deserialize(reader)
@@ -124,11 +144,10 @@ class AccountState(StateBase):
             self.Votes.append(reader.ReadBytes(33))
 
         num_balances = reader.ReadVarInt()
-        self.Balances = {}
+        self._balances = {}
         for i in range(0, num_balances):
-            assetid = reader.ReadUInt256()
-            amount = reader.ReadFixed8()
-            self.Balances[assetid] = amount
+            assetid = reader.ReadBytes(32)
+            self._balances[assetid] = reader.ReadInt64()
 
     def Serialize(self, writer):
         """
@@ -144,12 +163,12 @@ class AccountState(StateBase):
         for vote in self.Votes:
             writer.WriteBytes(vote)
 
-        blen = len(self.Balances)
+        blen = len(self._balances)
         writer.WriteVarInt(blen)
 
-        for key, fixed8 in self.Balances.items():
-            writer.WriteUInt256(key)
-            writer.WriteFixed8(fixed8)
+        for key, value in self._balances.items():
+            writer.WriteBytes(key, unhex=False)
+            writer.WriteInt64(value)
 
     def HasBalance(self, assetId):
         """
@@ -161,10 +180,7 @@ class AccountState(StateBase):
         Returns:
             bool: True if a balance is present. False otherwise.
         """
-        for key, fixed8 in self.Balances.items():
-            if key == assetId:
-                return True
-        return False
+        return bytes(assetId.Data) in self._balances
 
     def BalanceFor(self, assetId):
         """
@@ -176,10 +192,7 @@ class AccountState(StateBase):
         Returns:
             Fixed8: balance value.
         """
-        for key, fixed8 in self.Balances.items():
-            if key == assetId:
-                return fixed8
-        return Fixed8(0)
+        return Fixed8(self._balances.get(bytes(assetId.Data), 0))
 
     def SetBalanceFor(self, assetId, fixed8_val):
         """
@@ -188,14 +201,7 @@ class AccountState(StateBase):
             assetId (UInt256):
             fixed8_val (Fixed8): balance value.
         """
-        found = False
-        for key, val in self.Balances.items():
-            if key == assetId:
-                self.Balances[key] = fixed8_val
-                found = True
-
-        if not found:
-            self.Balances[assetId] = fixed8_val
+        self._balances[bytes(assetId.Data)] = fixed8_val.value
 
     def AddToBalance(self, assetId, fixed8_val):
         """
@@ -205,13 +211,8 @@ class AccountState(StateBase):
             assetId (UInt256):
             fixed8_val (Fixed8): amount to add.
         """
-        found = False
-        for key, balance in self.Balances.items():
-            if key == assetId:
-                self.Balances[assetId] = self.Balances[assetId] + fixed8_val
-                found = True
-        if not found:
-            self.Balances[assetId] = fixed8_val
+        key = bytes(assetId.Data)
+        self._balances[key] = self._balances.get(key, 0) + fixed8_val.value
 
     def SubtractFromBalance(self, assetId, fixed8_val):
         """
@@ -221,13 +222,8 @@ class AccountState(StateBase):
             assetId (UInt256):
             fixed8_val (Fixed8): amount to add.
         """
-        found = False
-        for key, balance in self.Balances.items():
-            if key == assetId:
-                self.Balances[assetId] = self.Balances[assetId] - fixed8_val
-                found = True
-        if not found:
-            self.Balances[assetId] = fixed8_val * Fixed8(-1)
+        key = bytes(assetId.Data)
+        self._balances[key] = self._balances.get(key, 0) - fixed8_val.value
 
     def AllBalancesZeroOrLess(self):
         """
@@ -236,8 +232,8 @@ class AccountState(StateBase):
         Returns:
             bool: True if all balances are <= 0. False, otherwise.
         """
-        for key, fixed8 in self.Balances.items():
-            if fixed8.value > 0:
+        for value in self._balances.values():
+            if value > 0:
                 return False
         return True
 
@@ -273,8 +269,8 @@ class AccountState(StateBase):
         json['votes'] = [v.hex() for v in self.Votes]
 
         balances = []
-        for key, value in self.Balances.items():
-            balances.append({'asset': key.To0xString(), 'value': value.ToString()})
+        for key, value in self._balances.items():
+            balances.append({'asset': UInt256(data=bytearray(key)).To0xString(), 'value': Fixed8(value).ToString()})
 
         json['balances'] = balances
         return json
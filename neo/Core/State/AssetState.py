@@ -85,7 +85,7 @@ class AssetState(StateBase):
         Returns:
             AssetState:
         """
-        m = StreamManager.GetStream(buffer)
+        m = StreamManager.GetReader(buffer)
         reader = BinaryReader(m)
         account = AssetState()
         account.Deserialize(reader)
@@ -135,7 +135,7 @@ class ContractState(StateBase):
         Returns:
             ContractState:
         """
-        m = StreamManager.GetStream(buffer)
+        m = StreamManager.GetReader(buffer)
         reader = BinaryReader(m)
         c = ContractState()
         c.Deserialize(reader)
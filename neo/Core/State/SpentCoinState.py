@@ -138,7 +138,7 @@ class SpentCoinState(StateBase):
         Returns:
             SpentCoinState:
         """
-        m = StreamManager.GetStream(buffer)
+        m = StreamManager.GetReader(buffer)
         reader = BinaryReader(m)
         spentcoin = SpentCoinState()
         spentcoin.Deserialize(reader)
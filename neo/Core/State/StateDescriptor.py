@@ -67,7 +67,7 @@ class StateDescriptor(SerializableMixin):
         Returns:
             ValidatorState:
         """
-        m = StreamManager.GetStream(buffer)
+        m = StreamManager.GetReader(buffer)
         reader = BinaryReader(m)
         v = StateDescriptor()
         v.Deserialize(reader)
@@ -69,7 +69,7 @@ class StorageItem(StateBase):
         Returns:
             StorageItem:
         """
-        m = StreamManager.GetStream(buffer)
+        m = StreamManager.GetReader(buffer)
         reader = BinaryReader(m)
         v = StorageItem()
         v.Deserialize(reader)
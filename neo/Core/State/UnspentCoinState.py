@@ -97,7 +97,7 @@ class UnspentCoinState(StateBase):
         Returns:
             UnspentCoinState:
         """
-        m = StreamManager.GetStream(buffer)
+        m = StreamManager.GetReader(buffer)
         reader = BinaryReader(m)
         uns = UnspentCoinState()
         uns.Deserialize(reader)
@@ -60,7 +60,7 @@ class ValidatorState(StateBase):
         Returns:
             ValidatorState:
         """
-        m = StreamManager.GetStream(buffer)
+        m = StreamManager.GetReader(buffer)
         reader = BinaryReader(m)
         v = ValidatorState()
         v.Deserialize(reader)
@@ -97,6 +97,28 @@ class StateTestCase(NeoTestCase):
         self.assertEqual(res['address'], account.Address)
         self.assertEqual(res['script_hash'], str(hash))
 
+    def test_account_balances(self):
+        account1 = AccountState.DeserializeFromDB(binascii.unhexlify(self.ac1_out))
+        neo = Blockchain.SystemShare().Hash
+        gas = Blockchain.SystemCoin().Hash
+
+        # balances are converted from and to the stored amounts at the API
+        self.assertEqual(account1.Balances, {neo: Fixed8(-800000000), gas: Fixed8(1220000000)})
+        self.assertEqual(account1.BalanceFor(neo), Fixed8(-800000000))
+        self.assertEqual(account1.ToByteArray(), self.ac1_out)
+
+        account2 = AccountState(account1.ScriptHash, balances=account1.Balances)
+        account2.AddToBalance(neo, Fixed8(900000000))
+        account2.SubtractFromBalance(gas, Fixed8(1220000000))
+        self.assertEqual(account2.BalanceFor(neo), Fixed8(100000000))
+        self.assertEqual(account2.ToJson()['balances'][1], {'asset': gas.To0xString(), 'value': '0.0'})
+        self.assertEqual(account1.BalanceFor(neo), Fixed8(-800000000))
+
+        clone = account2.Clone()
+        clone.SubtractFromBalance(neo, Fixed8(100000000))
+        self.assertTrue(clone.AllBalancesZeroOrLess())
+        self.assertFalse(account2.AllBalancesZeroOrLess())
+
     assset = b'00e72d286979ee6cb1b7e65dfddfb2e384100b8d148e7758de42e4168b71792c6001445b7b226c616e67223a227a682d434e222c226e616d65223a22e5b08fe89a81e5b881227d2c7b226c616e67223a22656e222c226e616d65223a22416e74436f696e227d5d0000c16ff28623000000000000000000080000000000000000000000000000000000000000000000000000000000009f7fd096d37ed2c0e3f7f0cfc924beef4ffceb689f7fd096d37ed2c0e3f7f0cfc924beef4ffceb6800093d0000'
     assetkey = b'602c79718b16e442de58778e148d0b1084e3b2dffd5de6b7b16cee7969282de7'
 
@@ -1,5 +1,7 @@
 from neo.Core.TX.Transaction import Transaction, TransactionType
 from neo.Core.FunctionCode import FunctionCode
+from neo.Core.Size import Size as s
+from neo.Core.Size import GetVarSize
 from neo.logging import log_manager
 
 logger = log_manager.getLogger()
@@ -25,6 +27,19 @@ class PublishTransaction(Transaction):
         super(PublishTransaction, self).__init__(*args, **kwargs)
         self.Type = TransactionType.PublishTransaction
 
+    def Size(self):
+        """
+        Get the total size in bytes of the object.
+
+        Returns:
+            int: size.
+        """
+        size = super(PublishTransaction, self).Size() + self.Code.Size()
+        if self.Version >= 1:
+            size += s.uint8
+        return size + GetVarSize(self.Name) + GetVarSize(self.CodeVersion) + GetVarSize(self.Author) + \
+            GetVarSize(self.Email) + GetVarSize(self.Description)
+
     def DeserializeExclusiveData(self, reader):
         """
         Deserialize full object.
@@ -6,6 +6,8 @@ Usage:
 """
 from neo.Core.TX.Transaction import Transaction, TransactionType
 from neo.Core.AssetType import AssetType
+from neo.Core.Size import Size as s
+from neo.Core.Size import GetVarSize
 from neocore.Cryptography.Crypto import Crypto
 from neocore.Cryptography.ECCurve import EllipticCurve, ECDSA
 from neocore.Fixed8 import Fixed8
@@ -76,6 +78,16 @@ In English:
         self.Admin = admin
         self.Precision = precision
 
+    def Size(self):
+        """
+        Get the total size in bytes of the object.
+
+        Returns:
+            int: size.
+        """
+        return super(RegisterTransaction, self).Size() + s.uint8 + GetVarSize(self.Name) + s.uint64 + s.uint8 + \
+            self.Owner.Size() + s.uint160
+
     def SystemFee(self):
         """
         Get the system fee.
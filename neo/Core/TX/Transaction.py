@@ -6,7 +6,6 @@ Usage:
 """
 import sys
 from itertools import groupby
-import binascii
 from logzero import logger
 from neocore.UInt160 import UInt160
 from neo.Blockchain import GetBlockchain
@@ -19,7 +18,7 @@ from neocore.Cryptography.Crypto import Crypto
 from neocore.IO.Mixins import SerializableMixin
 from neo.IO.MemoryStream import StreamManager
 from neocore.IO.BinaryReader import BinaryReader
-from neo.Core.Mixins import EquatableMixin
+from neo.Core.Mixins import EquatableMixin, WireDataMixin, WireField
 from neo.Core.Helper import Helper
 from neo.Core.Witness import Witness
 from neocore.UInt256 import UInt256
@@ -224,18 +223,19 @@ class TransactionInput(SerializableMixin, EquatableMixin):
         }
 
 
-class Transaction(InventoryMixin):
+class Transaction(WireDataMixin, InventoryMixin):
     Type = None
 
     Version = 0
 
-    Attributes = []
+    # set by __init__, assigning them drops the wire data
+    Attributes = WireField()
 
-    inputs = []
+    inputs = WireField()
 
-    outputs = []
+    outputs = WireField()
 
-    scripts = []
+    scripts = WireField()
 
     __system_fee = None
     _network_fee = None
@@ -251,6 +251,9 @@ class Transaction(InventoryMixin):
 
     MAX_TX_ATTRIBUTES = 16
 
+    # the fee table of the settings and the system fee amounts of the transaction types computed from it
+    _system_fees = (None, {})
+
     withdraw_hold = None
 
     raw_tx = False
@@ -283,8 +286,7 @@ class Transaction(InventoryMixin):
             UInt256:
         """
         if not self.__hash:
-            ba = bytearray(binascii.unhexlify(self.GetHashData()))
-            hash = Crypto.Hash256(ba)
+            hash = Crypto.Hash256(self.GetUnsignedData())
             self.__hash = UInt256(data=hash)
         return self.__hash
 
@@ -322,6 +324,7 @@ class Transaction(InventoryMixin):
     def ResetHashData(self):
         """Reset local stored hash data."""
         self.__hash = None
+        self._wire_data = None
 
     @property
     def Scripts(self):
@@ -378,8 +381,16 @@ class Transaction(InventoryMixin):
         Returns:
             Fixed8: currently fixed to 0.
         """
-        tx_name = TransactionType.ToName(self.Type)
-        return Fixed8.FromDecimal(settings.ALL_FEES.get(tx_name, 0))
+        fees, amounts = Transaction._system_fees
+        if fees is not settings.ALL_FEES:
+            fees, amounts = settings.ALL_FEES, {}
+            Transaction._system_fees = (fees, amounts)
+
+        amount = amounts.get(self.Type)
+        if amount is None:
+            tx_name = TransactionType.ToName(self.Type)
+            amount = amounts[self.Type] = Fixed8.FromDecimal(fees.get(tx_name, 0)).value
+        return Fixed8(amount)
 
     def NetworkFee(self):
         """
@@ -423,10 +434,13 @@ class Transaction(InventoryMixin):
         Args:
             reader (neo.IO.BinaryReader):
         """
+        start = reader.stream.tell()
         self.DeserializeUnsigned(reader)
+        unsigned_end = reader.stream.tell()
 
-        self.scripts = reader.ReadSerializableArray()
+        self.__dict__['scripts'] = reader.ReadSerializableArray()
         self.OnDeserialized()
+        self._RetainWireData(reader.stream, start, unsigned_end)
 
     def DeserializeExclusiveData(self, reader):
         pass
@@ -443,7 +457,7 @@ class Transaction(InventoryMixin):
         Returns:
             Transaction:
         """
-        mstream = StreamManager.GetStream(buffer)
+        mstream = StreamManager.GetReader(buffer)
         reader = BinaryReader(mstream)
         tx = Transaction.DeserializeFrom(reader)
 
@@ -461,6 +475,7 @@ class Transaction(InventoryMixin):
         Returns:
             Transaction:
         """
+        start = reader.stream.tell()
         ttype = reader.ReadByte()
         tx = None
 
@@ -494,8 +509,9 @@ class Transaction(InventoryMixin):
             tx.Type = ttype
 
         tx.DeserializeUnsignedWithoutType(reader)
+        unsigned_end = reader.stream.tell()
 
-        tx.scripts = []
+        scripts = []
         byt = reader.ReadVarInt()
 
         if byt > 0:
@@ -503,9 +519,11 @@ class Transaction(InventoryMixin):
                 witness = Witness()
                 witness.Deserialize(reader)
 
-                tx.scripts.append(witness)
+                scripts.append(witness)
+        tx.__dict__['scripts'] = scripts
 
         tx.OnDeserialized()
+        tx._RetainWireData(reader.stream, start, unsigned_end)
 
         return tx
 
@@ -533,10 +551,12 @@ class Transaction(InventoryMixin):
         """
         self.Version = reader.ReadByte()
         self.DeserializeExclusiveData(reader)
-        self.Attributes = reader.ReadSerializableArray('neo.Core.TX.TransactionAttribute.TransactionAttribute',
-                                                       max=self.MAX_TX_ATTRIBUTES)
-        self.inputs = reader.ReadSerializableArray('neo.Core.CoinReference.CoinReference')
-        self.outputs = reader.ReadSerializableArray('neo.Core.TX.Transaction.TransactionOutput')
+        # the wire fields are written directly, the object has no wire data yet
+        fields = self.__dict__
+        fields['Attributes'] = reader.ReadSerializableArray('neo.Core.TX.TransactionAttribute.TransactionAttribute',
+                                                            max=self.MAX_TX_ATTRIBUTES)
+        fields['inputs'] = reader.ReadSerializableArray('neo.Core.CoinReference.CoinReference')
+        fields['outputs'] = reader.ReadSerializableArray('neo.Core.TX.Transaction.TransactionOutput')
 
     def Equals(self, other):
         if other is None or other is not self:
@@ -559,6 +579,10 @@ class Transaction(InventoryMixin):
         Args:
             writer (neo.IO.BinaryWriter):
         """
+        if self._wire_data is not None:
+            writer.WriteBytes(self._wire_data, unhex=False)
+            return
+
         self.SerializeUnsigned(writer)
         writer.WriteSerializableArray(self.scripts)
 
@@ -569,6 +593,10 @@ class Transaction(InventoryMixin):
         Args:
             writer (neo.IO.BinaryWriter):
         """
+        if self._wire_data is not None:
+            writer.WriteBytes(self._wire_data[:self._unsigned_length], unhex=False)
+            return
+
         writer.WriteByte(self.Type)
         writer.WriteByte(self.Version)
         self.SerializeExclusiveData(writer)
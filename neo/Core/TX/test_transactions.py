@@ -3,6 +3,7 @@ from neo.Core.Helper import Helper
 from neo.Core.TX.MinerTransaction import MinerTransaction
 from neo.Core.TX.Transaction import Transaction, TransactionType
 from neo.Core.State.AssetState import AssetState
+from neo.Core.Witness import Witness
 from neocore.IO.BinaryWriter import BinaryWriter
 from neocore.IO.BinaryReader import BinaryReader
 from neocore.Fixed8 import Fixed8
@@ -71,6 +72,27 @@ class TransactionTestCase(NeoTestCase):
 
         self.assertEqual(tx.Hash.ToBytes(), self.ctx_id)
 
+    def test_contract_tx_non_minimal_var_int(self):
+        # the attribute count 0 encoded in 3 bytes instead of 1
+        raw = binascii.unhexlify(self.ctx_raw)
+        malleated = raw[:2] + b'\xfd\x00\x00' + raw[3:]
+
+        tx = Transaction.DeserializeFromBufer(malleated)
+
+        self.assertIsNone(tx.GetWireData())
+        self.assertEqual(tx.ToArray(), self.ctx_raw)
+        self.assertEqual(tx.Hash.ToBytes(), self.ctx_id)
+
+    def test_contract_tx_assign_drops_wire_data(self):
+        tx = Transaction.DeserializeFromBufer(binascii.unhexlify(self.ctx_raw))
+        self.assertIsNotNone(tx.GetWireData())
+
+        tx.scripts = [Witness(bytearray(b'\x01'), bytearray(b'\xac'))]
+
+        self.assertIsNone(tx.GetWireData())
+        self.assertNotEqual(tx.ToArray(), self.ctx_raw)
+        self.assertEqual(tx.Hash.ToBytes(), self.ctx_id)
+
     pb_raw = b'd000fd3f01746b4c04000000004c04000000004c040000000061681e416e745368617265732e426c6f636b636861696e2e476574486569676874681d416e745368617265732e426c6f636b636861696e2e476574426c6f636b744c0400000000948c6c766b947275744c0402000000936c766b9479744c0400000000948c6c766b9479681d416e745368617265732e4865616465722e47657454696d657374616d70a0744c0401000000948c6c766b947275744c0401000000948c6c766b9479641b004c0400000000744c0402000000948c6c766b947275623000744c0401000000936c766b9479744c0400000000936c766b9479ac744c0402000000948c6c766b947275620300744c0402000000948c6c766b947961748c6c766b946d748c6c766b946d748c6c766b946d746c768c6b946d746c768c6b946d746c768c6b946d6c75660302050001044c6f636b0c312e302d70726576696577310a4572696b205a68616e67126572696b40616e747368617265732e6f7267234c6f636b20796f75722061737365747320756e74696c20612074696d657374616d702e00014e23ac4c4851f93407d4c59e1673171f39859db9e7cac72540cd3cc1ae0cca87000001e72d286979ee6cb1b7e65dfddfb2e384100b8d148e7758de42e4168b71792c6000ebcaaa0d00000067f97110a66136d38badc7b9f88eab013027ce49014140c298da9f06d5687a0bb87ea3bba188b7dcc91b9667ea5cb71f6fdefe388f42611df29be9b2d6288655b9f2188f46796886afc3b37d8b817599365d9e161ecfb62321034b44ed9c8a88fb2497b6b57206cc08edd42c5614bd1fee790e5b795dee0f4e11ac'
     pb_hash = b'5467a1fc8723ceffa8e5ee59399b02eea1df6fbaa53768c6704b90b960d223fa'
 
@@ -7,6 +7,7 @@ from neocore.Cryptography.Crypto import Crypto
 from neocore.Cryptography.MerkleTree import MerkleTree
 from neocore.Fixed8 import Fixed8
 from neo.Core.TX.StateTransaction import StateTransaction
+from neo.Core.TX.Transaction import Transaction
 from neo.Core.State.StateDescriptor import StateDescriptor, StateType
 
 
@@ -83,6 +84,37 @@ class BlocksTestCase(NeoTestCase):
         root = MerkleTree.ComputeRoot([tx.Hash for tx in block.Transactions])
         self.assertEqual(root, block.MerkleRoot)
 
+    def test_block_wire_data(self):
+        block = Helper.AsSerializableWithType(self.rawblock_hex, 'neo.Core.Block.Block')
+        tx = block.Transactions[0]
+
+        self.assertEqual(block.GetWireData(), self.rawblock_hex)
+        self.assertEqual(block.ToArray(), self.rawblock)
+        self.assertEqual(tx.GetWireData(), self.rawblock_hex[-len(tx.GetWireData()):])
+        self.assertEqual(block.Header.ToArray(), self.rawblock[:len(block.Header.ToArray()) - 2] + b'00')
+        self.assertEqual(block.Header.Hash.ToBytes(), self.rb_hash)
+
+        # the data kept matches the data serialized from the deserialized fields
+        trimmed = block.Trim()
+        tx_data = tx.ToArray()
+        block.ResetWireData()
+        tx.ResetWireData()
+        self.assertEqual(block.ToArray(), self.rawblock)
+        self.assertEqual(block.Trim(), trimmed)
+        self.assertEqual(tx.ToArray(), tx_data)
+
+        # a deserialized object that is changed is serialized again once its wire data is reset
+        tx = Transaction.DeserializeFromBufer(binascii.unhexlify(tx_data))
+        self.assertIsNotNone(tx.GetWireData())
+        tx.Nonce = tx.Nonce + 1
+        tx.ResetWireData()
+        self.assertIsNone(tx.GetWireData())
+        self.assertNotEqual(tx.ToArray(), tx_data)
+
+        block = Helper.AsSerializableWithType(self.rawblock_hex, 'neo.Core.Block.Block')
+        block.RebuildMerkleRoot()
+        self.assertIsNone(block.GetWireData())
+
     def test_block_two(self):
 
         hexdata = binascii.unhexlify(self.b2raw)
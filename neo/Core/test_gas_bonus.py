@@ -0,0 +1,158 @@
+from unittest import TestCase
+from itertools import groupby
+from neo.Core.GasBonus import GasBonus
+from neo.Core.Blockchain import Blockchain
+from neo.Core.State.SpentCoinState import SpentCoin
+from neo.Core.TX.Transaction import TransactionOutput
+from neocore.Fixed8 import Fixed8
+import random
+
+
+def reference_bonus(unclaimed, sys_fee, decInterval, genAmount):
+    # the per group calculation GasBonus replaces, kept verbatim apart from its parameters
+    amount_claimed = Fixed8.Zero()
+    genLen = len(genAmount)
+
+    for coinheight, group in groupby(unclaimed, lambda x: x.Heights):
+        amount = 0
+        ustart = int(coinheight.start / decInterval)
+
+        if ustart < genLen:
+
+            istart = coinheight.start % decInterval
+            uend = int(coinheight.end / decInterval)
+            iend = coinheight.end % decInterval
+
+            if uend >= genLen:
+                iend = 0
+
+            if iend == 0:
+                uend -= 1
+                iend = decInterval
+
+            while ustart < uend:
+                amount += (decInterval - istart) * genAmount[ustart]
+                ustart += 1
+                istart = 0
+
+            amount += (iend - istart) * genAmount[ustart]
+
+        endamount = sys_fee(coinheight.end - 1)
+        startamount = 0 if coinheight.start == 0 else sys_fee(coinheight.start - 1)
+        amount += endamount - startamount
+
+        outputSum = 0
+
+        for spentcoin in group:
+            outputSum += spentcoin.Value.value
+
+        outputSum = outputSum / 100000000
+        outputSumFixed8 = Fixed8(int(outputSum * amount))
+        amount_claimed += outputSumFixed8
+
+    return amount_claimed
+
+
+class FeeChain(Blockchain):
+
+    def __init__(self, fees):
+        super(FeeChain, self).__init__()
+        self.fees = fees
+
+    def GetSysFeeAmountByHeight(self, height):
+        return self.fees[height]
+
+
+class GasBonusTest(TestCase):
+    SMALL_INTERVAL = 10
+    SMALL_GENERATION = [8, 7, 6, 5, 4, 3, 2, 1, 1, 1]
+
+    def setUp(self):
+        self.random = random.Random(20190214)
+
+        # cumulative system fees, with some large ones to exercise the float rounding
+        fees = [0]
+        for height in range(1, 200):
+            fees.append(fees[-1] + self.random.choice([0, 0, 1, 100000000, 123456789012]))
+        self.fees = fees
+
+    def _coins(self, count, max_height, values=None):
+        coins = []
+        for i in range(count):
+            start = self.random.randrange(max_height)
+            end = self.random.randrange(start, max_height + 1)
+            value = values[i] if values else self.random.choice([1, 100000000, 99999999999, self.random.randrange(1, 10 ** 16)])
+            coins.append(SpentCoin(TransactionOutput(Value=Fixed8(value)), start, end))
+        return coins
+
+    def _engine(self, interval, generation):
+        return GasBonus(self.fees.__getitem__, interval, generation)
+
+    def _assert_parity(self, coins, interval, generation):
+        expected = reference_bonus(coins, self.fees.__getitem__, interval, generation)
+
+        engine = self._engine(interval, generation)
+        per_coin, total = engine.Calculate([c.StartHeight for c in coins], [c.EndHeight for c in coins], [c.Value.value for c in coins])
+        self.assertEqual(total.value, expected.value)
+        self.assertEqual(len(per_coin), len(coins))
+        for coin, bonus in zip(coins, per_coin):
+            self.assertEqual(bonus.value, reference_bonus([coin], self.fees.__getitem__, interval, generation).value)
+
+    def test_every_height_pair(self):
+        # covers interval boundaries, coins spent at the height they were received and the end of generation
+        interval, generation = self.SMALL_INTERVAL, self.SMALL_GENERATION
+        engine = self._engine(interval, generation)
+        limit = (len(generation) + 1) * interval
+
+        for start in range(limit):
+            for end in range(start, limit):
+                coin = SpentCoin(TransactionOutput(Value=Fixed8(100000000)), start, end)
+                expected = reference_bonus([coin], self.fees.__getitem__, interval, generation)
+                self.assertEqual(engine.Calculate([start], [end], [100000000])[1].value, expected.value, (start, end))
+
+    def test_random_sets(self):
+        for max_height in [5, 50, 109]:
+            coins = self._coins(500, max_height)
+            self._assert_parity(coins, self.SMALL_INTERVAL, self.SMALL_GENERATION)
+
+            # adjacent coins with equal heights are added up before rounding
+            coins.sort(key=lambda c: c.Heights)
+            self._assert_parity(coins, self.SMALL_INTERVAL, self.SMALL_GENERATION)
+
+    def test_network_parameters(self):
+        interval = 2000000
+        generation = [8, 7, 6, 5, 4, 3, 2, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1]
+
+        fees = self.fees
+        self.fees = _StretchedFees(fees)
+
+        coins = []
+        for i in range(300):
+            start = self.random.randrange(46000000)
+            end = self.random.randrange(start, 46000000)
+            coins.append(SpentCoin(TransactionOutput(Value=Fixed8(self.random.randrange(1, 10 ** 16))), start, end))
+        self._assert_parity(coins, interval, generation)
+
+    def test_empty(self):
+        per_coin, total = self._engine(self.SMALL_INTERVAL, self.SMALL_GENERATION).Calculate([], [], [])
+        self.assertEqual(per_coin, [])
+        self.assertEqual(total, Fixed8.Zero())
+
+    def test_blockchain(self):
+        Blockchain.DeregisterBlockchain()
+        Blockchain.RegisterBlockchain(FeeChain(self.fees))
+        try:
+            coins = self._coins(200, 100)
+            expected = reference_bonus(coins, self.fees.__getitem__, Blockchain.DECREMENT_INTERVAL, Blockchain.GENERATION_AMOUNT)
+            self.assertEqual(Blockchain.CalculateBonusInternal(coins), expected)
+        finally:
+            Blockchain.DeregisterBlockchain()
+
+
+class _StretchedFees:
+    # cumulative fees for any height, derived from a short list of fees
+    def __init__(self, fees):
+        self.fees = fees
+
+    def __getitem__(self, height):
+        return self.fees[height % len(self.fees)] + (height // len(self.fees)) * self.fees[-1]
@@ -24,7 +24,7 @@ class Helper:
         module = '.'.join(class_name.split('.')[:-1])
         klassname = class_name.split('.')[-1]
         klass = getattr(importlib.import_module(module), klassname)
-        mstream = StreamManager.GetStream(buffer)
+        mstream = StreamManager.GetReader(buffer)
         reader = BinaryReader(mstream)
 
         try:
@@ -8,11 +8,24 @@ Usage:
 from io import BytesIO
 from binascii import hexlify
 
-__mstreams__ = []
-__mstreams_available__ = []
-
 
 class StreamManager:
+    """
+    Hands out streams to serialize into and to deserialize from.
+
+    Streams for writing are kept in a bounded pool once released, so serializing does not allocate a new buffer
+    every time. Streams for reading are created around the given data instead, see `GetReader`.
+    """
+
+    # maximum number of released streams kept for reuse, further streams are left to the garbage collector
+    MAX_POOL_SIZE = 32
+
+    _pool = []
+
+    Created = 0
+    Reused = 0
+    Discarded = 0
+    Readers = 0
 
     @staticmethod
     def TotalBuffers():
@@ -22,7 +35,7 @@ class StreamManager:
         Returns:
             int:
         """
-        return len(__mstreams__)
+        return len(StreamManager._pool)
 
     @staticmethod
     def GetStream(data=None):
@@ -35,25 +48,40 @@ class StreamManager:
         Returns:
             MemoryStream: instance.
         """
-        if len(__mstreams_available__) == 0:
-            if data:
-                mstream = MemoryStream(data)
-                mstream.seek(0)
-            else:
-                mstream = MemoryStream()
-            __mstreams__.append(mstream)
-            return mstream
-
-        mstream = __mstreams_available__.pop()
-
         if data is not None and len(data):
-            mstream.Cleanup()
-            mstream.write(data)
+            # a new stream shares a bytes buffer until it is written to, filling a pooled one would copy it
+            return StreamManager.GetReader(data)
 
-        mstream.seek(0)
+        try:
+            # popping is atomic, streams are also got and released on worker threads
+            mstream = StreamManager._pool.pop()
+            StreamManager.Reused += 1
+        except IndexError:
+            StreamManager.Created += 1
+            mstream = MemoryStream()
 
+        mstream.seek(0)
         return mstream
 
+    @staticmethod
+    def GetReader(data):
+        """
+        Get a stream to deserialize existing data from.
+
+        A stream created from a `bytes` object shares its buffer instead of copying it. Other buffers are copied
+        once, which is cheaper than wrapping them in a view that is read from in Python, one field at a time.
+
+        Args:
+            data (bytes, bytearray, memoryview): (Optional) data to read from.
+
+        Returns:
+            MemoryStream: instance.
+        """
+        StreamManager.Readers += 1
+        if data is None:
+            return MemoryStream()
+        return MemoryStream(data)
+
     @staticmethod
     def ReleaseStream(mstream):
         """
@@ -61,8 +89,29 @@ class StreamManager:
         Args:
             mstream (MemoryStream): instance.
         """
+        if len(StreamManager._pool) >= StreamManager.MAX_POOL_SIZE:
+            StreamManager.Discarded += 1
+            return
+
         mstream.Cleanup()
-        __mstreams_available__.append(mstream)
+        StreamManager._pool.append(mstream)
+
+    @staticmethod
+    def ToJson():
+        """
+        Get the usage statistics of the StreamManager.
+
+        Returns:
+            dict:
+        """
+        return {
+            'pooled': len(StreamManager._pool),
+            'max_pool_size': StreamManager.MAX_POOL_SIZE,
+            'created': StreamManager.Created,
+            'reused': StreamManager.Reused,
+            'discarded': StreamManager.Discarded,
+            'readers': StreamManager.Readers
+        }
 
 
 class MemoryStream(BytesIO):
@@ -0,0 +1,52 @@
+from unittest import TestCase
+from neo.IO.MemoryStream import StreamManager, MemoryStream
+from neocore.IO.BinaryReader import BinaryReader
+
+
+class StreamManagerTest(TestCase):
+
+    def setUp(self):
+        self._pool = StreamManager._pool
+        self._max_pool_size = StreamManager.MAX_POOL_SIZE
+        StreamManager._pool = []
+
+    def tearDown(self):
+        StreamManager._pool = self._pool
+        StreamManager.MAX_POOL_SIZE = self._max_pool_size
+
+    def test_pool_is_bounded(self):
+        StreamManager.MAX_POOL_SIZE = 2
+        streams = [StreamManager.GetStream() for i in range(3)]
+        for stream in streams:
+            stream.write(b'\x01\x02')
+
+        discarded = StreamManager.Discarded
+        for stream in streams:
+            StreamManager.ReleaseStream(stream)
+        self.assertEqual(StreamManager.TotalBuffers(), 2)
+        self.assertEqual(StreamManager.Discarded, discarded + 1)
+
+        # released streams come back empty
+        reused = StreamManager.Reused
+        stream = StreamManager.GetStream()
+        self.assertEqual(stream.getvalue(), b'')
+        self.assertEqual(StreamManager.Reused, reused + 1)
+        self.assertEqual(StreamManager.ToJson()['pooled'], 1)
+
+    def test_reader(self):
+        for data in [b'\x01\x02\x03', bytearray(b'\x01\x02\x03'), memoryview(b'\x01\x02\x03')]:
+            reader = BinaryReader(StreamManager.GetReader(data))
+            self.assertEqual(reader.ReadByte(), 1)
+            self.assertEqual(reader.ReadBytes(5), b'\x02\x03')
+            reader.stream.seek(1)
+            self.assertEqual(reader.ReadUInt8(), 2)
+
+        self.assertEqual(StreamManager.GetReader(None).read(), b'')
+
+        # readers are not taken from the pool and can be pooled once released
+        readers = StreamManager.Readers
+        stream = StreamManager.GetStream(b'\x01')
+        self.assertEqual(StreamManager.Readers, readers + 1)
+        StreamManager.ReleaseStream(stream)
+        self.assertEqual(StreamManager.TotalBuffers(), 1)
+        self.assertIsInstance(StreamManager.GetStream(), MemoryStream)
@@ -0,0 +1,164 @@
+from neo.Core.CoinReference import CoinReference
+from neo.Core.State.CoinState import CoinState
+from neo.Core.State.UnspentCoinState import UnspentCoinState
+from neo.Core.TX.Transaction import Transaction
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Implementations.Blockchains.LevelDB.DBSchema import DBSchema
+from neo.Implementations.Blockchains.LevelDB.OutputIndex import OutputIndex
+from neocore.UInt256 import UInt256
+
+
+class AddressIndex:
+    """
+    Optional index of the unspent outputs of every address, so they can be listed without a wallet watching the
+    address or a scan of all coins.
+
+    Keys are `IX_AddressUnspent` + script hash (20 bytes) + transaction hash (as used for `DATA_Transaction`) + the
+    2 byte output index, so the outputs of an address are stored next to each other. Values use the `OutputIndex`
+    encoding. Entries are added for the outputs of a transaction and removed when they are spent, in the write
+    batch of the block.
+
+    The index is maintained while the `AddressIndex` setting is enabled. The `SYS_AddressIndex` record marks a
+    database whose index covers every unspent output.
+    """
+
+    @staticmethod
+    def Key(script_hash, tx_hash, index):
+        """
+        Get the database key of an unspent output.
+
+        Args:
+            script_hash (UInt160): address the output belongs to.
+            tx_hash (bytes): hex encoded transaction hash.
+            index (int): position of the output in the transaction.
+
+        Returns:
+            bytes:
+        """
+        return DBPrefix.IX_AddressUnspent + bytes(script_hash.Data) + tx_hash + index.to_bytes(2, 'little')
+
+    @staticmethod
+    def Put(wb, tx, height):
+        """
+        Add the outputs of a transaction to the index.
+
+        Args:
+            wb (plyvel.WriteBatch): batch to write to.
+            tx (Transaction):
+            height (int): height of the block holding the transaction.
+        """
+        tx_hash = tx.Hash.ToBytes()
+        for index, output in enumerate(tx.outputs):
+            wb.put(AddressIndex.Key(output.ScriptHash, tx_hash, index), OutputIndex.Serialize(output, height))
+
+    @staticmethod
+    def Spend(wb, output, tx_hash, index):
+        """
+        Remove a spent output from the index.
+
+        Args:
+            wb (plyvel.WriteBatch): batch to write to.
+            output (TransactionOutput): the spent output.
+            tx_hash (bytes): hex encoded hash of the transaction holding the output.
+            index (int): position of the output in the transaction.
+        """
+        wb.delete(AddressIndex.Key(output.ScriptHash, tx_hash, index))
+
+    @staticmethod
+    def Find(db, script_hash, start=None, count=None):
+        """
+        Iterate over the unspent outputs of an address, in key order.
+
+        Args:
+            db (StorageBackend): chain database or a snapshot of it.
+            script_hash (UInt160): address to list the outputs of.
+            start (CoinReference): (Optional) continue after this output, usually the last one of the previous page.
+            count (int): (Optional) maximum number of outputs to return.
+
+        Returns:
+            generator: of (CoinReference, TransactionOutput, int) tuples, the last item being the height of the block
+                holding the output.
+        """
+        prefix = DBPrefix.IX_AddressUnspent + bytes(script_hash.Data)
+        if start is None:
+            first = prefix
+        else:
+            # keys have a fixed length, so this is the first key following the start output
+            first = AddressIndex.Key(script_hash, start.PrevHash.ToBytes(), start.PrevIndex) + b'\x00'
+
+        # the prefix of the following address, script hashes of 20 0xff bytes do not occur
+        stop = (int.from_bytes(prefix, 'big') + 1).to_bytes(len(prefix), 'big')
+
+        if count is not None and count <= 0:
+            return
+
+        found = 0
+        for key, value in db.iterator(start=first, stop=stop):
+            tx_hash = key[21:85]
+            index = int.from_bytes(key[85:87], 'little')
+            output, height = OutputIndex.Deserialize(value)
+
+            yield CoinReference(UInt256.ParseString(tx_hash.decode('utf-8')), index), output, height
+
+            found += 1
+            if found == count:
+                return
+
+    @staticmethod
+    def Rebuild(db, raw, batch_size=10000, progress=None):
+        """
+        Rebuild the index from the unspent coins of the chain and mark it as complete.
+
+        Args:
+            db (plyvel.DB): chain database. Should not be written to by anything else meanwhile.
+            raw (bool): value encoding of `db`, see `DBSchema`.
+            batch_size (int): number of transactions per write batch.
+            progress (callable): (Optional) called with the number of transactions indexed after every batch.
+
+        Returns:
+            int: the number of unspent outputs indexed.
+        """
+        db.delete(DBPrefix.SYS_AddressIndex)
+
+        wb = db.write_batch()
+        for count, key in enumerate(db.iterator(prefix=DBPrefix.IX_AddressUnspent, include_value=False), 1):
+            wb.delete(key)
+            if count % batch_size == 0:
+                wb.write()
+                wb = db.write_batch()
+        wb.write()
+
+        count = 0
+        outputs = 0
+        wb = db.write_batch()
+        for key, value in db.iterator(prefix=DBPrefix.ST_Coin):
+            tx_hash = key[1:]
+            state = UnspentCoinState.DeserializeFromDB(DBSchema.Decode(value, raw))
+
+            tx_value = db.get(DBPrefix.DATA_Transaction + tx_hash)
+            if tx_value is None:
+                continue
+
+            height = int.from_bytes(tx_value[:4], 'little')
+            tx = Transaction.DeserializeFromBufer(DBSchema.Decode(tx_value[4:], raw), 0)
+
+            for index, item in enumerate(state.Items):
+                if item & CoinState.Spent == 0 and index < len(tx.outputs):
+                    output = tx.outputs[index]
+                    wb.put(AddressIndex.Key(output.ScriptHash, tx_hash, index), OutputIndex.Serialize(output, height))
+                    outputs += 1
+
+            count += 1
+            if count % batch_size == 0:
+                wb.write()
+                wb = db.write_batch()
+                if progress:
+                    progress(count)
+
+        wb.put(DBPrefix.SYS_AddressIndex, b'\x01')
+        wb.write()
+
+        if progress:
+            progress(count)
+
+        return outputs
@@ -0,0 +1,147 @@
+import heapq
+import threading
+
+
+class BlockCache:
+    """
+    Blocks received ahead of the chain height, waiting for `PersistBlocks`, bounded by the serialized size of the
+    blocks.
+
+    The blocks needed next are the ones closest to the chain height, so when a block does not fit, the blocks with
+    the highest index are evicted first, and a block is refused instead if it is further ahead than every cached block.
+    Blocks more than `Window` blocks ahead of the chain height are refused regardless of the size of the cache. The
+    hashes of evicted and refused blocks are returned to the caller, so they can be requested again once the chain
+    gets closer to them.
+
+    Blocks are added on the reactor thread and popped on the thread persisting them, the changes go through a lock.
+    """
+
+    def __init__(self, max_bytes, window):
+        """
+        Create an instance.
+
+        Args:
+            max_bytes (int): maximum total size of the cached blocks. 0 removes the limit.
+            window (int): maximum distance of a cached block from the chain height. 0 removes the limit.
+        """
+        self.MaxBytes = max_bytes
+        self.Window = window
+
+        self.Bytes = 0
+        self.Evictions = 0
+        self.Refused = 0
+
+        self._blocks = {}
+        self._sizes = {}
+
+        # (-index, hash) of the cached blocks, entries of removed blocks are skipped when they come up
+        self._farthest = []
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._blocks)
+
+    def __contains__(self, hash):
+        return hash in self._blocks
+
+    def __getitem__(self, hash):
+        return self._blocks[hash]
+
+    def Add(self, block, height):
+        """
+        Add a block if it fits.
+
+        Args:
+            block (neo.Core.Block.Block): the block.
+            height (int): current height of the chain.
+
+        Returns:
+            list: hashes of the blocks dropped from the cache, including the hash of `block` if it was refused.
+        """
+        hash = block.Hash.ToBytes()
+        with self._lock:
+            return self._Add(block, hash, height)
+
+    def _Add(self, block, hash, height):
+        if hash in self._blocks or block.Index <= height:
+            return []
+
+        if self.Window and block.Index > height + self.Window:
+            self.Refused += 1
+            return [hash]
+
+        size = block.Size()
+        dropped = []
+
+        while self.MaxBytes and self.Bytes + size > self.MaxBytes and self._blocks:
+            farthest_index, farthest_hash = self._Farthest()
+            if farthest_index < block.Index:
+                self.Refused += 1
+                dropped.append(hash)
+                return dropped
+
+            self.Pop(farthest_hash)
+            self.Evictions += 1
+            dropped.append(farthest_hash)
+
+        self._blocks[hash] = block
+        self._sizes[hash] = size
+        self.Bytes += size
+        heapq.heappush(self._farthest, (-block.Index, hash))
+
+        return dropped
+
+    def Pop(self, hash):
+        """
+        Remove a block.
+
+        Args:
+            hash (bytes): hash of the block.
+
+        Returns:
+            neo.Core.Block.Block: the block or None if it is not cached.
+        """
+        with self._lock:
+            block = self._blocks.pop(hash, None)
+            if block is not None:
+                self.Bytes -= self._sizes.pop(hash)
+
+                # persisted blocks have the lowest index and never come up, drop their entries once they pile up
+                if len(self._farthest) > 2 * len(self._blocks) + 64:
+                    self._farthest = [(-b.Index, h) for h, b in self._blocks.items()]
+                    heapq.heapify(self._farthest)
+            return block
+
+    def Clear(self):
+        """
+        Remove all cached blocks.
+        """
+        with self._lock:
+            self._blocks = {}
+            self._sizes = {}
+            self._farthest = []
+            self.Bytes = 0
+
+    def _Farthest(self):
+        # called with the lock held
+        while True:
+            index, hash = self._farthest[0]
+            if hash in self._blocks:
+                return -index, hash
+            heapq.heappop(self._farthest)
+
+    def ToJson(self):
+        """
+        Convert the cache statistics to a dictionary that can be parsed as JSON.
+
+        Returns:
+             dict:
+        """
+        return {
+            'items': len(self._blocks),
+            'bytes': self.Bytes,
+            'max_bytes': self.MaxBytes,
+            'window': self.Window,
+            'evictions': self.Evictions,
+            'refused': self.Refused
+        }
@@ -0,0 +1,226 @@
+import threading
+from neo.Core.Header import Header
+from neo.Core.Witness import Witness
+from neo.Core.State.CoinState import CoinState
+from neo.Core.State.UnspentCoinState import UnspentCoinState
+from neo.Core.State.SpentCoinState import SpentCoinState
+from neo.IO.MemoryStream import StreamManager
+from neocore.IO.BinaryReader import BinaryReader
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Implementations.Blockchains.LevelDB.DBSchema import DBSchema
+from neo.logging import log_manager
+
+logger = log_manager.getLogger('db')
+
+
+class BlockPruner:
+    """
+    Drops the bodies of blocks more than `keep_blocks` blocks below the chain height, on a background thread.
+
+    A pruned block record keeps the system fee and the header, in the same format as the record of a header
+    without a block. The transactions of a pruned block are reduced to a stub holding the height of their block
+    as soon as all of their outputs are spent and claimed, and their output index entries are deleted. State
+    records under `ST_*` are left untouched.
+
+    Transactions that still have unspent or unclaimed outputs when their block is pruned are listed under
+    `IX_PruneRetained` and checked again on later passes. `SYS_PrunedHeight` holds the height of the last pruned
+    block and is written in the same batch as the block, so an interrupted pass continues where it stopped.
+    """
+
+    # transaction records of pruned transactions only hold the height of their block
+    STUB_SIZE = 4
+
+    # number of pruned blocks after which the pruned key ranges are compacted
+    COMPACTION_INTERVAL = 100000
+
+    def __init__(self, db, raw, header_index, keep_blocks, batch_size=1000):
+        """
+        Create an instance.
+
+        Args:
+            db (StorageBackend): chain database. The pruner writes to it directly, it must not be a `DBOverlay`.
+            raw (bool): value encoding of `db`, see `DBSchema`.
+            header_index (HeaderIndex): block hashes by height.
+            keep_blocks (int): number of most recent blocks to keep in full.
+            batch_size (int): number of blocks, or retained transactions, per write batch.
+        """
+        self.KeepBlocks = keep_blocks
+        self.BatchSize = batch_size
+
+        self._db = db
+        self._raw = raw
+        self._header_index = header_index
+
+        # key of the retained transaction the next check continues from
+        self._retained_cursor = None
+
+        self._uncompacted = 0
+
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._thread = None
+
+    @staticmethod
+    def PrunedHeight(db):
+        """
+        Get the height of the last pruned block.
+
+        Args:
+            db (StorageBackend): chain database or snapshot.
+
+        Returns:
+            int: -1 if no block is pruned.
+        """
+        value = db.get(DBPrefix.SYS_PrunedHeight)
+        if value is None:
+            return -1
+        return int.from_bytes(value, 'little')
+
+    def Start(self):
+        """
+        Start the background thread. It prunes whenever `Notify` is called.
+        """
+        self._thread = threading.Thread(target=self._Run, name='BlockPruner', daemon=True)
+        self._thread.start()
+
+    def Notify(self):
+        """
+        Signal that new blocks were written.
+        """
+        self._wakeup.set()
+
+    def Stop(self):
+        """
+        Stop the background thread, waiting for the current write batch to finish.
+        """
+        self._stopped = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _Run(self):
+        while not self._stopped:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            try:
+                self.Prune()
+            except Exception as e:
+                logger.error("Could not prune blocks: %s" % e)
+
+    def Prune(self):
+        """
+        Prune all blocks below the kept range and check the retained transactions once.
+
+        Returns:
+            int: the number of blocks pruned.
+        """
+        value = self._db.get(DBPrefix.SYS_CurrentBlock)
+        if value is None:
+            return 0
+        limit = int.from_bytes(value[-4:], 'little') - self.KeepBlocks
+
+        count = 0
+
+        # the genesis block is kept, it holds the registration of the system assets
+        height = max(self.PrunedHeight(self._db), 0)
+        while height < limit and not self._stopped:
+            pruned = self._PruneBlocks(height + 1, min(limit, height + self.BatchSize))
+            if pruned == 0:
+                break
+            count += pruned
+            height += pruned
+
+        self._CheckRetained()
+
+        if count:
+            logger.debug("Pruned blocks up to height %s" % height)
+
+            # the deleted data is only reclaimed by compactions, which would otherwise not reach old key ranges soon
+            self._uncompacted += count
+            if self._uncompacted >= self.COMPACTION_INTERVAL:
+                self._db.compact_range(start=DBPrefix.DATA_Block, stop=DBPrefix.ST_Account)
+                self._db.compact_range(start=DBPrefix.IX_Output, stop=DBPrefix.IX_AddressUnspent)
+                self._uncompacted = 0
+
+        return count
+
+    def _PruneBlocks(self, start, end):
+        count = 0
+        with self._db.write_batch() as wb:
+            for height in range(start, end + 1):
+                if height >= len(self._header_index):
+                    break
+
+                block_hash = self._header_index[height]
+                value = self._db.get(DBPrefix.DATA_Block + block_hash)
+                if value is None:
+                    break
+
+                header, tx_hashes = self._ReadTrimmedBlock(DBSchema.Decode(value[8:], self._raw))
+                wb.put(DBPrefix.DATA_Block + block_hash, value[:8] + DBSchema.Serialize(header, self._raw))
+
+                for tx_hash in tx_hashes:
+                    if not self._PruneTransaction(wb, tx_hash, height):
+                        wb.put(DBPrefix.IX_PruneRetained + tx_hash, b'')
+
+                wb.put(DBPrefix.SYS_PrunedHeight, height.to_bytes(4, 'little'))
+                count += 1
+
+        return count
+
+    def _CheckRetained(self):
+        if self._retained_cursor is None:
+            keys = self._db.iterator(prefix=DBPrefix.IX_PruneRetained, include_value=False)
+        else:
+            stop = bytes([DBPrefix.IX_PruneRetained[0] + 1])
+            keys = self._db.iterator(start=self._retained_cursor, stop=stop, include_value=False)
+
+        self._retained_cursor = None
+        with self._db.write_batch() as wb:
+            for i, key in enumerate(keys):
+                if i == self.BatchSize:
+                    self._retained_cursor = key
+                    break
+
+                tx_hash = key[1:]
+                value = self._db.get(DBPrefix.DATA_Transaction + tx_hash)
+                if value is None or self._PruneTransaction(wb, tx_hash, int.from_bytes(value[:4], 'little')):
+                    wb.delete(key)
+
+    def _PruneTransaction(self, wb, tx_hash, height):
+        coin = self._GetState(DBPrefix.ST_Coin, UnspentCoinState, tx_hash)
+        if coin is not None and any(item & CoinState.Spent == 0 for item in coin.Items):
+            return False
+
+        spent = self._GetState(DBPrefix.ST_SpentCoin, SpentCoinState, tx_hash)
+        if spent is not None and len(spent.Items):
+            return False
+
+        wb.put(DBPrefix.DATA_Transaction + tx_hash, height.to_bytes(4, 'little'))
+        for key in self._db.iterator(prefix=DBPrefix.IX_Output + tx_hash, include_value=False):
+            wb.delete(key)
+        return True
+
+    def _GetState(self, prefix, classref, key):
+        value = self._db.get(prefix + key)
+        if value is None:
+            return None
+        return classref.DeserializeFromDB(DBSchema.Decode(value, self._raw))
+
+    @staticmethod
+    def _ReadTrimmedBlock(data):
+        ms = StreamManager.GetReader(data)
+        reader = BinaryReader(ms)
+
+        header = Header()
+        header.DeserializeUnsigned(reader)
+        reader.ReadByte()
+        witness = Witness()
+        witness.Deserialize(reader)
+        header.Script = witness
+
+        tx_hashes = [tx_hash.encode('utf-8') for tx_hash in reader.ReadHashes()]
+
+        StreamManager.ReleaseStream(ms)
+        return header, tx_hashes
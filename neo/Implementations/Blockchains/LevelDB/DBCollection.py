@@ -1,5 +1,5 @@
-import binascii
 from neo.SmartContract.Iterable import EnumeratorBase
+from neo.Implementations.Blockchains.LevelDB.DBSchema import DBSchema
 from neo.logging import log_manager
 
 logger = log_manager.getLogger('db')
@@ -13,8 +13,9 @@ class DBCollection:
 
     Collection = {}
 
-    Changed = []
-    Deleted = []
+    # insertion ordered sets of keys, the values are unused
+    Changed = {}
+    Deleted = {}
 
     _built_keys = False
 
@@ -23,21 +24,48 @@ class DBCollection:
     _ChangedResetState = None
     _DeletedResetState = None
 
-    def __init__(self, db, prefix, class_ref):
+    _raw = True
+
+    _cache = None
+
+    _index = None
+
+    def __init__(self, db, prefix, class_ref, raw=None, cache=None, index=None):
+        """
+        Create an instance.
+
+        Args:
+            db (plyvel.DB): database to read from.
+            prefix (bytes): `DBPrefix` of the records in this collection.
+            class_ref (class): state class the records deserialize into.
+            raw (bool): (Optional) value encoding of `db`, see `DBSchema`. Detected from `db` if not given.
+            cache (StateCache): (Optional) cross block cache to read objects from and stage commits into.
+                Only for collections that commit into the write batch of the block being persisted.
+            index (SearchIndex): (Optional) index to add new records to and remove deleted records from on commit.
+        """
 
         self.DB = db
 
+        if raw is None:
+            raw = DBSchema.IsRaw(db)
+        self._raw = raw
+
         self.Prefix = prefix
 
         self.ClassRef = class_ref
 
         self.Collection = {}
-        self.Changed = []
-        self.Deleted = []
+        self.Changed = {}
+        self.Deleted = {}
 
         self._ChangedResetState = None
         self._DeletedResetState = None
 
+        if cache is not None and cache.Enabled:
+            self._cache = cache
+
+        self._index = index
+
     @property
     def Keys(self):
         if not self._built_keys:
@@ -61,7 +89,7 @@ class DBCollection:
     def _BuildCollectionKeys(self):
         for key in self.DB.iterator(prefix=self.Prefix, include_value=False):
             key = key[1:]
-            if key not in self.Collection.keys():
+            if key not in self.Collection:
                 self.Collection[key] = None
 
     def Commit(self, wb, destroy=True):
@@ -69,21 +97,29 @@ class DBCollection:
         for keyval in self.Changed:
             item = self.Collection[keyval]
             if item:
+                if self._index is not None:
+                    self._index.Put(self.DB, wb or self.DB, keyval, item)
                 if not wb:
-                    self.DB.put(self.Prefix + keyval, self.Collection[keyval].ToByteArray())
+                    self.DB.put(self.Prefix + keyval, DBSchema.Serialize(item, self._raw))
                 else:
-                    wb.put(self.Prefix + keyval, self.Collection[keyval].ToByteArray())
+                    wb.put(self.Prefix + keyval, DBSchema.Serialize(item, self._raw))
+                if self._cache is not None:
+                    self._cache.Stage(self.Prefix + keyval, item)
         for keyval in self.Deleted:
+            if self._index is not None:
+                self._index.Remove(self.DB, wb or self.DB, keyval)
             if not wb:
                 self.DB.delete(self.Prefix + keyval)
             else:
                 wb.delete(self.Prefix + keyval)
             self.Collection[keyval] = None
+            if self._cache is not None:
+                self._cache.Stage(self.Prefix + keyval, None)
         if destroy:
             self.Destroy()
         else:
-            self.Changed = []
-            self.Deleted = []
+            self.Changed = {}
+            self.Deleted = {}
             self._ChangedResetState = None
             self._DeletedResetState = None
 
@@ -114,8 +150,7 @@ class DBCollection:
 
         item = new_instance
 
-        if keyval in self.Deleted:
-            self.Deleted.remove(keyval)
+        self.Deleted.pop(keyval, None)
 
         self.Add(keyval, item)
 
@@ -130,8 +165,7 @@ class DBCollection:
 
         item = new_instance
 
-        if keyval in self.Deleted:
-            self.Deleted.remove(keyval)
+        self.Deleted.pop(keyval, None)
 
         self.Add(keyval, item)
 
@@ -145,34 +179,35 @@ class DBCollection:
         if keyval in self.Deleted:
             return None
 
-        if keyval in self.Collection.keys():
+        if keyval in self.Collection:
             item = self.Collection[keyval]
             if item is None:
                 item = self._GetItem(keyval)
             self.MarkChanged(keyval)
             return item
 
-        # otherwise, chekc in the database
-        key = self.DB.get(self.Prefix + keyval)
+        # otherwise, check in the cache and the database
+        item = self._GetItem(keyval)
 
-        # if the key is there, get the item
-        if key is not None:
+        if item is not None:
             self.MarkChanged(keyval)
 
-            item = self._GetItem(keyval)
-
-            return item
-
-        return None
+        return item
 
     def _GetItem(self, keyval):
         if keyval in self.Deleted:
             return None
 
+        if self._cache is not None:
+            item = self._cache.Get(self.Prefix + keyval)
+            if item is not None:
+                self.Collection[keyval] = item
+                return item
+
         try:
             buffer = self.DB.get(self.Prefix + keyval)
             if buffer:
-                item = self.ClassRef.DeserializeFromDB(binascii.unhexlify(buffer))
+                item = self.ClassRef.DeserializeFromDB(DBSchema.Decode(buffer, self._raw))
                 self.Collection[keyval] = item
                 return item
             return None
@@ -186,39 +221,68 @@ class DBCollection:
         self.MarkChanged(keyval)
 
     def Remove(self, keyval):
-        if keyval not in self.Deleted:
-            self.Deleted.append(keyval)
+        self.Deleted[keyval] = None
 
     def MarkForReset(self):
+        # the reset state references the current tracking sets instead of copying them
         self._ChangedResetState = self.Changed
         self._DeletedResetState = self.Deleted
 
     def MarkChanged(self, keyval):
-        if keyval not in self.Changed:
-            self.Changed.append(keyval)
+        self.Changed[keyval] = None
+        if self._cache is not None:
+            self._cache.Touch(self.Prefix + keyval)
 
     def TryFind(self, key_prefix):
-        candidates = {}
-        for keyval in self.Collection.keys():
-            # See if we find a partial match in the keys that not have been committed yet, excluding those that are to be deleted
-            if key_prefix in keyval and keyval not in self.Deleted:
-                candidates[keyval[20:]] = self.Collection[keyval].Value
+        """
+        Iterate over the storage items whose key starts with `key_prefix`, including the changes not committed yet.
+
+        The stored records and the pending items are merged in key order while iterating, stored values are only
+        deserialized once they are reached. The pending items and the stored records are captured when the iterator
+        is created.
+
+        Args:
+            key_prefix (bytes): script hash of the contract followed by the prefix of the storage keys.
+
+        Returns:
+            EnumeratorBase: of (key, value) tuples, the key without the script hash.
+        """
+        pending = sorted((keyval, item.Value) for keyval, item in self.Collection.items()
+                         if item is not None and keyval.startswith(key_prefix) and keyval not in self.Deleted)
+        deleted = {keyval for keyval in self.Deleted if keyval.startswith(key_prefix)}
+        stored = self.DB.iterator(prefix=self.Prefix + key_prefix)
+
+        return EnumeratorBase(self._MergeFind(stored, pending, deleted))
+
+    def _MergeFind(self, stored, pending, deleted):
+        prefix_len = len(self.Prefix)
+        pending = iter(pending)
+
+        key, value = next(stored, (None, None))
+        keyval, pending_value = next(pending, (None, None))
 
-        db_results = self.Find(key_prefix)
+        while key is not None or keyval is not None:
+            if key is not None:
+                stored_keyval = key[prefix_len:]
+                if keyval is None or stored_keyval < keyval:
+                    if stored_keyval not in deleted:
+                        yield stored_keyval[20:], self.ClassRef.DeserializeFromDB(DBSchema.Decode(value, self._raw)).Value
+                    key, value = next(stored, (None, None))
+                    continue
 
-        # {**x, **y} merges two dictionaries, with the values of y overwriting the vals of x
-        # withouth this merge, you sometimes get 2 results for each key
-        # then take the dict and make a list of tuples
-        final_collection = [(k, v) for k, v in {**db_results, **candidates}.items()]
+                # the pending item replaces the stored one
+                if stored_keyval == keyval:
+                    key, value = next(stored, (None, None))
 
-        return EnumeratorBase(iter(final_collection))
+            yield keyval[20:], pending_value
+            keyval, pending_value = next(pending, (None, None))
 
     def Find(self, key_prefix):
         key_prefix = self.Prefix + key_prefix
         res = {}
         for key, val in self.DB.iterator(prefix=key_prefix):
             # we want the storage item, not the raw bytes
-            item = self.ClassRef.DeserializeFromDB(binascii.unhexlify(val)).Value
+            item = self.ClassRef.DeserializeFromDB(DBSchema.Decode(val, self._raw)).Value
             # also here we need to skip the 1 byte storage prefix
             res_key = key[21:]
             res[res_key] = item
@@ -233,4 +297,5 @@ class DBCollection:
         self.Changed = None
         self._ChangedResetState = None
         self._DeletedResetState = None
+        self._cache = None
         logger = None
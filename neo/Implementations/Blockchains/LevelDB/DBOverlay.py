@@ -0,0 +1,185 @@
+import threading
+
+_MISSING = object()
+
+
+class DBOverlay:
+    """
+    In-memory layer of pending writes on top of a plyvel database.
+
+    The overlay offers the subset of the plyvel API used by the blockchain (`get`, `put`, `delete`, `iterator` and
+    `write_batch`) so it can stand in for the database while several blocks are persisted. Reads see the pending
+    writes; nothing reaches the database until `Flush` writes them all in a single write batch.
+
+    Unlike plyvel's default write batches, a batch obtained from `write_batch` is discarded if its context exits
+    with an exception, so a block that fails to persist leaves no partial state behind.
+    """
+
+    def __init__(self, db, marker=None):
+        """
+        Create an instance.
+
+        Args:
+            db (plyvel.DB): the database to write to on `Flush`.
+            marker (bytes): (Optional) key that is written after all other keys on `Flush`.
+        """
+        self.DB = db
+        self.Marker = marker
+
+        self._changes = {}
+        self._lock = threading.RLock()
+        self._detached = False
+
+    def __len__(self):
+        return len(self._changes)
+
+    def get(self, key, default=None):
+        value = self._changes.get(key, _MISSING)
+        if value is _MISSING:
+            return self.DB.get(key, default)
+        return default if value is None else value
+
+    def put(self, key, value):
+        self._Update({key: value})
+
+    def delete(self, key):
+        self._Update({key: None})
+
+    def _Update(self, changes):
+        with self._lock:
+            if not self._detached:
+                self._changes.update(changes)
+                return
+
+            # writes through references taken before the overlay was detached go straight to the database
+            with self.DB.write_batch() as wb:
+                for key, value in changes.items():
+                    if value is None:
+                        wb.delete(key)
+                    else:
+                        wb.put(key, value)
+
+    def iterator(self, prefix=b'', include_value=True, start=None, stop=None):
+        """
+        Iterate over the database merged with the pending writes, in key order.
+
+        Args:
+            prefix (bytes): (Optional) only include keys starting with this prefix.
+            include_value (bool): (Optional) yield (key, value) tuples instead of keys.
+            start (bytes): (Optional) first key of the range to include. Cannot be combined with `prefix`.
+            stop (bytes): (Optional) end of the range to include, not included itself.
+
+        Returns:
+            generator:
+        """
+        def in_range(key):
+            return key.startswith(prefix) and (start is None or key >= start) and (stop is None or key < stop)
+
+        with self._lock:
+            pending = sorted((key, value) for key, value in self._changes.items() if in_range(key))
+
+        if start is None and stop is None:
+            stored = self.DB.iterator(prefix=prefix)
+        else:
+            stored = self.DB.iterator(start=start, stop=stop)
+
+        merged = self._Merge(stored, pending)
+        if include_value:
+            return merged
+        return (key for key, value in merged)
+
+    @staticmethod
+    def _Merge(stored, pending):
+        pending = iter(pending)
+        change = next(pending, None)
+
+        for key, value in stored:
+            while change is not None and change[0] < key:
+                if change[1] is not None:
+                    yield change
+                change = next(pending, None)
+
+            if change is not None and change[0] == key:
+                if change[1] is not None:
+                    yield change
+                change = next(pending, None)
+            else:
+                yield key, value
+
+        while change is not None:
+            if change[1] is not None:
+                yield change
+            change = next(pending, None)
+
+    def write_batch(self):
+        return OverlayBatch(self)
+
+    def Flush(self):
+        """
+        Write all pending changes to the database in one write batch, with the marker key last.
+
+        Returns:
+            int: the number of keys written or deleted.
+        """
+        # pending changes stay readable until the database holds them
+        with self._lock:
+            changes = dict(self._changes)
+            marker = changes.pop(self.Marker, None) if self.Marker is not None else None
+
+            with self.DB.write_batch() as wb:
+                for key, value in changes.items():
+                    if value is None:
+                        wb.delete(key)
+                    else:
+                        wb.put(key, value)
+
+                if marker is not None:
+                    wb.put(self.Marker, marker)
+
+            self._changes = {}
+
+        return len(changes) + (1 if marker is not None else 0)
+
+    def Detach(self):
+        """
+        Flush the pending changes and pass all later writes directly to the database.
+
+        Returns:
+            plyvel.DB: the underlying database.
+        """
+        with self._lock:
+            self.Flush()
+            self._detached = True
+        return self.DB
+
+    def close(self):
+        self.Detach().close()
+
+
+class OverlayBatch:
+    """
+    Write batch of a `DBOverlay`, merged into the overlay when its context exits without an exception.
+    """
+
+    def __init__(self, overlay):
+        self._overlay = overlay
+        self._changes = {}
+
+    def put(self, key, value):
+        self._changes[key] = value
+
+    def delete(self, key):
+        self._changes[key] = None
+
+    def write(self):
+        self._overlay._Update(self._changes)
+        self._changes = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.write()
+        else:
+            self._changes = {}
@@ -12,7 +12,15 @@ class DBPrefix:
     ST_Storage = b'\x70'
 
     IX_HeaderHashList = b'\x80'
+    IX_Output = b'\x81'
+    IX_AddressUnspent = b'\x82'
+    IX_PruneRetained = b'\x83'
+    IX_Search = b'\x84'
 
     SYS_CurrentBlock = b'\xc0'
     SYS_CurrentHeader = b'\xc1'
+    SYS_OutputIndex = b'\xc2'
+    SYS_AddressIndex = b'\xc3'
+    SYS_PrunedHeight = b'\xc4'
+    SYS_SearchIndex = b'\xc5'
     SYS_Version = b'\xf0'
@@ -0,0 +1,216 @@
+import binascii
+from neocore.IO.BinaryWriter import BinaryWriter
+from neo.IO.MemoryStream import StreamManager
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.logging import log_manager
+
+logger = log_manager.getLogger('db')
+
+
+class DBSchema:
+    """
+    Describes how values are encoded on disk.
+
+    Databases created before `RAW` store every value as the hexlified output of `MemoryStream.ToArray()`.
+    `RAW` databases store the serialized bytes as is. The `SYS_Version` record tells the two apart.
+    """
+
+    # values are stored hexlified
+    HEX = b'schema v.0.6.9'
+
+    # values are stored as raw serialized bytes
+    RAW = b'schema v.0.7.0'
+
+    VERSIONS = (HEX, RAW)
+
+    # prefixes of records that hold a serialized state object as value
+    STATE_PREFIXES = (DBPrefix.ST_Account, DBPrefix.ST_Coin, DBPrefix.ST_SpentCoin, DBPrefix.ST_Validator,
+                      DBPrefix.ST_Asset, DBPrefix.ST_Contract, DBPrefix.ST_Storage)
+
+    @staticmethod
+    def IsRaw(db):
+        """
+        Determine the value encoding of a database by its `SYS_Version` record.
+
+        Args:
+            db (plyvel.DB): database to inspect.
+
+        Returns:
+            bool: True if values are stored raw. False if they are hexlified.
+        """
+        return db.get(DBPrefix.SYS_Version) != DBSchema.HEX
+
+    @staticmethod
+    def Encode(data, raw):
+        """
+        Encode raw serialized bytes for storage.
+
+        Args:
+            data (bytes): raw serialized data.
+            raw (bool): target encoding.
+
+        Returns:
+            bytes:
+        """
+        if raw:
+            return bytes(data)
+        return binascii.hexlify(data)
+
+    @staticmethod
+    def Decode(data, raw):
+        """
+        Decode a stored value into raw serialized bytes.
+
+        Args:
+            data (bytes, bytearray): value as read from the database.
+            raw (bool): encoding of `data`.
+
+        Returns:
+            bytes:
+        """
+        if raw:
+            return data
+        return binascii.unhexlify(data)
+
+    @staticmethod
+    def Serialize(serializable, raw):
+        """
+        Serialize an object for storage.
+
+        Args:
+            serializable (neocore.IO.Mixins.SerializableMixin): object to serialize.
+            raw (bool): target encoding.
+
+        Returns:
+            bytes:
+        """
+        ms = StreamManager.GetStream()
+        writer = BinaryWriter(ms)
+        serializable.Serialize(writer)
+        if raw:
+            retVal = ms.getvalue()
+        else:
+            retVal = ms.ToArray()
+        StreamManager.ReleaseStream(ms)
+        return retVal
+
+    @staticmethod
+    def SerializeHeaderHashList(hashes, raw):
+        """
+        Serialize a chunk of the header hash index.
+
+        Args:
+            hashes (list): of hex encoded header hashes (64 bytes each).
+            raw (bool): target encoding.
+
+        Returns:
+            bytes:
+        """
+        ms = StreamManager.GetStream()
+        writer = BinaryWriter(ms)
+        writer.Write2000256List(hashes)
+        if raw:
+            retVal = ms.getvalue()
+        else:
+            retVal = ms.ToArray()
+        StreamManager.ReleaseStream(ms)
+        return retVal
+
+    @staticmethod
+    def DeserializeHeaderHashList(data, raw):
+        """
+        Deserialize a chunk of the header hash index.
+
+        Args:
+            data (bytes): value as read from the database.
+            raw (bool): encoding of `data`.
+
+        Returns:
+            list: of hex encoded header hashes (64 bytes each).
+        """
+        data = DBSchema.Decode(data, raw)
+        hashes = []
+        for offset in range(0, len(data), 32):
+            ba = bytearray(data[offset:offset + 32])
+            ba.reverse()
+            hashes.append(ba.hex().encode('utf-8'))
+        return hashes
+
+    @staticmethod
+    def ConvertValue(key, value):
+        """
+        Convert a single record of a `HEX` database to the `RAW` encoding.
+
+        Args:
+            key (bytes): database key including the prefix.
+            value (bytes): hexlified value.
+
+        Returns:
+            bytes: the value in `RAW` encoding.
+        """
+        prefix = key[0:1]
+
+        if prefix == DBPrefix.DATA_Block:
+            # 8 byte system fee followed by the trimmed block
+            return value[:8] + binascii.unhexlify(value[8:])
+
+        if prefix == DBPrefix.DATA_Transaction:
+            # 4 byte block height followed by the transaction
+            return value[:4] + binascii.unhexlify(value[4:])
+
+        if prefix in DBSchema.STATE_PREFIXES or prefix == DBPrefix.IX_HeaderHashList:
+            return binascii.unhexlify(value)
+
+        return value
+
+    @staticmethod
+    def Migrate(source, target, batch_size=10000, progress=None):
+        """
+        Stream all records of a `HEX` database into an empty database using the `RAW` encoding.
+
+        The `SYS_Version` record is written last, so an interrupted migration leaves `target` without a version
+        and it will not be mistaken for a complete chain.
+
+        Args:
+            source (plyvel.DB): database in `HEX` encoding. Should not be written to while migrating.
+            target (plyvel.DB): empty destination database.
+            batch_size (int): number of records per write batch.
+            progress (callable): (Optional) called with the number of records converted after every batch.
+
+        Raises:
+            ValueError: if `source` is not a `HEX` database.
+
+        Returns:
+            int: the number of records converted.
+        """
+        version = source.get(DBPrefix.SYS_Version)
+        if version != DBSchema.HEX:
+            raise ValueError("Cannot migrate database with schema %s, expected %s" % (version, DBSchema.HEX))
+
+        count = 0
+        snapshot = source.snapshot()
+        wb = target.write_batch()
+        try:
+            for key, value in snapshot.iterator():
+                if key == DBPrefix.SYS_Version:
+                    continue
+
+                wb.put(key, DBSchema.ConvertValue(key, value))
+                count += 1
+
+                if count % batch_size == 0:
+                    wb.write()
+                    wb = target.write_batch()
+                    if progress:
+                        progress(count)
+
+            wb.write()
+        finally:
+            snapshot.close()
+
+        target.put(DBPrefix.SYS_Version, DBSchema.RAW)
+
+        if progress:
+            progress(count)
+
+        return count
@@ -1,39 +1,39 @@
-from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Implementations.Blockchains.LevelDB.DBOverlay import DBOverlay
 from neo.Blockchain import GetBlockchain
-import plyvel
-from neo.Settings import settings
 from neo.logging import log_manager
 
 logger = log_manager.getLogger('db')
 
 
 class DebugStorage:
+    """
+    Storage for test invocations that must not change the chain, as a copy-on-write layer over the live chain.
+
+    Reads fall through to a read view of the chain, writes are kept in memory by a `DBOverlay` that is never flushed.
+    The view is taken again every time a debug session gets `db`, so the layer follows the chain and the database
+    snapshot under the view is only kept until the next session. `reset` drops the writes.
+    """
     __instance = None
 
     @property
     def db(self):
+        view = GetBlockchain().GetReadView()
+        if view is not self._view:
+            self._view = view
+            self._db.DB = view.DB
         return self._db
 
     def reset(self):
-        for key in self._db.iterator(prefix=DBPrefix.ST_Storage, include_value=False):
-            self._db.delete(key)
-
-    def clone_from_live(self):
-        clone_db = GetBlockchain()._db.snapshot()
-        for key, value in clone_db.iterator(prefix=DBPrefix.ST_Storage, include_value=True):
-            self._db.put(key, value)
+        self._view = GetBlockchain().GetReadView()
+        self._db = DBOverlay(self._view.DB)
 
     def __init__(self):
-
-        try:
-            self._db = plyvel.DB(settings.debug_storage_leveldb_path, create_if_missing=True)
-        except Exception as e:
-            logger.info("DEBUG leveldb unavailable, you may already be running this process: %s " % e)
-            raise Exception('DEBUG Leveldb Unavailable %s ' % e)
+        self._view = None
+        self._db = None
+        self.reset()
 
     @staticmethod
     def instance():
         if not DebugStorage.__instance:
             DebugStorage.__instance = DebugStorage()
-            DebugStorage.__instance.clone_from_live()
         return DebugStorage.__instance
@@ -0,0 +1,236 @@
+import binascii
+import mmap
+import os
+import sys
+from array import array
+
+
+class HeaderIndex:
+    """
+    Header hashes by height, stored in one contiguous buffer of 32 bytes per header.
+
+    Hashes go in and come out hex encoded (64 bytes), like the list of hashes this replaces. Looking up the
+    height of a hash uses an open addressing table of heights keyed by the leading bytes of the hash, so
+    membership tests do not scan the index.
+    """
+
+    HASH_SIZE = 32
+
+    # initial number of slots in the lookup table, always a power of two
+    MIN_SLOTS = 1024
+
+    SNAPSHOT_MAGIC = b'NEOHIDX1'
+
+    # magic, number of headers, number of slots and a caller defined value
+    SNAPSHOT_HEADER_SIZE = 20
+
+    def __init__(self, hashes=None):
+        """
+        Create an instance.
+
+        Args:
+            hashes (iterable): (Optional) hex encoded header hashes to add, ordered by height.
+        """
+        self._data = bytearray()
+        self._count = 0
+        self._slots = array('i', bytes(4 * self.MIN_SLOTS))
+
+        if hashes is not None:
+            self.extend(hashes)
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self._count)
+            if step == 1:
+                return HeaderIndex.FromRaw(self._data[start * self.HASH_SIZE:max(start, stop) * self.HASH_SIZE])
+            return HeaderIndex(self[i] for i in range(start, stop, step))
+
+        if key < 0:
+            key += self._count
+        if key < 0 or key >= self._count:
+            raise IndexError("header index out of range")
+
+        offset = key * self.HASH_SIZE
+        return binascii.hexlify(self._data[offset:offset + self.HASH_SIZE])
+
+    def __iter__(self):
+        for offset in range(0, self._count * self.HASH_SIZE, self.HASH_SIZE):
+            yield binascii.hexlify(self._data[offset:offset + self.HASH_SIZE])
+
+    def __contains__(self, hash):
+        return self.IndexOf(hash) >= 0
+
+    def __eq__(self, other):
+        if isinstance(other, HeaderIndex):
+            return self._data == other._data
+        return list(self) == list(other)
+
+    @staticmethod
+    def FromRaw(data):
+        """
+        Create an instance from the contents of another index.
+
+        Args:
+            data (bytes, bytearray): concatenated 32 byte header hashes as returned by `ToRaw`.
+
+        Returns:
+            HeaderIndex:
+        """
+        index = HeaderIndex()
+        index._AppendRaw([bytes(data[offset:offset + index.HASH_SIZE]) for offset in range(0, len(data), index.HASH_SIZE)])
+        return index
+
+    def ToRaw(self):
+        """
+        Get the contents of the index.
+
+        Returns:
+            bytes: concatenated 32 byte header hashes, ordered by height.
+        """
+        return bytes(self._data)
+
+    def Save(self, path, tag=0):
+        """
+        Write the index, lookup table included, to a snapshot file.
+
+        The file is written next to `path` first and then renamed, so an interrupted write never leaves a
+        truncated snapshot behind.
+
+        Args:
+            path (str): destination file.
+            tag (int): (Optional) unsigned 32 bit value to store with the snapshot, returned by `Load`.
+        """
+        slots = self._slots
+        if sys.byteorder != 'little':
+            slots = array('i', slots)
+            slots.byteswap()
+
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(self.SNAPSHOT_MAGIC + self._count.to_bytes(4, 'little') + len(slots).to_bytes(4, 'little') + tag.to_bytes(4, 'little'))
+            f.write(self._data)
+            slots.tofile(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def Load(path):
+        """
+        Read a snapshot file written by `Save`.
+
+        Args:
+            path (str): snapshot file.
+
+        Raises:
+            ValueError: if the file is not a valid snapshot.
+
+        Returns:
+            tuple: (HeaderIndex, int) the index and the tag it was saved with.
+        """
+        with open(path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                header_size = HeaderIndex.SNAPSHOT_HEADER_SIZE
+                if mm[:8] != HeaderIndex.SNAPSHOT_MAGIC:
+                    raise ValueError("Not a header index snapshot")
+
+                count = int.from_bytes(mm[8:12], 'little')
+                size = int.from_bytes(mm[12:16], 'little')
+                tag = int.from_bytes(mm[16:20], 'little')
+
+                data_end = header_size + count * HeaderIndex.HASH_SIZE
+                if size < HeaderIndex.MIN_SLOTS or size & (size - 1) or count * 2 > size or len(mm) != data_end + size * 4:
+                    raise ValueError("Invalid header index snapshot size")
+
+                slots = array('i')
+                slots.frombytes(mm[data_end:])
+                if sys.byteorder != 'little':
+                    slots.byteswap()
+
+                index = HeaderIndex()
+                index._data = bytearray(mm[header_size:data_end])
+                index._slots = slots
+                index._count = count
+
+        # spot check the lookup table against the hashes
+        for height in {0, count // 2, count - 1}:
+            if count and index.IndexOf(index[height]) != height:
+                raise ValueError("Header index snapshot lookup table does not match its hashes")
+
+        return index, tag
+
+    def IndexOf(self, hash):
+        """
+        Get the height of a header.
+
+        Args:
+            hash (bytes): hex encoded header hash.
+
+        Returns:
+            int: the height of the header, or -1 if it is not in the index.
+        """
+        try:
+            raw = binascii.unhexlify(hash)
+        except (TypeError, ValueError, binascii.Error):
+            return -1
+
+        if len(raw) != self.HASH_SIZE:
+            return -1
+
+        mask = len(self._slots) - 1
+        slot = int.from_bytes(raw[:8], 'little') & mask
+        while True:
+            height = self._slots[slot] - 1
+            if height < 0:
+                return -1
+            offset = height * self.HASH_SIZE
+            if self._data[offset:offset + self.HASH_SIZE] == raw:
+                return height
+            slot = (slot + 1) & mask
+
+    def append(self, hash):
+        self._AppendRaw([binascii.unhexlify(hash)])
+
+    def extend(self, hashes):
+        self._AppendRaw([binascii.unhexlify(hash) for hash in hashes])
+
+    def _AppendRaw(self, hashes):
+        for raw in hashes:
+            if len(raw) != self.HASH_SIZE:
+                raise ValueError("Invalid header hash length %s" % len(raw))
+
+        # keep the table at most half full
+        self._Reserve(self._count + len(hashes))
+
+        height = self._count
+        self._data += b''.join(hashes)
+        self._count += len(hashes)
+        self._Insert(self._slots, hashes, height)
+
+    @staticmethod
+    def _Insert(slots, hashes, height):
+        # a duplicate hash lands further down the probe sequence, so lookups return its lowest height
+        mask = len(slots) - 1
+        for raw in hashes:
+            height += 1
+            slot = int.from_bytes(raw[:8], 'little') & mask
+            while slots[slot]:
+                slot = (slot + 1) & mask
+            slots[slot] = height
+
+    def _Reserve(self, count):
+        size = len(self._slots)
+        while count * 2 > size:
+            size *= 2
+        if size != len(self._slots):
+            self._Resize(size)
+
+    def _Resize(self, size):
+        # fill the new table before swapping it in, so concurrent lookups never see it half built
+        slots = array('i', bytes(4 * size))
+        data = self._data
+        self._Insert(slots, [data[offset:offset + self.HASH_SIZE] for offset in range(0, self._count * self.HASH_SIZE, self.HASH_SIZE)], 0)
+        self._slots = slots
@@ -1,12 +1,8 @@
-import plyvel
-import binascii
-from neo.Core.Blockchain import Blockchain
+import os
+from neo.Core.Blockchain import Blockchain, PrunedDataError
 from neo.Core.Header import Header
 from neo.Core.Block import Block
 from neo.Core.TX.Transaction import Transaction, TransactionType
-from neocore.IO.BinaryWriter import BinaryWriter
-from neocore.IO.BinaryReader import BinaryReader
-from neo.IO.MemoryStream import StreamManager
 from neo.Implementations.Blockchains.LevelDB.DBCollection import DBCollection
 from neo.Implementations.Blockchains.LevelDB.CachedScriptTable import CachedScriptTable
 from neocore.Fixed8 import Fixed8
@@ -22,6 +18,17 @@ from neo.Core.State.ValidatorState import ValidatorState
 from neo.Core.State.ContractState import ContractState
 from neo.Core.State.StorageItem import StorageItem
 from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Implementations.Blockchains.LevelDB.DBSchema import DBSchema
+from neo.Implementations.Blockchains.LevelDB.StateCache import StateCache
+from neo.Implementations.Blockchains.LevelDB.BlockCache import BlockCache
+from neo.Implementations.Blockchains.LevelDB.BlockPruner import BlockPruner
+from neo.Implementations.Blockchains.LevelDB.DBOverlay import DBOverlay
+from neo.Implementations.Blockchains.LevelDB.OutputIndex import OutputIndex
+from neo.Implementations.Blockchains.LevelDB.AddressIndex import AddressIndex
+from neo.Implementations.Blockchains.LevelDB.SearchIndex import SearchIndex
+from neo.Implementations.Blockchains.LevelDB.HeaderIndex import HeaderIndex
+from neo.Implementations.Blockchains.LevelDB.SysFeeIndex import SysFeeIndex
+from neo.Storage.StorageBackend import StorageBackend
 
 from neo.SmartContract.StateMachine import StateMachine
 from neo.SmartContract.ApplicationEngine import ApplicationEngine
@@ -29,6 +36,7 @@ from neo.SmartContract import TriggerType
 from neocore.Cryptography.Crypto import Crypto
 from neocore.BigInteger import BigInteger
 from neo.EventHub import events
+from neo.Settings import settings
 
 from prompt_toolkit import prompt
 from neo.logging import log_manager
@@ -39,9 +47,10 @@ logger = log_manager.getLogger('db')
 class LevelDBBlockchain(Blockchain):
     _path = None
     _db = None
+    _backend = StorageBackend.LEVELDB
 
-    _header_index = []
-    _block_cache = {}
+    _header_index = None
+    _block_cache = None
 
     _current_block_height = 0
     _stored_header_count = 0
@@ -52,10 +61,40 @@ class LevelDBBlockchain(Blockchain):
 
     # this is the version of the database
     # should not be updated for network version changes
-    _sysversion = b'schema v.0.6.9'
+    _sysversion = DBSchema.RAW
+
+    # value encoding of the opened database, see DBSchema
+    _raw_storage = True
 
     _persisting_block = None
 
+    _state_cache = None
+
+    _output_tx = (None, None, -1)
+
+    # maintain the index of unspent outputs by address, see AddressIndex
+    _address_index = False
+
+    # drops the data of old blocks in pruned mode, see BlockPruner
+    _pruner = None
+
+    # file in the chain directory holding a snapshot of the header index
+    HEADER_SNAPSHOT = 'header_index.snapshot'
+
+    # rewrite the snapshot at startup once it misses more headers than this
+    HEADER_SNAPSHOT_INTERVAL = 100000
+
+    _header_snapshot_length = 0
+
+    # file in the chain directory holding a snapshot of the system fee index
+    SYSFEE_SNAPSHOT = 'sysfee_index.snapshot'
+
+    _sysfee_index = None
+    _sysfee_snapshot_length = 0
+
+    _read_view = None
+    _read_view_generation = 0
+
     TXProcessed = 0
 
     @property
@@ -98,17 +137,64 @@ class LevelDBBlockchain(Blockchain):
     def Path(self):
         return self._path
 
-    def __init__(self, path, skip_version_check=False, skip_header_check=False):
+    @property
+    def DB(self):
+        """
+        The key-value store holding the chain.
+
+        Returns:
+            StorageBackend:
+        """
+        return self._db
+
+    @property
+    def StateCache(self):
+        """
+        Cache of state objects shared by consecutive calls to `Persist`.
+
+        Returns:
+            StateCache:
+        """
+        return self._state_cache
+
+    @property
+    def BlockCache(self):
+        """
+        Blocks received ahead of the chain height, waiting to be persisted.
+
+        Returns:
+            BlockCache:
+        """
+        return self._block_cache
+
+    def __init__(self, path, skip_version_check=False, skip_header_check=False, backend=None):
+        """
+        Open or create the chain database.
+
+        Args:
+            path (str): database location.
+            skip_version_check (bool): accept a database without a known schema version.
+            skip_header_check (bool): do not load the header index.
+            backend (str): (Optional) storage backend to use, see `StorageBackend.Open`. Defaults to the
+                           `StorageBackend` setting.
+        """
         super(LevelDBBlockchain, self).__init__()
         self._path = path
+        self._backend = backend or settings.STORAGE_BACKEND
+        self._address_index = settings.ADDRESS_INDEX
 
-        self._header_index = []
-        self._header_index.append(Blockchain.GenesisBlock().Header.Hash.ToBytes())
+        self._header_index = HeaderIndex([Blockchain.GenesisBlock().Header.Hash.ToBytes()])
 
         self.TXProcessed = 0
 
+        self._state_cache = StateCache(settings.STATE_CACHE_SIZE)
+
+        self._block_cache = BlockCache(settings.BLOCK_CACHE_BYTES, settings.BLOCK_CACHE_WINDOW)
+
+        self._sysfee_index = SysFeeIndex()
+
         try:
-            self._db = plyvel.DB(self._path, create_if_missing=True)
+            self._db = StorageBackend.Open(self._path, self._backend)
             logger.info("Created Blockchain DB at %s " % self._path)
         except Exception as e:
             logger.info("leveldb unavailable, you may already be running this process: %s " % e)
@@ -116,48 +202,62 @@ class LevelDBBlockchain(Blockchain):
 
         version = self._db.get(DBPrefix.SYS_Version)
 
-        if skip_version_check:
+        if skip_version_check and version not in DBSchema.VERSIONS:
             self._db.put(DBPrefix.SYS_Version, self._sysversion)
             version = self._sysversion
 
-        if version == self._sysversion:  # or in the future, if version doesn't equal the current version...
+        if version in DBSchema.VERSIONS:
+
+            self._raw_storage = version == DBSchema.RAW
+            if not self._raw_storage:
+                logger.info("Database uses the hex encoded storage schema %s, use np-migrate-chain to convert it to %s" % (version, self._sysversion))
 
             ba = bytearray(self._db.get(DBPrefix.SYS_CurrentBlock, 0))
             self._current_block_height = int.from_bytes(ba[-4:], 'little')
 
+            if self._db.get(DBPrefix.SYS_OutputIndex) is None:
+                logger.info("Transaction output index is incomplete, use np-migrate-chain --index-outputs to build it")
+
+            if self._db.get(DBPrefix.SYS_AddressIndex) is None:
+                if self._address_index:
+                    logger.info("Address index is incomplete, use np-migrate-chain --index-addresses to build it")
+            elif not self._address_index:
+                # the index is no longer kept up to date
+                self._db.delete(DBPrefix.SYS_AddressIndex)
+                logger.info("Address index disabled, it has to be rebuilt with np-migrate-chain --index-addresses before enabling it again")
+
+            if self._db.get(DBPrefix.SYS_SearchIndex) != SearchIndex.VERSION:
+                logger.info("Building the contract and asset search index...")
+                SearchIndex.Rebuild(self._db, self._raw_storage)
+
             if not skip_header_check:
                 ba = bytearray(self._db.get(DBPrefix.SYS_CurrentHeader, 0))
                 current_header_height = int.from_bytes(ba[-4:], 'little')
                 current_header_hash = bytes(ba[:64].decode('utf-8'), encoding='utf-8')
 
-                hashes = []
+                self.LoadHeaderSnapshot(current_header_height, current_header_hash)
+
+                # load the stored header hash lists not covered by the snapshot
                 try:
-                    for key, value in self._db.iterator(prefix=DBPrefix.IX_HeaderHashList):
-                        ms = StreamManager.GetStream(value)
-                        reader = BinaryReader(ms)
-                        hlist = reader.Read2000256List()
-                        key = int.from_bytes(key[-4:], 'little')
-                        hashes.append({'k': key, 'v': hlist})
-                        StreamManager.ReleaseStream(ms)
+                    genstr = Blockchain.GenesisBlock().Hash.ToBytes()
+                    while True:
+                        value = self._db.get(DBPrefix.IX_HeaderHashList + self._stored_header_count.to_bytes(4, 'little'))
+                        if value is None:
+                            break
+
+                        hlist = DBSchema.DeserializeHeaderHashList(value, self._raw_storage)
+                        known = len(self._header_index) - self._stored_header_count
+                        self._header_index.extend(hash for hash in hlist[known:] if hash != genstr)
+                        self._stored_header_count += len(hlist)
                 except Exception as e:
                     logger.info("Could not get stored header hash list: %s " % e)
 
-                if len(hashes):
-                    hashes.sort(key=lambda x: x['k'])
-                    genstr = Blockchain.GenesisBlock().Hash.ToBytes()
-                    for hlist in hashes:
-
-                        for hash in hlist['v']:
-                            if hash != genstr:
-                                self._header_index.append(hash)
-                            self._stored_header_count += 1
-
                 if self._stored_header_count == 0:
                     logger.info("Current stored headers empty, re-creating from stored blocks...")
                     headers = []
                     for key, value in self._db.iterator(prefix=DBPrefix.DATA_Block):
                         dbhash = bytearray(value)[8:]
-                        headers.append(Header.FromTrimmedData(binascii.unhexlify(dbhash), 0))
+                        headers.append(Header.FromTrimmedData(DBSchema.Decode(dbhash, self._raw_storage), 0))
 
                     headers.sort(key=lambda h: h.Index)
                     for h in headers:
@@ -168,7 +268,7 @@ class LevelDBBlockchain(Blockchain):
                     if len(headers):
                         self.OnAddHeader(headers[-1])
 
-                elif current_header_height > self._stored_header_count:
+                elif current_header_height >= len(self._header_index):
 
                     try:
                         hash = current_header_hash
@@ -184,8 +284,18 @@ class LevelDBBlockchain(Blockchain):
                     except Exception as e:
                         pass
 
+                if len(self._header_index) - self._header_snapshot_length > self.HEADER_SNAPSHOT_INTERVAL:
+                    self.SaveHeaderSnapshot()
+
+                self.LoadSysFeeSnapshot()
+
         elif version is None:
+            self._raw_storage = True
             self.Persist(Blockchain.GenesisBlock())
+            self._db.put(DBPrefix.SYS_OutputIndex, b'\x01')
+            self._db.put(DBPrefix.SYS_SearchIndex, SearchIndex.VERSION)
+            if self._address_index:
+                self._db.put(DBPrefix.SYS_AddressIndex, b'\x01')
             self._db.put(DBPrefix.SYS_Version, self._sysversion)
         else:
             logger.error("\n\n")
@@ -199,14 +309,182 @@ class LevelDBBlockchain(Blockchain):
                     for key, value in self._db.iterator():
                         wb.delete(key)
 
+                self._raw_storage = True
                 self.Persist(Blockchain.GenesisBlock())
+                self._db.put(DBPrefix.SYS_OutputIndex, b'\x01')
+                self._db.put(DBPrefix.SYS_SearchIndex, SearchIndex.VERSION)
+                if self._address_index:
+                    self._db.put(DBPrefix.SYS_AddressIndex, b'\x01')
                 self._db.put(DBPrefix.SYS_Version, self._sysversion)
 
             else:
                 raise Exception("Database schema changed")
 
+        if settings.PRUNE_KEEP_BLOCKS > 0:
+            self._pruner = BlockPruner(self._db, self._raw_storage, self._header_index, settings.PRUNE_KEEP_BLOCKS)
+            self._pruner.Start()
+            self._pruner.Notify()
+        elif BlockPruner.PrunedHeight(self._db) >= 0:
+            logger.info("Blocks up to height %s are pruned and can not be restored" % BlockPruner.PrunedHeight(self._db))
+
+    @property
+    def RawStorage(self):
+        """
+        Flag indicating if the database stores raw serialized values instead of hexlified ones.
+
+        Returns:
+            bool:
+        """
+        return self._raw_storage
+
+    def GetReadView(self):
+        """
+        Get a read only view of the chain as of the last block written to the database.
+
+        The view reads from a database snapshot, so it does not change while later blocks are persisted. Once a
+        block is committed, or a batch flushed when blocks are persisted in batches, the next call takes a new view.
+        Snapshots are only taken when asked for, as they are not free for every backend.
+
+        Returns:
+            LevelDBReadView:
+        """
+        view = self._read_view
+        if view is None:
+            generation = self._read_view_generation
+
+            db = self._db.DB if isinstance(self._db, DBOverlay) else self._db
+            snapshot = db.snapshot()
+
+            # take the height from the snapshot, as blocks persisted meanwhile are not part of it
+            ba = bytearray(snapshot.get(DBPrefix.SYS_CurrentBlock, 0))
+            view = LevelDBReadView(self, snapshot, int.from_bytes(ba[-4:], 'little'))
+
+            # only keep the view if no block was committed while taking it
+            if generation == self._read_view_generation:
+                self._read_view = view
+
+        return view
+
+    def _InvalidateReadView(self):
+        self._read_view_generation += 1
+        self._read_view = None
+
+    def LoadHeaderSnapshot(self, current_header_height, current_header_hash):
+        """
+        Restore the header index from the snapshot file in the chain directory.
+
+        The snapshot is only used if it is consistent with the database: the last stored header hash list it
+        claims must end with the same hash, its last header must be stored at the matching height, and it may
+        not go beyond `SYS_CurrentHeader`.
+
+        Args:
+            current_header_height (int): height stored in `SYS_CurrentHeader`.
+            current_header_hash (bytes): hash stored in `SYS_CurrentHeader`.
+
+        Returns:
+            bool: True if the snapshot was loaded.
+        """
+        path = os.path.join(self._path, self.HEADER_SNAPSHOT)
+        if not os.path.isfile(path):
+            return False
+
+        try:
+            index, stored_count = HeaderIndex.Load(path)
+        except Exception as e:
+            logger.info("Could not read header index snapshot: %s " % e)
+            return False
+
+        length = len(index)
+        valid = 2000 <= stored_count <= length <= current_header_height + 1 and index[0] == self._header_index[0]
+
+        if valid and length == current_header_height + 1:
+            valid = index[-1] == current_header_hash
+
+        if valid:
+            value = self._db.get(DBPrefix.IX_HeaderHashList + (stored_count - 2000).to_bytes(4, 'little'))
+            valid = value is not None and DBSchema.DeserializeHeaderHashList(value, self._raw_storage)[-1] == index[stored_count - 1]
+
+        if valid:
+            header = self.GetHeader(index[-1])
+            valid = header is not None and header.Index == length - 1
+
+        if not valid:
+            logger.info("Header index snapshot does not match the database, ignoring it")
+            return False
+
+        self._header_index = index
+        self._stored_header_count = stored_count
+        self._header_snapshot_length = length
+        return True
+
+    def SaveHeaderSnapshot(self):
+        """
+        Write the header index to the snapshot file in the chain directory, so the next start does not have to
+        rebuild it from the stored header hash lists.
+        """
+        length = len(self._header_index)
+        if self._stored_header_count == 0 or length == self._header_snapshot_length:
+            return
+
+        # nothing to restore it for if the database is not kept on disk
+        if self._backend == StorageBackend.MEMORY:
+            return
+
+        try:
+            self._header_index.Save(os.path.join(self._path, self.HEADER_SNAPSHOT), tag=self._stored_header_count)
+            self._header_snapshot_length = length
+        except Exception as e:
+            logger.info("Could not write header index snapshot: %s " % e)
+
+    def LoadSysFeeSnapshot(self):
+        """
+        Restore the system fee index from the snapshot file in the chain directory.
+
+        The snapshot is only used if it does not go beyond the current block and its last amount matches the one
+        stored with the block at that height.
+
+        Returns:
+            bool: True if the snapshot was loaded.
+        """
+        path = os.path.join(self._path, self.SYSFEE_SNAPSHOT)
+        if not os.path.isfile(path):
+            return False
+
+        try:
+            index = SysFeeIndex.Load(path)
+        except Exception as e:
+            logger.info("Could not read system fee index snapshot: %s " % e)
+            return False
+
+        length = len(index)
+        valid = 0 < length <= self._current_block_height + 1 and length <= len(self._header_index)
+        if valid:
+            valid = index[length - 1] == self.GetSysFeeAmount(self._header_index[length - 1])
+
+        if not valid:
+            logger.info("System fee index snapshot does not match the database, ignoring it")
+            return False
+
+        self._sysfee_index = index
+        self._sysfee_snapshot_length = length
+        return True
+
+    def SaveSysFeeSnapshot(self):
+        """
+        Write the system fee index to the snapshot file in the chain directory.
+        """
+        length = len(self._sysfee_index)
+        if length <= self._sysfee_snapshot_length or self._backend == StorageBackend.MEMORY:
+            return
+
+        try:
+            self._sysfee_index.Save(os.path.join(self._path, self.SYSFEE_SNAPSHOT))
+            self._sysfee_snapshot_length = length
+        except Exception as e:
+            logger.info("Could not write system fee index snapshot: %s " % e)
+
     def GetStates(self, prefix, classref):
-        return DBCollection(self._db, prefix, classref)
+        return DBCollection(self._db, prefix, classref, raw=self._raw_storage)
 
     def GetAccountState(self, address, print_all_accounts=False):
 
@@ -217,26 +495,36 @@ class LevelDBBlockchain(Blockchain):
                 logger.info("could not convert argument to bytes :%s " % e)
                 return None
 
-        accounts = DBCollection(self._db, DBPrefix.ST_Account, AccountState)
+        accounts = DBCollection(self._db, DBPrefix.ST_Account, AccountState, raw=self._raw_storage)
         acct = accounts.TryGet(keyval=address)
 
         return acct
 
     def GetStorageItem(self, storage_key):
-        storages = DBCollection(self._db, DBPrefix.ST_Storage, StorageItem)
+        storages = DBCollection(self._db, DBPrefix.ST_Storage, StorageItem, raw=self._raw_storage)
         item = storages.TryGet(storage_key.ToArray())
         return item
 
+    def _SearchKeys(self, collection, query):
+        # only the states sharing the words of the query need to be checked, if the index is complete
+        if self._db.get(DBPrefix.SYS_SearchIndex) == SearchIndex.VERSION:
+            keys = SearchIndex.Find(self._db, collection.Prefix, query)
+            if keys is not None:
+                return keys
+        return list(collection.Keys)
+
     def SearchContracts(self, query):
         res = []
-        contracts = DBCollection(self._db, DBPrefix.ST_Contract, ContractState)
-        keys = contracts.Keys
+        contracts = DBCollection(self._db, DBPrefix.ST_Contract, ContractState, raw=self._raw_storage)
+        keys = self._SearchKeys(contracts, query)
 
         query = query.casefold()
 
         for item in keys:
 
             contract = contracts.TryGet(keyval=item)
+            if contract is None:
+                continue
             try:
                 if query in contract.Name.decode('utf-8').casefold():
                     res.append(contract)
@@ -253,7 +541,7 @@ class LevelDBBlockchain(Blockchain):
 
     def ShowAllContracts(self):
 
-        contracts = DBCollection(self._db, DBPrefix.ST_Contract, ContractState)
+        contracts = DBCollection(self._db, DBPrefix.ST_Contract, ContractState, raw=self._raw_storage)
         keys = contracts.Keys
         return keys
 
@@ -266,18 +554,18 @@ class LevelDBBlockchain(Blockchain):
                 logger.info("could not convert argument to bytes :%s " % e)
                 return None
 
-        contracts = DBCollection(self._db, DBPrefix.ST_Contract, ContractState)
+        contracts = DBCollection(self._db, DBPrefix.ST_Contract, ContractState, raw=self._raw_storage)
         contract = contracts.TryGet(keyval=hash)
         return contract
 
     def GetAllSpentCoins(self):
-        coins = DBCollection(self._db, DBPrefix.ST_SpentCoin, SpentCoinState)
+        coins = DBCollection(self._db, DBPrefix.ST_SpentCoin, SpentCoinState, raw=self._raw_storage)
 
         return coins.Keys
 
     def GetUnspent(self, hash, index):
 
-        coins = DBCollection(self._db, DBPrefix.ST_Coin, UnspentCoinState)
+        coins = DBCollection(self._db, DBPrefix.ST_Coin, UnspentCoinState, raw=self._raw_storage)
 
         state = coins.TryGet(hash)
 
@@ -287,16 +575,16 @@ class LevelDBBlockchain(Blockchain):
             return None
         if state.Items[index] & CoinState.Spent > 0:
             return None
-        tx, height = self.GetTransaction(hash)
+        output, height = self.GetOutput(hash, index)
 
-        return tx.outputs[index]
+        return output
 
     def GetSpentCoins(self, tx_hash):
 
         if type(tx_hash) is not bytes:
             tx_hash = bytes(tx_hash.encode('utf-8'))
 
-        coins = DBCollection(self._db, DBPrefix.ST_SpentCoin, SpentCoinState)
+        coins = DBCollection(self._db, DBPrefix.ST_SpentCoin, SpentCoinState, raw=self._raw_storage)
         result = coins.TryGet(keyval=tx_hash)
 
         return result
@@ -305,40 +593,58 @@ class LevelDBBlockchain(Blockchain):
 
         unspents = []
 
-        unspentcoins = DBCollection(self._db, DBPrefix.ST_Coin, UnspentCoinState)
+        unspentcoins = DBCollection(self._db, DBPrefix.ST_Coin, UnspentCoinState, raw=self._raw_storage)
 
         state = unspentcoins.TryGet(keyval=hash.ToBytes())
 
         if state:
-            tx, height = self.GetTransaction(hash)
-
             for index, item in enumerate(state.Items):
                 if item & CoinState.Spent == 0:
-                    unspents.append(tx.outputs[index])
+                    output, height = self.GetOutput(hash, index)
+                    unspents.append(output)
         return unspents
 
-    def GetUnclaimed(self, hash):
+    def GetAddressUnspents(self, script_hash, start=None, count=None):
+        """
+        Iterate over the unspent outputs of an address, a page at a time.
 
-        tx, height = self.GetTransaction(hash)
+        Args:
+            script_hash (UInt160): address to list the outputs of.
+            start (CoinReference): (Optional) continue after this output, usually the last one of the previous page.
+            count (int): (Optional) maximum number of outputs to return.
 
-        if tx is None:
-            return None
+        Raises:
+            Exception: if the address index is not enabled or not complete.
+
+        Returns:
+            generator: of (CoinReference, TransactionOutput, int) tuples, the last item being the height of the block
+                holding the output.
+        """
+        if self._db.get(DBPrefix.SYS_AddressIndex) is None:
+            raise Exception("Address index not available, enable AddressIndex and build it with np-migrate-chain --index-addresses")
+
+        return AddressIndex.Find(self._db, script_hash, start, count)
+
+    def GetUnclaimed(self, hash):
 
         out = {}
-        coins = DBCollection(self._db, DBPrefix.ST_SpentCoin, SpentCoinState)
+        coins = DBCollection(self._db, DBPrefix.ST_SpentCoin, SpentCoinState, raw=self._raw_storage)
 
         state = coins.TryGet(keyval=hash.ToBytes())
 
         if state:
             for item in state.Items:
-                out[item.index] = SpentCoin(tx.outputs[item.index], height, item.height)
+                output, height = self.GetOutput(hash, item.index)
+                out[item.index] = SpentCoin(output, height, item.height)
+
+        elif not self.ContainsTransaction(hash):
+            return None
 
         return out
 
     def SearchAssetState(self, query):
         res = []
-        assets = DBCollection(self._db, DBPrefix.ST_Asset, AssetState)
-        keys = assets.Keys
+        assets = DBCollection(self._db, DBPrefix.ST_Asset, AssetState, raw=self._raw_storage)
 
         if query.lower() == "neo":
             query = "AntShare"
@@ -346,8 +652,12 @@ class LevelDBBlockchain(Blockchain):
         if query.lower() in {"gas", "neogas"}:
             query = "AntCoin"
 
+        keys = self._SearchKeys(assets, query)
+
         for item in keys:
             asset = assets.TryGet(keyval=item)
+            if asset is None:
+                continue
             if query in asset.Name.decode('utf-8'):
                 res.append(asset)
             elif query in Crypto.ToAddress(asset.Issuer):
@@ -366,19 +676,31 @@ class LevelDBBlockchain(Blockchain):
                 logger.info("could not convert argument to bytes :%s " % e)
                 return None
 
-        assets = DBCollection(self._db, DBPrefix.ST_Asset, AssetState)
+        assets = DBCollection(self._db, DBPrefix.ST_Asset, AssetState, raw=self._raw_storage)
         asset = assets.TryGet(assetId)
 
         return asset
 
     def ShowAllAssets(self):
 
-        assets = DBCollection(self._db, DBPrefix.ST_Asset, AssetState)
+        assets = DBCollection(self._db, DBPrefix.ST_Asset, AssetState, raw=self._raw_storage)
         keys = assets.Keys
         return keys
 
     def GetTransaction(self, hash):
+        """
+        Get a stored transaction.
 
+        Args:
+            hash (UInt256, bytes or str): transaction hash.
+
+        Raises:
+            PrunedDataError: if the transaction was pruned.
+
+        Returns:
+            tuple: (Transaction, int) the transaction and the height of the block holding it, (None, -1) if the
+                transaction is not found.
+        """
         if type(hash) is str:
             hash = hash.encode('utf-8')
         elif type(hash) is UInt256:
@@ -388,12 +710,51 @@ class LevelDBBlockchain(Blockchain):
         if out is not None:
             out = bytearray(out)
             height = int.from_bytes(out[:4], 'little')
+            if len(out) == BlockPruner.STUB_SIZE:
+                raise PrunedDataError("Transaction %s is pruned" % hash.decode('utf-8'), height)
             out = out[4:]
-            outhex = binascii.unhexlify(out)
+            outhex = DBSchema.Decode(out, self._raw_storage)
             return Transaction.DeserializeFromBufer(outhex, 0), height
 
         return None, -1
 
+    def GetOutput(self, hash, index):
+        """
+        Get a single output of a stored transaction.
+
+        Reads the output index and falls back to loading the transaction for outputs the index does not cover yet.
+
+        Args:
+            hash (UInt256, bytes or str): transaction hash.
+            index (int): position of the output in the transaction.
+
+        Returns:
+            tuple: (TransactionOutput, int) the output and the height of the block holding the transaction.
+                The output is None if the transaction has no such output, the height is -1 if the transaction
+                is not found.
+        """
+        if type(hash) is str:
+            hash = hash.encode('utf-8')
+        elif type(hash) is UInt256:
+            hash = hash.ToBytes()
+
+        value = self._db.get(OutputIndex.Key(hash, index))
+        if value is not None:
+            return OutputIndex.Deserialize(value)
+
+        # keep the last loaded transaction, consecutive inputs often spend from the same one
+        tx_hash, tx, height = self._output_tx
+        if tx_hash != hash:
+            tx, height = self.GetTransaction(hash)
+            if tx is not None:
+                self._output_tx = (hash, tx, height)
+
+        if tx is None:
+            return None, -1
+        if index >= len(tx.outputs):
+            return None, height
+        return tx.outputs[index], height
+
     def AddBlockDirectly(self, block, do_persist_complete=True):
         # Adds a block when importing, which skips adding
         # the block header
@@ -405,8 +766,9 @@ class LevelDBBlockchain(Blockchain):
 
     def AddBlock(self, block):
 
-        if not block.Hash.ToBytes() in self._block_cache:
-            self._block_cache[block.Hash.ToBytes()] = block
+        # blocks that do not fit in the cache have to be requested again
+        for hash in self._block_cache.Add(block, self._current_block_height):
+            self.BlockRequests.discard(hash)
 
         header_len = len(self._header_index)
 
@@ -439,7 +801,7 @@ class LevelDBBlockchain(Blockchain):
         try:
             out = bytearray(self._db.get(DBPrefix.DATA_Block + hash))
             out = out[8:]
-            outhex = binascii.unhexlify(out)
+            outhex = DBSchema.Decode(out, self._raw_storage)
             return Header.FromTrimmedData(outhex, 0)
         except TypeError as e2:
             pass
@@ -518,6 +880,44 @@ class LevelDBBlockchain(Blockchain):
 
         return 0
 
+    def GetSysFeeAmountByHeight(self, height):
+        """
+        Get the system fee for the specified block.
+
+        Served from the system fee index, which is filled in from the stored blocks on first use.
+
+        Args:
+            height (int): block height.
+
+        Returns:
+            int:
+        """
+        index = self._sysfee_index
+        if 0 <= height <= self._current_block_height:
+            if height >= len(index):
+                self._FillSysFeeIndex(height)
+            if height < len(index):
+                return index[height]
+
+        return super(LevelDBBlockchain, self).GetSysFeeAmountByHeight(height)
+
+    def _FillSysFeeIndex(self, height, chunk_size=10000):
+        index = self._sysfee_index
+        start = len(index)
+        while start <= height:
+            amounts = []
+            for i in range(start, min(start + chunk_size, height + 1)):
+                # stop at a block that is being persisted but not written yet
+                value = self._db.get(DBPrefix.DATA_Block + self._header_index[i])
+                if value is None:
+                    break
+                amounts.append(int.from_bytes(value[0:8], 'little'))
+
+            # blocks persisted meanwhile may have extended the index already
+            if not amounts or not index.Extend(start, amounts):
+                return
+            start += len(amounts)
+
     def GetBlockByHeight(self, height):
         """
         Get a block by its height.
@@ -562,12 +962,28 @@ class LevelDBBlockchain(Blockchain):
         return None
 
     def GetBlockByHash(self, hash):
+        """
+        Get a block by its hash.
+
+        Args:
+            hash (bytes): hex encoded block hash.
+
+        Raises:
+            PrunedDataError: if the block was pruned.
+
+        Returns:
+            neo.Core.Block: block instance or None if the block is not found.
+        """
         try:
             out = bytearray(self._db.get(DBPrefix.DATA_Block + hash))
             out = out[8:]
-            outhex = binascii.unhexlify(out)
+            outhex = DBSchema.Decode(out, self._raw_storage)
             return Block.FromTrimmedData(outhex)
         except Exception as e:
+            # pruned blocks are stored like headers without a block
+            header = self.GetHeader(hash)
+            if header is not None and header.Index <= self.PrunedHeight:
+                raise PrunedDataError("Block %s is pruned" % header.Index, header.Index)
             logger.info("Could not get block %s " % e)
         return None
 
@@ -618,7 +1034,7 @@ class LevelDBBlockchain(Blockchain):
 
         hashes = [h.Hash.ToBytes() for h in headers]
 
-        self._header_index = self._header_index + hashes
+        self._header_index.extend(hashes)
 
         if lastheader is not None:
             self.OnAddHeader(lastheader)
@@ -632,49 +1048,63 @@ class LevelDBBlockchain(Blockchain):
 
         with self._db.write_batch() as wb:
             while header.Index - 2000 >= self._stored_header_count:
-                ms = StreamManager.GetStream()
-                w = BinaryWriter(ms)
                 headers_to_write = self._header_index[self._stored_header_count:self._stored_header_count + 2000]
-                w.Write2000256List(headers_to_write)
-                out = ms.ToArray()
-                StreamManager.ReleaseStream(ms)
+                out = DBSchema.SerializeHeaderHashList(headers_to_write, self._raw_storage)
                 wb.put(DBPrefix.IX_HeaderHashList + self._stored_header_count.to_bytes(4, 'little'), out)
 
                 self._stored_header_count += 2000
 
         with self._db.write_batch() as wb:
             if self._db.get(DBPrefix.DATA_Block + hHash) is None:
-                wb.put(DBPrefix.DATA_Block + hHash, bytes(8) + header.ToArray())
+                wb.put(DBPrefix.DATA_Block + hHash, bytes(8) + DBSchema.Serialize(header, self._raw_storage))
             wb.put(DBPrefix.SYS_CurrentHeader, hHash + header.Index.to_bytes(4, 'little'))
 
+    @property
+    def PrunedHeight(self):
+        return BlockPruner.PrunedHeight(self._db)
+
     @property
     def BlockCacheCount(self):
         return len(self._block_cache)
 
+    def ContainsCachedBlock(self, hash):
+        return hash in self._block_cache
+
     def Persist(self, block):
 
         self._persisting_block = block
 
-        accounts = DBCollection(self._db, DBPrefix.ST_Account, AccountState)
-        unspentcoins = DBCollection(self._db, DBPrefix.ST_Coin, UnspentCoinState)
-        spentcoins = DBCollection(self._db, DBPrefix.ST_SpentCoin, SpentCoinState)
-        assets = DBCollection(self._db, DBPrefix.ST_Asset, AssetState)
-        validators = DBCollection(self._db, DBPrefix.ST_Validator, ValidatorState)
-        contracts = DBCollection(self._db, DBPrefix.ST_Contract, ContractState)
-        storages = DBCollection(self._db, DBPrefix.ST_Storage, StorageItem)
-
-        amount_sysfee = self.GetSysFeeAmount(block.PrevHash) + block.TotalFees().value
+        cache = self._state_cache
+        accounts = DBCollection(self._db, DBPrefix.ST_Account, AccountState, raw=self._raw_storage, cache=cache)
+        unspentcoins = DBCollection(self._db, DBPrefix.ST_Coin, UnspentCoinState, raw=self._raw_storage, cache=cache)
+        spentcoins = DBCollection(self._db, DBPrefix.ST_SpentCoin, SpentCoinState, raw=self._raw_storage, cache=cache)
+        assets = DBCollection(self._db, DBPrefix.ST_Asset, AssetState, raw=self._raw_storage, cache=cache,
+                              index=SearchIndex(DBPrefix.ST_Asset, self._raw_storage))
+        validators = DBCollection(self._db, DBPrefix.ST_Validator, ValidatorState, raw=self._raw_storage, cache=cache)
+        contracts = DBCollection(self._db, DBPrefix.ST_Contract, ContractState, raw=self._raw_storage, cache=cache,
+                                 index=SearchIndex(DBPrefix.ST_Contract, self._raw_storage))
+        storages = DBCollection(self._db, DBPrefix.ST_Storage, StorageItem, raw=self._raw_storage, cache=cache)
+
+        sysfee_index = self._sysfee_index
+        if 0 < block.Index == len(sysfee_index):
+            amount_sysfee = sysfee_index[block.Index - 1] + block.TotalFees().value
+        else:
+            amount_sysfee = self.GetSysFeeAmount(block.PrevHash) + block.TotalFees().value
         amount_sysfee_bytes = amount_sysfee.to_bytes(8, 'little')
 
         to_dispatch = []
 
-        with self._db.write_batch() as wb:
+        # the cache only takes over the block's state once its write batch is written
+        with cache.Transaction(), self._db.write_batch() as wb:
 
-            wb.put(DBPrefix.DATA_Block + block.Hash.ToBytes(), amount_sysfee_bytes + block.Trim())
+            wb.put(DBPrefix.DATA_Block + block.Hash.ToBytes(), amount_sysfee_bytes + block.Trim(raw=self._raw_storage))
 
             for tx in block.Transactions:
 
-                wb.put(DBPrefix.DATA_Transaction + tx.Hash.ToBytes(), block.IndexBytes() + tx.ToArray())
+                wb.put(DBPrefix.DATA_Transaction + tx.Hash.ToBytes(), block.IndexBytes() + DBSchema.Serialize(tx, self._raw_storage))
+                OutputIndex.Put(wb, tx, block.Index)
+                if self._address_index:
+                    AddressIndex.Put(wb, tx, block.Index)
 
                 # go through all outputs and add unspent coins to them
 
@@ -684,37 +1114,25 @@ class LevelDBBlockchain(Blockchain):
                 # go through all the accounts in the tx outputs
                 for output in tx.outputs:
                     account = accounts.GetAndChange(output.AddressBytes, AccountState(output.ScriptHash))
-
-                    if account.HasBalance(output.AssetId):
-                        account.AddToBalance(output.AssetId, output.Value)
-                    else:
-                        account.SetBalanceFor(output.AssetId, output.Value)
+                    account.AddToBalance(output.AssetId, output.Value)
 
                 # go through all tx inputs
-                unique_tx_input_hashes = []
                 for input in tx.inputs:
-                    if input.PrevHash not in unique_tx_input_hashes:
-                        unique_tx_input_hashes.append(input.PrevHash)
+                    prevHash = input.PrevHash.ToBytes()
+                    output, height = self.GetOutput(prevHash, input.PrevIndex)
 
-                for txhash in unique_tx_input_hashes:
-                    prevTx, height = self.GetTransaction(txhash.ToBytes())
-                    coin_refs_by_hash = [coinref for coinref in tx.inputs if
-                                         coinref.PrevHash.ToBytes() == txhash.ToBytes()]
-                    for input in coin_refs_by_hash:
+                    uns = unspentcoins.GetAndChange(prevHash)
+                    uns.OrEqValueForItemAt(input.PrevIndex, CoinState.Spent)
 
-                        uns = unspentcoins.GetAndChange(input.PrevHash.ToBytes())
-                        uns.OrEqValueForItemAt(input.PrevIndex, CoinState.Spent)
+                    if self._address_index:
+                        AddressIndex.Spend(wb, output, prevHash, input.PrevIndex)
 
-                        if prevTx.outputs[input.PrevIndex].AssetId.ToBytes() == Blockchain.SystemShare().Hash.ToBytes():
-                            sc = spentcoins.GetAndChange(input.PrevHash.ToBytes(),
-                                                         SpentCoinState(input.PrevHash, height, []))
-                            sc.Items.append(SpentCoinItem(input.PrevIndex, block.Index))
+                    if output.AssetId.ToBytes() == Blockchain.SystemShare().Hash.ToBytes():
+                        sc = spentcoins.GetAndChange(prevHash, SpentCoinState(input.PrevHash, height, []))
+                        sc.Items.append(SpentCoinItem(input.PrevIndex, block.Index))
 
-                        output = prevTx.outputs[input.PrevIndex]
-                        acct = accounts.GetAndChange(prevTx.outputs[input.PrevIndex].AddressBytes,
-                                                     AccountState(output.ScriptHash))
-                        assetid = prevTx.outputs[input.PrevIndex].AssetId
-                        acct.SubtractFromBalance(assetid, prevTx.outputs[input.PrevIndex].Value)
+                    acct = accounts.GetAndChange(output.AddressBytes, AccountState(output.ScriptHash))
+                    acct.SubtractFromBalance(output.AssetId, output.Value)
 
                 # do a whole lotta stuff with tx here...
                 if tx.Type == TransactionType.RegisterTransaction:
@@ -817,43 +1235,74 @@ class LevelDBBlockchain(Blockchain):
 
             self.TXProcessed += len(block.Transactions)
 
+        sysfee_index.Extend(block.Index, [amount_sysfee])
+
+        if not isinstance(self._db, DBOverlay):
+            self._InvalidateReadView()
+            if self._pruner is not None:
+                self._pruner.Notify()
+
         for event in to_dispatch:
             events.emit(event.event_type, event)
 
     def PersistBlocks(self, limit=None):
         ctr = 0
         if not self._paused:
-            while not self._disposed:
+            try:
+                while not self._disposed:
 
-                if len(self._header_index) <= self._current_block_height + 1:
-                    break
+                    if len(self._header_index) <= self._current_block_height + 1:
+                        break
 
-                hash = self._header_index[self._current_block_height + 1]
+                    hash = self._header_index[self._current_block_height + 1]
 
-                if hash not in self._block_cache:
-                    self.BlockSearchTries += 1
-                    break
+                    if hash not in self._block_cache:
+                        self.BlockSearchTries += 1
+                        break
 
-                self.BlockSearchTries = 0
-                block = self._block_cache[hash]
+                    self.BlockSearchTries = 0
+                    block = self._block_cache[hash]
 
-                try:
-                    self.Persist(block)
-                    del self._block_cache[hash]
-                except Exception as e:
-                    logger.info(f"Could not persist block {block.Index} reason: {e}")
-                    raise e
+                    if settings.PERSIST_BATCH_SIZE > 1 and not isinstance(self._db, DBOverlay):
+                        self._db = DBOverlay(self._db, marker=DBPrefix.SYS_CurrentBlock)
 
-                try:
-                    self.OnPersistCompleted(block)
-                except Exception as e:
-                    logger.debug(f"Failed to broadcast OnPersistCompleted event, reason: {e}")
-                    raise e
+                    try:
+                        self.Persist(block)
+                        self._block_cache.Pop(hash)
+                    except Exception as e:
+                        logger.info(f"Could not persist block {block.Index} reason: {e}")
+                        raise e
 
-                ctr += 1
-                # give the reactor the opportunity to preempt
-                if limit and ctr == limit:
-                    break
+                    try:
+                        self.OnPersistCompleted(block)
+                    except Exception as e:
+                        logger.debug(f"Failed to broadcast OnPersistCompleted event, reason: {e}")
+                        raise e
+
+                    ctr += 1
+
+                    if ctr % settings.PERSIST_BATCH_SIZE == 0:
+                        self.FlushPersistedBlocks()
+
+                    # give the reactor the opportunity to preempt
+                    if limit and ctr == limit:
+                        break
+            finally:
+                self.FlushPersistedBlocks()
+
+    def FlushPersistedBlocks(self):
+        """
+        Write the blocks persisted in batched mode to the database.
+
+        While `PersistBlocks` applies a batch of blocks, their changes are kept in a `DBOverlay` that replaces the
+        database. This writes them in a single write batch, with the current block marker last, and restores the
+        database.
+        """
+        if isinstance(self._db, DBOverlay):
+            self._db = self._db.Detach()
+            self._InvalidateReadView()
+            if self._pruner is not None:
+                self._pruner.Notify()
 
     def Resume(self):
         self._currently_persisting = False
@@ -861,5 +1310,69 @@ class LevelDBBlockchain(Blockchain):
         self.PersistBlocks()
 
     def Dispose(self):
+        if self._pruner is not None:
+            self._pruner.Stop()
+        self.FlushPersistedBlocks()
+        self.SaveHeaderSnapshot()
+        self.SaveSysFeeSnapshot()
+        self._InvalidateReadView()
         self._db.close()
         self._disposed = True
+
+
+class LevelDBReadView(LevelDBBlockchain):
+    """
+    Read only view of a `LevelDBBlockchain`, pinned to a database snapshot taken after a block was committed.
+
+    Every read is served from the snapshot, so a view stays consistent with its block height while the chain keeps
+    persisting blocks and never waits for it. The header index is shared with the chain. Views are obtained
+    through `LevelDBBlockchain.GetReadView` and the snapshot is released once the view is no longer referenced.
+    """
+
+    def __init__(self, chain, snapshot, height):
+        """
+        Create an instance.
+
+        Args:
+            chain (LevelDBBlockchain): the chain to take the view of.
+            snapshot (object): snapshot of the chain database, see `StorageBackend.snapshot`.
+            height (int): height of the last block in the snapshot.
+        """
+        self._chain = chain
+        self._path = chain.Path
+        self._db = snapshot
+        self._raw_storage = chain.RawStorage
+        self._header_index = chain._header_index
+        self._stored_header_count = chain._stored_header_count
+        self._sysfee_index = chain._sysfee_index
+        self._current_block_height = height
+        self._block_cache = BlockCache(0, 0)
+        self.TXProcessed = chain.TXProcessed
+
+    @property
+    def CurrentBlock(self):
+        return self.GetBlockByHeight(self.Height)
+
+    def GetReadView(self):
+        return self
+
+    def AddBlock(self, block):
+        raise Exception("Cannot add blocks to a read view")
+
+    def AddBlockDirectly(self, block, do_persist_complete=True):
+        raise Exception("Cannot add blocks to a read view")
+
+    def AddHeaders(self, headers):
+        raise Exception("Cannot add headers to a read view")
+
+    def Persist(self, block):
+        raise Exception("Cannot persist blocks to a read view")
+
+    def PersistBlocks(self, limit=None):
+        pass
+
+    def FlushPersistedBlocks(self):
+        pass
+
+    def Dispose(self):
+        pass
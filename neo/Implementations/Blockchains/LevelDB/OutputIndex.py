@@ -0,0 +1,122 @@
+from neo.Core.TX.Transaction import Transaction, TransactionOutput
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Implementations.Blockchains.LevelDB.DBSchema import DBSchema
+from neocore.Fixed8 import Fixed8
+from neocore.UInt160 import UInt160
+from neocore.UInt256 import UInt256
+
+
+class OutputIndex:
+    """
+    Compact index of transaction outputs, so a coin reference resolves with one small point read instead of
+    loading and deserializing the whole transaction that created it.
+
+    Keys are `IX_Output` + transaction hash (as used for `DATA_Transaction`) + the 2 byte output index. Values
+    are always stored raw, whatever the `DBSchema` of the database:
+
+        asset id (32 bytes) | value (int64) | script hash (20 bytes) | block height (uint32)
+
+    Outputs never change once their transaction is persisted, so entries are only ever added. The
+    `SYS_OutputIndex` record marks a database whose index covers every stored transaction.
+    """
+
+    VALUE_SIZE = 64
+
+    @staticmethod
+    def Key(tx_hash, index):
+        """
+        Get the database key of an output.
+
+        Args:
+            tx_hash (bytes): hex encoded transaction hash.
+            index (int): position of the output in the transaction.
+
+        Returns:
+            bytes:
+        """
+        return DBPrefix.IX_Output + tx_hash + index.to_bytes(2, 'little')
+
+    @staticmethod
+    def Serialize(output, height):
+        """
+        Serialize an output for storage.
+
+        Args:
+            output (TransactionOutput):
+            height (int): height of the block holding the transaction.
+
+        Returns:
+            bytes:
+        """
+        return bytes(output.AssetId.Data) + output.Value.value.to_bytes(8, 'little', signed=True) + \
+            bytes(output.ScriptHash.Data) + height.to_bytes(4, 'little')
+
+    @staticmethod
+    def Deserialize(data):
+        """
+        Deserialize a stored output.
+
+        Args:
+            data (bytes): value as read from the database.
+
+        Returns:
+            tuple: (TransactionOutput, int) the output and the height of the block holding its transaction.
+        """
+        output = TransactionOutput(AssetId=UInt256(data=bytearray(data[0:32])),
+                                   Value=Fixed8(int.from_bytes(data[32:40], 'little', signed=True)),
+                                   script_hash=UInt160(data=bytearray(data[40:60])))
+        return output, int.from_bytes(data[60:64], 'little')
+
+    @staticmethod
+    def Put(wb, tx, height):
+        """
+        Add the outputs of a transaction to the index.
+
+        Args:
+            wb (plyvel.WriteBatch): batch to write to.
+            tx (Transaction):
+            height (int): height of the block holding the transaction.
+        """
+        tx_hash = tx.Hash.ToBytes()
+        for index, output in enumerate(tx.outputs):
+            wb.put(OutputIndex.Key(tx_hash, index), OutputIndex.Serialize(output, height))
+
+    @staticmethod
+    def Backfill(db, raw, batch_size=10000, progress=None):
+        """
+        Index the outputs of every stored transaction and mark the index as complete.
+
+        Args:
+            db (plyvel.DB): chain database. Should not be written to by anything else meanwhile.
+            raw (bool): value encoding of `db`, see `DBSchema`.
+            batch_size (int): number of transactions per write batch.
+            progress (callable): (Optional) called with the number of transactions indexed after every batch.
+
+        Returns:
+            int: the number of transactions indexed.
+        """
+        count = 0
+        wb = db.write_batch()
+        for key, value in db.iterator(prefix=DBPrefix.DATA_Transaction):
+            # pruned transactions only keep their height, all of their outputs are spent
+            if len(value) == 4:
+                continue
+
+            height = int.from_bytes(value[:4], 'little')
+            tx = Transaction.DeserializeFromBufer(DBSchema.Decode(value[4:], raw), 0)
+            OutputIndex.Put(wb, tx, height)
+            count += 1
+
+            if count % batch_size == 0:
+                wb.write()
+                wb = db.write_batch()
+                if progress:
+                    progress(count)
+
+        wb.put(DBPrefix.SYS_OutputIndex, b'\x01')
+        wb.write()
+
+        if progress:
+            progress(count)
+
+        return count
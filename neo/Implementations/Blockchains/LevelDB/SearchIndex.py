@@ -0,0 +1,187 @@
+import re
+from neo.Core.State.AssetState import AssetState
+from neo.Core.State.ContractState import ContractState
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Implementations.Blockchains.LevelDB.DBSchema import DBSchema
+from neocore.Cryptography.Crypto import Crypto
+from neo.logging import log_manager
+
+logger = log_manager.getLogger('db')
+
+_TOKEN = re.compile(r'\w+')
+
+
+class SearchIndex:
+    """
+    Index of the words in the names, authors and other descriptive fields of contracts and assets, so searching them
+    does not have to read every contract or asset.
+
+    Keys are `IX_Search` + the `DBPrefix` of the state (`ST_Contract` or `ST_Asset`) + a suffix of a casefolded word
+    + a zero byte + the key of the state, for every suffix of every word, so a word can be found by any part of it. The values are empty. A collection given an index adds the words of new states and
+    removes the words of deleted states in the batch its changes are committed to. States that are only updated keep
+    their entries, as the indexed fields never change.
+
+    A search looks up the states holding a word containing each word of the query, and only reads those. These are all
+    the states a scan for the query as a substring would find, and usually a few more. The `SYS_SearchIndex` record
+    holds `VERSION` in a database whose index covers every contract and asset.
+    """
+
+    # layout of the index, an index of another version is rebuilt
+    VERSION = b'\x02'
+
+    FIELDS = {
+        DBPrefix.ST_Contract: lambda contract: [contract.Name, contract.Author, contract.Description, contract.Email],
+        DBPrefix.ST_Asset: lambda asset: [asset.Name, Crypto.ToAddress(asset.Issuer), Crypto.ToAddress(asset.Admin)],
+    }
+
+    CLASSES = {
+        DBPrefix.ST_Contract: ContractState,
+        DBPrefix.ST_Asset: AssetState,
+    }
+
+    def __init__(self, prefix, raw):
+        """
+        Create an instance.
+
+        Args:
+            prefix (bytes): `DBPrefix.ST_Contract` or `DBPrefix.ST_Asset`.
+            raw (bool): value encoding of the database, see `DBSchema`.
+        """
+        self.Prefix = prefix
+        self._raw = raw
+
+    @staticmethod
+    def Tokenize(text):
+        """
+        Split a text into casefolded words.
+
+        Args:
+            text (str or bytes): utf-8 encoded if bytes.
+
+        Returns:
+            set: of str.
+        """
+        if isinstance(text, (bytes, bytearray)):
+            text = text.decode('utf-8', 'ignore')
+        return set(_TOKEN.findall(text.casefold()))
+
+    @staticmethod
+    def Words(prefix, item):
+        """
+        Get the indexed words of a state, every suffix of the words of its fields.
+
+        Args:
+            prefix (bytes): `DBPrefix` of the state.
+            item (ContractState or AssetState):
+
+        Returns:
+            set: of str.
+        """
+        words = set()
+        for field in SearchIndex.FIELDS[prefix](item):
+            if field:
+                for word in SearchIndex.Tokenize(field):
+                    words.update(word[i:] for i in range(len(word)))
+        return words
+
+    @staticmethod
+    def Key(prefix, word, keyval):
+        """
+        Get the database key of a word of a state.
+
+        Args:
+            prefix (bytes): `DBPrefix` of the state.
+            word (str): suffix of a casefolded word.
+            keyval (bytes): key of the state.
+
+        Returns:
+            bytes:
+        """
+        return DBPrefix.IX_Search + prefix + word.encode('utf-8') + b'\x00' + keyval
+
+    def Put(self, db, writer, keyval, item):
+        """
+        Add the words of a committed state, unless it is already stored.
+
+        Args:
+            db (StorageBackend): database the collection reads from.
+            writer (plyvel.WriteBatch or StorageBackend): where the changes of the collection are written to.
+            keyval (bytes): key of the state.
+            item (ContractState or AssetState):
+        """
+        if db.get(self.Prefix + keyval) is not None:
+            return
+        for word in self.Words(self.Prefix, item):
+            writer.put(self.Key(self.Prefix, word, keyval), b'')
+
+    def Remove(self, db, writer, keyval):
+        """
+        Remove the words of a stored state that is deleted.
+
+        Args:
+            db (StorageBackend): database the collection reads from.
+            writer (plyvel.WriteBatch or StorageBackend): where the changes of the collection are written to.
+            keyval (bytes): key of the state.
+        """
+        value = db.get(self.Prefix + keyval)
+        if value is None:
+            return
+        item = self.CLASSES[self.Prefix].DeserializeFromDB(DBSchema.Decode(value, self._raw))
+        for word in self.Words(self.Prefix, item):
+            writer.delete(self.Key(self.Prefix, word, keyval))
+
+    @staticmethod
+    def Find(db, prefix, query):
+        """
+        Get the keys of the states holding a word containing each word of a query. The caller still has to check
+        the states against the query, a state whose words match may not contain the query as a whole.
+
+        Args:
+            db (StorageBackend): chain database or a snapshot of it.
+            prefix (bytes): `DBPrefix.ST_Contract` or `DBPrefix.ST_Asset`.
+            query (str):
+
+        Returns:
+            list: sorted keys of the matching states, or None if the query has no words to look up.
+        """
+        words = SearchIndex.Tokenize(query)
+        if not words:
+            return None
+
+        found = None
+        for word in sorted(words, key=len, reverse=True):
+            start = DBPrefix.IX_Search + prefix + word.encode('utf-8')
+            keys = set()
+            for key in db.iterator(prefix=start, include_value=False):
+                keys.add(key[key.index(b'\x00', len(start)) + 1:])
+
+            found = keys if found is None else found & keys
+            if not found:
+                break
+
+        return sorted(found)
+
+    @staticmethod
+    def Rebuild(db, raw):
+        """
+        Index all contracts and assets and mark the index as complete.
+
+        Args:
+            db (StorageBackend): chain database.
+            raw (bool): value encoding of `db`, see `DBSchema`.
+        """
+        with db.write_batch() as wb:
+            for key in db.iterator(prefix=DBPrefix.IX_Search, include_value=False):
+                wb.delete(key)
+
+            for prefix, classref in SearchIndex.CLASSES.items():
+                for key, value in db.iterator(prefix=prefix):
+                    try:
+                        item = classref.DeserializeFromDB(DBSchema.Decode(value, raw))
+                    except Exception as e:
+                        logger.info("Could not index state %s: %s" % (key, e))
+                        continue
+                    for word in SearchIndex.Words(prefix, item):
+                        wb.put(SearchIndex.Key(prefix, word, key[1:]), b'')
+
+            wb.put(DBPrefix.SYS_SearchIndex, SearchIndex.VERSION)
@@ -0,0 +1,151 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class StateCache:
+    """
+    Bounded LRU cache of deserialized state objects that lives across blocks.
+
+    `Persist` hands out the cached objects to its `DBCollection`s, which mutate them in place. Every key marked
+    as changed during a block is tracked as dirty until its value is staged by a commit into the block's write batch.
+    Once the batch is written, staged values become the cached values and keys still dirty are evicted, because
+    their object may hold changes that never reached the database. If persisting fails, every key touched during
+    the block is evicted.
+
+    Keys include the `DBPrefix` of the record.
+    """
+
+    def __init__(self, max_items):
+        """
+        Create an instance.
+
+        Args:
+            max_items (int): maximum number of cached objects. 0 disables the cache.
+        """
+        self.MaxItems = max_items
+
+        self.Hits = 0
+        self.Misses = 0
+        self.Evictions = 0
+
+        self._items = OrderedDict()
+        self._dirty = set()
+        self._pending = {}
+
+    @property
+    def Enabled(self):
+        return self.MaxItems > 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def Get(self, key):
+        """
+        Get a cached object.
+
+        Args:
+            key (bytes): prefixed key.
+
+        Returns:
+            StateBase: the cached object or None.
+        """
+        item = self._items.get(key)
+        if item is None:
+            self.Misses += 1
+            return None
+
+        self._items.move_to_end(key)
+        self.Hits += 1
+        return item
+
+    def Touch(self, key):
+        """
+        Mark a key as changed in the block being persisted.
+
+        Args:
+            key (bytes): prefixed key.
+        """
+        self._dirty.add(key)
+
+    def Stage(self, key, item):
+        """
+        Record the value of a key as written into the block's write batch.
+
+        Args:
+            key (bytes): prefixed key.
+            item (StateBase): the written object, or None if the key was deleted.
+        """
+        self._pending[key] = item
+        self._dirty.discard(key)
+
+    def Apply(self):
+        """
+        Make the staged values of the current block visible once its write batch is written.
+        """
+        for key, item in self._pending.items():
+            if item is None:
+                self._items.pop(key, None)
+            else:
+                self._items[key] = item
+                self._items.move_to_end(key)
+
+        for key in self._dirty:
+            self._items.pop(key, None)
+
+        while len(self._items) > self.MaxItems:
+            self._items.popitem(last=False)
+            self.Evictions += 1
+
+        self._pending = {}
+        self._dirty = set()
+
+    def Discard(self):
+        """
+        Evict every key touched by the current block after it failed to persist.
+        """
+        for key in self._dirty:
+            self._items.pop(key, None)
+
+        for key in self._pending:
+            self._items.pop(key, None)
+
+        self._pending = {}
+        self._dirty = set()
+
+    @contextmanager
+    def Transaction(self):
+        """
+        Apply the staged values if the wrapped block persists without error. Discard them otherwise.
+        """
+        try:
+            yield self
+        except Exception:
+            self.Discard()
+            raise
+        else:
+            self.Apply()
+
+    def Clear(self):
+        """
+        Remove all cached objects.
+        """
+        self._items = OrderedDict()
+        self._pending = {}
+        self._dirty = set()
+
+    def ToJson(self):
+        """
+        Convert the cache statistics to a dictionary that can be parsed as JSON.
+
+        Returns:
+             dict:
+        """
+        lookups = self.Hits + self.Misses
+        return {
+            'items': len(self._items),
+            'max_items': self.MaxItems,
+            'hits': self.Hits,
+            'misses': self.Misses,
+            'hit_rate': self.Hits / lookups if lookups else 0,
+            'evictions': self.Evictions
+        }
@@ -0,0 +1,101 @@
+import mmap
+import os
+import sys
+import threading
+from array import array
+
+
+class SysFeeIndex:
+    """
+    Cumulative system fees by block height, kept in one `array('Q')` so looking up the fees for a height does not
+    have to resolve the block hash and read the block from the database.
+
+    The index only grows at its end. Entries are added as blocks are persisted, or filled in from the database by
+    the chain for heights that are not covered yet.
+    """
+
+    SNAPSHOT_MAGIC = b'NEOSFEE1'
+
+    # magic and number of entries
+    SNAPSHOT_HEADER_SIZE = 12
+
+    def __init__(self):
+        self._amounts = array('Q')
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._amounts)
+
+    def __getitem__(self, height):
+        return self._amounts[height]
+
+    def Extend(self, height, amounts):
+        """
+        Add the cumulative system fees of consecutive heights.
+
+        Args:
+            height (int): height of the first amount, has to be the next height of the index.
+            amounts (iterable): cumulative system fees as unsigned 64 bit integers.
+
+        Returns:
+            bool: False if `height` is not the next height of the index and nothing was added.
+        """
+        with self._lock:
+            if height != len(self._amounts):
+                return False
+            self._amounts.extend(amounts)
+            return True
+
+    def Save(self, path):
+        """
+        Write the index to a snapshot file.
+
+        The file is written next to `path` first and then renamed, so an interrupted write never leaves a
+        truncated snapshot behind.
+
+        Args:
+            path (str): destination file.
+        """
+        amounts = self._amounts
+        if sys.byteorder != 'little':
+            amounts = array('Q', amounts)
+            amounts.byteswap()
+
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(self.SNAPSHOT_MAGIC + len(amounts).to_bytes(4, 'little'))
+            amounts.tofile(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def Load(path):
+        """
+        Read a snapshot file written by `Save`.
+
+        Args:
+            path (str): snapshot file.
+
+        Raises:
+            ValueError: if the file is not a valid snapshot.
+
+        Returns:
+            SysFeeIndex:
+        """
+        with open(path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                header_size = SysFeeIndex.SNAPSHOT_HEADER_SIZE
+                if mm[:8] != SysFeeIndex.SNAPSHOT_MAGIC:
+                    raise ValueError("Not a system fee index snapshot")
+
+                count = int.from_bytes(mm[8:12], 'little')
+                if len(mm) != header_size + count * 8:
+                    raise ValueError("Invalid system fee index snapshot size")
+
+                index = SysFeeIndex()
+                index._amounts.frombytes(mm[header_size:])
+                if sys.byteorder != 'little':
+                    index._amounts.byteswap()
+
+        return index
@@ -45,37 +45,22 @@ class TestLevelDBBlockchain(LevelDBBlockchain):
                 # go through all the accounts in the tx outputs
                 for output in tx.outputs:
                     account = accounts.GetAndChange(output.AddressBytes, AccountState(output.ScriptHash))
-
-                    if account.HasBalance(output.AssetId):
-                        account.AddToBalance(output.AssetId, output.Value)
-                    else:
-                        account.SetBalanceFor(output.AssetId, output.Value)
+                    account.AddToBalance(output.AssetId, output.Value)
 
                 # go through all tx inputs
-                unique_tx_input_hashes = []
                 for input in tx.inputs:
-                    if input.PrevHash not in unique_tx_input_hashes:
-                        unique_tx_input_hashes.append(input.PrevHash)
-
-                for txhash in unique_tx_input_hashes:
-                    prevTx, height = self.GetTransaction(txhash.ToBytes())
-                    coin_refs_by_hash = [coinref for coinref in tx.inputs if
-                                         coinref.PrevHash.ToBytes() == txhash.ToBytes()]
-                    for input in coin_refs_by_hash:
-
-                        uns = unspentcoins.GetAndChange(input.PrevHash.ToBytes())
-                        uns.OrEqValueForItemAt(input.PrevIndex, CoinState.Spent)
-
-                        if prevTx.outputs[input.PrevIndex].AssetId.ToBytes() == Blockchain.SystemShare().Hash.ToBytes():
-                            sc = spentcoins.GetAndChange(input.PrevHash.ToBytes(),
-                                                         SpentCoinState(input.PrevHash, height, []))
-                            sc.Items.append(SpentCoinItem(input.PrevIndex, block.Index))
-
-                        output = prevTx.outputs[input.PrevIndex]
-                        acct = accounts.GetAndChange(prevTx.outputs[input.PrevIndex].AddressBytes,
-                                                     AccountState(output.ScriptHash))
-                        assetid = prevTx.outputs[input.PrevIndex].AssetId
-                        acct.SubtractFromBalance(assetid, prevTx.outputs[input.PrevIndex].Value)
+                    prevHash = input.PrevHash.ToBytes()
+                    output, height = self.GetOutput(prevHash, input.PrevIndex)
+
+                    uns = unspentcoins.GetAndChange(prevHash)
+                    uns.OrEqValueForItemAt(input.PrevIndex, CoinState.Spent)
+
+                    if output.AssetId.ToBytes() == Blockchain.SystemShare().Hash.ToBytes():
+                        sc = spentcoins.GetAndChange(prevHash, SpentCoinState(input.PrevHash, height, []))
+                        sc.Items.append(SpentCoinItem(input.PrevIndex, block.Index))
+
+                    acct = accounts.GetAndChange(output.AddressBytes, AccountState(output.ScriptHash))
+                    acct.SubtractFromBalance(output.AssetId, output.Value)
 
                 # do a whole lotta stuff with tx here...
                 if tx.Type == TransactionType.RegisterTransaction:
@@ -0,0 +1,103 @@
+from neo.Utils.NeoTestCase import NeoTestCase
+from neo.Implementations.Blockchains.LevelDB.LevelDBBlockchain import LevelDBBlockchain
+from neo.Implementations.Blockchains.LevelDB.AddressIndex import AddressIndex
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Core.Blockchain import Blockchain
+from neo.Core.Block import Block
+from neo.Core.CoinReference import CoinReference
+from neo.Core.TX.Transaction import ContractTransaction, TransactionOutput
+from neo.Storage.StorageBackend import StorageBackend
+from neo.Settings import settings
+from neocore.Fixed8 import Fixed8
+from neocore.UInt160 import UInt160
+import os
+
+
+class AddressIndexTest(NeoTestCase):
+    CHAIN_PATH = os.path.join(settings.DATA_DIR_PATH, 'UnitTestAddressIndex')
+
+    @classmethod
+    def setUpClass(cls):
+        settings.setup_unittest_net()
+
+    def setUp(self):
+        Blockchain.DeregisterBlockchain()
+        self._address_index = settings.ADDRESS_INDEX
+        settings.ADDRESS_INDEX = True
+
+        self.chain = LevelDBBlockchain(self.CHAIN_PATH, backend=StorageBackend.MEMORY)
+        Blockchain.RegisterBlockchain(self.chain)
+
+        # the genesis block issues all NEO to the standby validators in its last transaction
+        self.issue_tx = Blockchain.GenesisBlock().Transactions[-1]
+        self.holder = self.issue_tx.outputs[0].ScriptHash
+
+    def tearDown(self):
+        settings.ADDRESS_INDEX = self._address_index
+        self.chain.Dispose()
+        Blockchain.DeregisterBlockchain()
+
+    def _persist_transfer(self, addresses):
+        # spend the genesis NEO, splitting off one NEO to each address
+        neo = Blockchain.SystemShare().Hash
+        total = self.issue_tx.outputs[0].Value
+        outputs = [TransactionOutput(neo, Fixed8.FromDecimal(1), address) for address in addresses]
+        outputs.append(TransactionOutput(neo, total - Fixed8.FromDecimal(len(addresses)), self.holder))
+
+        tx = ContractTransaction(inputs=[CoinReference(self.issue_tx.Hash, 0)], outputs=outputs)
+        genesis = Blockchain.GenesisBlock()
+        block = Block(genesis.Hash, genesis.Timestamp + 15, 1, 0, genesis.NextConsensus, genesis.Script, [tx], build_root=True)
+        self.chain.Persist(block)
+        return tx
+
+    def test_genesis(self):
+        unspents = list(self.chain.GetAddressUnspents(self.holder))
+        self.assertEqual(len(unspents), 1)
+
+        reference, output, height = unspents[0]
+        self.assertEqual(reference.PrevHash, self.issue_tx.Hash)
+        self.assertEqual(reference.PrevIndex, 0)
+        self.assertEqual(output.Value, self.issue_tx.outputs[0].Value)
+        self.assertEqual(height, 0)
+
+        self.assertEqual(list(self.chain.GetAddressUnspents(UInt160(data=bytearray(20)))), [])
+
+    def test_spend_and_pages(self):
+        address = UInt160(data=bytearray(range(20)))
+        tx = self._persist_transfer([address] * 5)
+
+        # the spent genesis output is gone, the change is indexed
+        unspents = list(self.chain.GetAddressUnspents(self.holder))
+        self.assertEqual([(ref.PrevHash, ref.PrevIndex) for ref, output, height in unspents], [(tx.Hash, 5)])
+
+        pages = []
+        start = None
+        while True:
+            page = list(self.chain.GetAddressUnspents(address, start=start, count=2))
+            if not page:
+                break
+            pages.append([ref.PrevIndex for ref, output, height in page])
+            start = page[-1][0]
+
+        self.assertEqual(pages, [[0, 1], [2, 3], [4]])
+
+    def test_rebuild(self):
+        address = UInt160(data=bytearray(range(20)))
+        self._persist_transfer([address])
+
+        db = self.chain.DB
+        keys = list(db.iterator(prefix=DBPrefix.IX_AddressUnspent))
+        self.assertEqual(len(keys), 2)
+
+        db.delete(keys[0][0])
+        self.assertEqual(AddressIndex.Rebuild(db, self.chain.RawStorage, batch_size=1), 2)
+        self.assertEqual(list(db.iterator(prefix=DBPrefix.IX_AddressUnspent)), keys)
+
+    def test_disabled(self):
+        settings.ADDRESS_INDEX = False
+        chain = LevelDBBlockchain(self.CHAIN_PATH, backend=StorageBackend.MEMORY)
+
+        with self.assertRaises(Exception):
+            chain.GetAddressUnspents(self.holder)
+        self.assertEqual(list(chain.DB.iterator(prefix=DBPrefix.IX_AddressUnspent)), [])
+        chain.Dispose()
@@ -0,0 +1,158 @@
+from neo.Utils.NeoTestCase import NeoTestCase
+from neo.Implementations.Blockchains.LevelDB.BlockCache import BlockCache
+from neo.Implementations.Blockchains.LevelDB.LevelDBBlockchain import LevelDBBlockchain
+from neo.Storage.StorageBackend import StorageBackend
+from neo.Core.Blockchain import Blockchain
+from neo.Settings import settings
+import os
+import threading
+
+
+class FakeHash:
+
+    def __init__(self, index):
+        self.index = index
+
+    def ToBytes(self):
+        return b'%064d' % self.index
+
+
+class FakeBlock:
+
+    def __init__(self, index, size=100):
+        self.Index = index
+        self.Hash = FakeHash(index)
+        self.size = size
+
+    def Size(self):
+        return self.size
+
+
+class BlockCacheTest(NeoTestCase):
+
+    def test_add_and_pop(self):
+        cache = BlockCache(1000, 0)
+        self.assertEqual(cache.Add(FakeBlock(2), 0), [])
+        self.assertEqual(cache.Add(FakeBlock(2), 0), [])
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.Bytes, 100)
+
+        hash = FakeBlock(2).Hash.ToBytes()
+        self.assertIn(hash, cache)
+        self.assertEqual(cache[hash].Index, 2)
+
+        self.assertEqual(cache.Pop(hash).Index, 2)
+        self.assertIsNone(cache.Pop(hash))
+        self.assertEqual(cache.Bytes, 0)
+
+        # blocks at or below the chain height are never needed
+        self.assertEqual(cache.Add(FakeBlock(5), 5), [])
+        self.assertEqual(len(cache), 0)
+
+    def test_evicts_farthest_first(self):
+        cache = BlockCache(300, 0)
+        for index in [4, 2, 3]:
+            cache.Add(FakeBlock(index), 0)
+
+        self.assertEqual(cache.Add(FakeBlock(1), 0), [FakeBlock(4).Hash.ToBytes()])
+        self.assertEqual(cache.Evictions, 1)
+        self.assertEqual(cache.Bytes, 300)
+
+        # a block further ahead than everything cached is refused
+        self.assertEqual(cache.Add(FakeBlock(5), 0), [FakeBlock(5).Hash.ToBytes()])
+        self.assertEqual(cache.Refused, 1)
+        self.assertEqual(sorted(cache[h].Index for h in cache._blocks), [1, 2, 3])
+
+        # the next block is always accepted, even if it does not fit on its own
+        cache.Clear()
+        self.assertEqual(cache.Add(FakeBlock(1, 1000), 0), [])
+        self.assertEqual(len(cache), 1)
+
+    def test_window(self):
+        cache = BlockCache(0, 10)
+        self.assertEqual(cache.Add(FakeBlock(10), 0), [])
+        self.assertEqual(cache.Add(FakeBlock(11), 0), [FakeBlock(11).Hash.ToBytes()])
+        self.assertEqual(cache.Add(FakeBlock(11), 1), [])
+
+        stats = cache.ToJson()
+        self.assertEqual(stats['items'], 2)
+        self.assertEqual(stats['refused'], 1)
+        self.assertEqual(stats['window'], 10)
+
+    def test_persisted_entries_are_compacted(self):
+        cache = BlockCache(0, 0)
+        for index in range(1, 1000):
+            cache.Add(FakeBlock(index), index - 1)
+            cache.Pop(FakeBlock(index).Hash.ToBytes())
+        self.assertLess(len(cache._farthest), 100)
+
+    def test_add_during_compaction(self):
+        cache = BlockCache(0, 0)
+        threads = []
+
+        class InterruptedBlock(FakeBlock):
+            interrupt = False
+
+            @property
+            def Index(self):
+                if self.interrupt:
+                    # the reactor thread adds a block while the persisting thread compacts the heap
+                    self.interrupt = False
+                    thread = threading.Thread(target=cache.Add, args=(FakeBlock(1000), 0))
+                    thread.start()
+                    thread.join(0.1)
+                    threads.append(thread)
+                return self._index
+
+            @Index.setter
+            def Index(self, value):
+                self._index = value
+
+        block = InterruptedBlock(200)
+        cache.Add(block, 0)
+        for index in range(1, 100):
+            cache.Add(FakeBlock(index), 0)
+
+        block.interrupt = True
+        for index in range(1, 100):
+            cache.Pop(FakeBlock(index).Hash.ToBytes())
+        threads[0].join()
+
+        self.assertIn(FakeBlock(1000).Hash.ToBytes(), cache)
+        self.assertEqual(cache._Farthest(), (1000, FakeBlock(1000).Hash.ToBytes()))
+
+
+class BlockCacheChainTest(NeoTestCase):
+    CHAIN_PATH = os.path.join(settings.DATA_DIR_PATH, 'UnitTestBlockCacheChain')
+
+    @classmethod
+    def setUpClass(cls):
+        settings.setup_unittest_net()
+
+    def setUp(self):
+        Blockchain.DeregisterBlockchain()
+
+    def tearDown(self):
+        Blockchain.DeregisterBlockchain()
+
+    def test_dropped_blocks_are_requested_again(self):
+        chain = LevelDBBlockchain(self.CHAIN_PATH, backend=StorageBackend.MEMORY)
+        Blockchain.RegisterBlockchain(chain)
+        chain._block_cache = BlockCache(200, 0)
+
+        for index in [3, 4]:
+            chain.BlockRequests.add(FakeBlock(index).Hash.ToBytes())
+            chain.AddBlock(FakeBlock(index))
+        self.assertEqual(chain.BlockCacheCount, 2)
+
+        # the evicted block is no longer marked as requested, so it is requested again
+        chain.AddBlock(FakeBlock(2))
+        self.assertTrue(chain.ContainsCachedBlock(FakeBlock(2).Hash.ToBytes()))
+        self.assertFalse(chain.ContainsCachedBlock(FakeBlock(4).Hash.ToBytes()))
+        self.assertEqual(chain.BlockRequests, {FakeBlock(3).Hash.ToBytes()})
+
+        chain.BlockRequests.add(FakeBlock(5).Hash.ToBytes())
+        chain.AddBlock(FakeBlock(5))
+        self.assertFalse(chain.ContainsCachedBlock(FakeBlock(5).Hash.ToBytes()))
+        self.assertNotIn(FakeBlock(5).Hash.ToBytes(), chain.BlockRequests)
+        chain.Dispose()
@@ -0,0 +1,112 @@
+from neo.Utils.NeoTestCase import NeoTestCase
+from neo.Implementations.Blockchains.LevelDB.LevelDBBlockchain import LevelDBBlockchain
+from neo.Implementations.Blockchains.LevelDB.BlockPruner import BlockPruner
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Implementations.Blockchains.LevelDB.OutputIndex import OutputIndex
+from neo.Core.Blockchain import Blockchain, PrunedDataError
+from neo.Core.Block import Block
+from neo.Core.CoinReference import CoinReference
+from neo.Core.TX.Transaction import ContractTransaction, TransactionOutput
+from neo.Storage.StorageBackend import StorageBackend
+from neo.Settings import settings
+from neocore.Fixed8 import Fixed8
+from neocore.UInt160 import UInt160
+import time
+import os
+
+
+class BlockPrunerTest(NeoTestCase):
+    CHAIN_PATH = os.path.join(settings.DATA_DIR_PATH, 'UnitTestBlockPruner')
+
+    @classmethod
+    def setUpClass(cls):
+        settings.setup_unittest_net()
+
+    def setUp(self):
+        Blockchain.DeregisterBlockchain()
+        self._keep_blocks = settings.PRUNE_KEEP_BLOCKS
+
+    def tearDown(self):
+        settings.PRUNE_KEEP_BLOCKS = self._keep_blocks
+        self.chain.Dispose()
+        Blockchain.DeregisterBlockchain()
+
+    def _open(self):
+        self.chain = LevelDBBlockchain(self.CHAIN_PATH, backend=StorageBackend.MEMORY)
+        Blockchain.RegisterBlockchain(self.chain)
+
+    def _add_block(self, inputs, outputs):
+        tx = ContractTransaction(inputs=inputs, outputs=outputs)
+        prev = self.chain.CurrentBlock
+        block = Block(prev.Hash, prev.Timestamp + 15, prev.Index + 1, 0, prev.NextConsensus, prev.Script, [tx], build_root=True)
+        self.chain.AddBlock(block)
+        self.chain.PersistBlocks()
+        return block, tx
+
+    def _add_transfers(self):
+        # block 1 splits the genesis NEO, block 2 spends both outputs again
+        issue_tx = Blockchain.GenesisBlock().Transactions[-1]
+        neo = Blockchain.SystemShare().Hash
+        holder = issue_tx.outputs[0].ScriptHash
+        total = issue_tx.outputs[0].Value
+
+        outputs = [TransactionOutput(neo, Fixed8.FromDecimal(1), UInt160(data=bytearray(20))),
+                   TransactionOutput(neo, total - Fixed8.FromDecimal(1), holder)]
+        block_one, tx_one = self._add_block([CoinReference(issue_tx.Hash, 0)], outputs)
+
+        inputs = [CoinReference(tx_one.Hash, 0), CoinReference(tx_one.Hash, 1)]
+        block_two, tx_two = self._add_block(inputs, [TransactionOutput(neo, total, holder)])
+        self.assertEqual(self.chain.Height, 2)
+
+        return block_one, tx_one, block_two, tx_two
+
+    def test_prune(self):
+        self._open()
+        block_one, tx_one, block_two, tx_two = self._add_transfers()
+
+        self.assertEqual(BlockPruner(self.chain.DB, True, self.chain._header_index, 2).Prune(), 0)
+        self.assertEqual(self.chain.PrunedHeight, -1)
+
+        pruner = BlockPruner(self.chain.DB, True, self.chain._header_index, 0)
+        self.assertEqual(pruner.Prune(), 2)
+        self.assertEqual(self.chain.PrunedHeight, 2)
+
+        # headers and system fees are kept, the genesis block is never pruned
+        with self.assertRaises(PrunedDataError) as context:
+            self.chain.GetBlockByHeight(1)
+        self.assertEqual(context.exception.Height, 1)
+        self.assertEqual(self.chain.GetHeaderByHeight(1).Hash, block_one.Hash)
+        self.assertEqual(self.chain.GetSysFeeAmount(block_two.Hash.ToBytes()), self.chain.GetSysFeeAmountByHeight(2))
+        self.assertEqual(self.chain.GetBlockByHeight(0).Hash, Blockchain.GenesisBlock().Hash)
+
+        # the spent transaction has unclaimed NEO, the other one unspent outputs
+        self.assertEqual(self.chain.GetTransaction(tx_one.Hash)[0].Hash, tx_one.Hash)
+        self.assertEqual(self.chain.GetTransaction(tx_two.Hash)[0].Hash, tx_two.Hash)
+        self.assertEqual(len(list(self.chain.DB.iterator(prefix=DBPrefix.IX_PruneRetained))), 2)
+
+        # once claimed, the retained transaction is pruned by the next pass
+        self.chain.DB.delete(DBPrefix.ST_SpentCoin + tx_one.Hash.ToBytes())
+        self.assertEqual(pruner.Prune(), 0)
+
+        with self.assertRaises(PrunedDataError) as context:
+            self.chain.GetTransaction(tx_one.Hash)
+        self.assertEqual(context.exception.Height, 1)
+        self.assertTrue(self.chain.ContainsTransaction(tx_one.Hash))
+        self.assertIsNone(self.chain.DB.get(OutputIndex.Key(tx_one.Hash.ToBytes(), 0)))
+
+        self.assertEqual(list(self.chain.DB.iterator(prefix=DBPrefix.IX_PruneRetained, include_value=False)),
+                         [DBPrefix.IX_PruneRetained + tx_two.Hash.ToBytes()])
+        self.assertEqual(self.chain.GetUnspent(tx_two.Hash.ToBytes(), 0).Value, tx_two.outputs[0].Value)
+
+    def test_background(self):
+        settings.PRUNE_KEEP_BLOCKS = 1
+        self._open()
+        self._add_transfers()
+
+        for i in range(100):
+            if self.chain.PrunedHeight == 1:
+                break
+            time.sleep(0.05)
+
+        self.assertEqual(self.chain.PrunedHeight, 1)
+        self.assertEqual(self.chain.GetBlockByHeight(2).Index, 2)
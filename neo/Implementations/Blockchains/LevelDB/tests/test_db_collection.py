@@ -0,0 +1,126 @@
+from neo.Utils.NeoTestCase import NeoTestCase
+from neo.Implementations.Blockchains.LevelDB.DBCollection import DBCollection
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Core.State.StorageItem import StorageItem
+from neo.Settings import settings
+import plyvel
+import shutil
+import os
+
+
+class DBCollectionTest(NeoTestCase):
+    DB_PATH = os.path.join(settings.DATA_DIR_PATH, 'UnitTestDBCollection')
+
+    def setUp(self):
+        self.db = plyvel.DB(self.DB_PATH, create_if_missing=True)
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.DB_PATH)
+
+    def _collection(self):
+        return DBCollection(self.db, DBPrefix.ST_Storage, StorageItem, raw=True)
+
+    def test_commit_order_and_values(self):
+        storages = self._collection()
+        keys = [b'c', b'a', b'b']
+        for key in keys:
+            storages.Add(key, StorageItem(value=key))
+
+        # marking an existing key again does not move it
+        storages.MarkChanged(b'c')
+        self.assertEqual(list(storages.Changed), keys)
+
+        storages.Commit(None)
+
+        storages = self._collection()
+        for key in keys:
+            self.assertEqual(storages.TryGet(key).Value, key)
+
+    def test_remove(self):
+        storages = self._collection()
+        storages.Add(b'a', StorageItem(value=b'1'))
+        storages.Add(b'b', StorageItem(value=b'2'))
+        storages.Commit(None)
+
+        storages = self._collection()
+        storages.Remove(b'a')
+        storages.Remove(b'a')
+        self.assertEqual(list(storages.Deleted), [b'a'])
+        self.assertIsNone(storages.TryGet(b'a'))
+
+        # re-adding a removed key cancels the removal
+        storages.Remove(b'b')
+        storages.ReplaceOrAdd(b'b', StorageItem(value=b'3'))
+        self.assertEqual(list(storages.Deleted), [b'a'])
+        storages.Commit(None)
+
+        self.assertIsNone(self.db.get(DBPrefix.ST_Storage + b'a'))
+        storages = self._collection()
+        self.assertEqual(storages.TryGet(b'b').Value, b'3')
+
+    def test_commit_without_destroy(self):
+        storages = self._collection()
+        storages.MarkForReset()
+        storages.Add(b'a', StorageItem(value=b'1'))
+        storages.Remove(b'b')
+
+        with self.db.write_batch() as wb:
+            storages.Commit(wb, destroy=False)
+
+        self.assertEqual(len(storages.Changed), 0)
+        self.assertEqual(len(storages.Deleted), 0)
+        self.assertEqual(storages.TryGet(b'a').Value, b'1')
+
+    def test_try_find(self):
+        contract = bytes(range(20))
+        other = bytes(20)
+
+        storages = self._collection()
+        for key in [b'a1', b'a3', b'a5', b'b1']:
+            storages.Add(contract + key, StorageItem(value=b'stored ' + key))
+        storages.Add(other + b'a2', StorageItem(value=b'other'))
+        storages.Commit(None)
+
+        storages = self._collection()
+        storages.GetAndChange(contract + b'a3').Value = b'changed'
+        storages.Add(contract + b'a4', StorageItem(value=b'added'))
+        storages.Add(contract + b'a0', StorageItem(value=b'added'))
+        storages.Remove(contract + b'a5')
+
+        # a key containing the prefix elsewhere does not match
+        storages.Add(other + contract + b'a', StorageItem(value=b'other'))
+
+        iterator = storages.TryFind(contract + b'a')
+
+        # changes made after creating the iterator are not seen
+        storages.Add(contract + b'a2', StorageItem(value=b'late'))
+        storages.TryGet(contract + b'a4').Value = b'late'
+
+        results = []
+        while iterator.Next():
+            results.append((iterator.key, iterator.value))
+
+        self.assertEqual(results, [(b'a0', b'added'), (b'a1', b'stored a1'), (b'a3', b'changed'), (b'a4', b'added')])
+
+    def test_try_find_is_lazy(self):
+        contract = bytes(range(20))
+
+        storages = self._collection()
+        for i in range(100):
+            storages.Add(contract + bytes([i]), StorageItem(value=bytes([i])))
+        storages.Commit(None)
+
+        deserialized = []
+
+        class CountingItem(StorageItem):
+            @staticmethod
+            def DeserializeFromDB(buffer):
+                deserialized.append(buffer)
+                return StorageItem.DeserializeFromDB(buffer)
+
+        storages = DBCollection(self.db, DBPrefix.ST_Storage, CountingItem, raw=True)
+        iterator = storages.TryFind(contract)
+        self.assertTrue(iterator.Next())
+        self.assertEqual(iterator.value, b'\x00')
+        self.assertEqual(len(deserialized), 1)
@@ -0,0 +1,115 @@
+from neo.Utils.NeoTestCase import NeoTestCase
+from neo.Implementations.Blockchains.LevelDB.DBOverlay import DBOverlay
+from neo.Implementations.Blockchains.LevelDB.LevelDBBlockchain import LevelDBBlockchain
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Implementations.Blockchains.LevelDB.tests import test_initial_db
+from neo.Core.Blockchain import Blockchain
+from neo.IO.Helper import Helper
+from neo.Settings import settings
+import binascii
+import plyvel
+import shutil
+import os
+
+
+class DBOverlayTest(NeoTestCase):
+    DB_PATH = os.path.join(settings.DATA_DIR_PATH, 'UnitTestDBOverlay')
+
+    def setUp(self):
+        self.db = plyvel.DB(self.DB_PATH, create_if_missing=True)
+        self.db.put(b'a1', b'1')
+        self.db.put(b'a3', b'3')
+        self.db.put(b'b1', b'1')
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.DB_PATH)
+
+    def test_reads_see_pending_writes(self):
+        overlay = DBOverlay(self.db)
+        overlay.put(b'a2', b'2')
+        overlay.delete(b'a3')
+
+        self.assertEqual(overlay.get(b'a1'), b'1')
+        self.assertEqual(overlay.get(b'a2'), b'2')
+        self.assertIsNone(overlay.get(b'a3'))
+        self.assertIsNone(self.db.get(b'a2'))
+
+        self.assertEqual(list(overlay.iterator(prefix=b'a')), [(b'a1', b'1'), (b'a2', b'2')])
+        self.assertEqual(list(overlay.iterator(include_value=False)), [b'a1', b'a2', b'b1'])
+        self.assertEqual(list(overlay.iterator(start=b'a2', stop=b'b1')), [(b'a2', b'2')])
+
+    def test_failed_batch_is_discarded(self):
+        overlay = DBOverlay(self.db)
+        with overlay.write_batch() as wb:
+            wb.put(b'c1', b'1')
+
+        with self.assertRaises(ValueError):
+            with overlay.write_batch() as wb:
+                wb.put(b'c2', b'2')
+                raise ValueError()
+
+        self.assertEqual(overlay.get(b'c1'), b'1')
+        self.assertIsNone(overlay.get(b'c2'))
+
+    def test_flush_and_detach(self):
+        overlay = DBOverlay(self.db, marker=b'marker')
+        overlay.put(b'marker', b'x')
+        overlay.put(b'c1', b'1')
+        overlay.delete(b'a1')
+
+        self.assertEqual(overlay.Flush(), 3)
+        self.assertEqual(len(overlay), 0)
+        self.assertEqual(self.db.get(b'marker'), b'x')
+        self.assertEqual(self.db.get(b'c1'), b'1')
+        self.assertIsNone(self.db.get(b'a1'))
+
+        self.assertIs(overlay.Detach(), self.db)
+        overlay.put(b'c2', b'2')
+        self.assertEqual(self.db.get(b'c2'), b'2')
+
+
+class BatchedPersistTest(NeoTestCase):
+    CHAIN_PATH = os.path.join(settings.DATA_DIR_PATH, 'UnitTestBatchedPersist')
+
+    @classmethod
+    def setUpClass(cls):
+        settings.setup_unittest_net()
+
+    def setUp(self):
+        Blockchain.DeregisterBlockchain()
+        self._batch_size = settings.PERSIST_BATCH_SIZE
+        settings.PERSIST_BATCH_SIZE = 10
+
+    def tearDown(self):
+        settings.PERSIST_BATCH_SIZE = self._batch_size
+        Blockchain.DeregisterBlockchain()
+        shutil.rmtree(self.CHAIN_PATH)
+
+    def test_persist_blocks(self):
+        chain = LevelDBBlockchain(self.CHAIN_PATH)
+        Blockchain.RegisterBlockchain(chain)
+
+        block_one = Helper.AsSerializableWithType(binascii.unhexlify(test_initial_db.LevelDBTest.block_one_raw), 'neo.Core.Block.Block')
+        chain.AddBlock(block_one)
+
+        persisted = []
+
+        def on_persisted(block):
+            persisted.append((block.Index, chain.GetBlockByHeight(block.Index), isinstance(chain._db, DBOverlay)))
+
+        chain.PersistCompleted.on_change += on_persisted
+        try:
+            chain.PersistBlocks()
+        finally:
+            chain.PersistCompleted.on_change -= on_persisted
+
+        self.assertEqual(chain.Height, 1)
+        self.assertEqual(persisted[0][0], 1)
+        self.assertEqual(persisted[0][1].Hash, block_one.Hash)
+        self.assertTrue(persisted[0][2])
+
+        # the overlay is written and removed once the batch is done
+        self.assertNotIsInstance(chain._db, DBOverlay)
+        self.assertEqual(chain._db.get(DBPrefix.SYS_CurrentBlock), block_one.Hash.ToBytes() + block_one.IndexBytes())
+        chain.Dispose()
@@ -0,0 +1,113 @@
+from neo.Utils.NeoTestCase import NeoTestCase
+from neo.Implementations.Blockchains.LevelDB.LevelDBBlockchain import LevelDBBlockchain
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Implementations.Blockchains.LevelDB.DBSchema import DBSchema
+from neo.Core.Blockchain import Blockchain
+from neo.Core.State.AssetState import AssetState
+from neo.Settings import settings
+import plyvel
+import shutil
+import os
+
+
+class DBSchemaTest(NeoTestCase):
+    HEX_PATH = os.path.join(settings.DATA_DIR_PATH, 'UnitTestChainHex')
+    RAW_PATH = os.path.join(settings.DATA_DIR_PATH, 'UnitTestChainRaw')
+
+    @classmethod
+    def setUpClass(cls):
+        settings.setup_unittest_net()
+
+    def setUp(self):
+        Blockchain.DeregisterBlockchain()
+
+    def tearDown(self):
+        Blockchain.DeregisterBlockchain()
+        for path in [self.HEX_PATH, self.RAW_PATH]:
+            if os.path.exists(path):
+                shutil.rmtree(path)
+
+    def _create_hex_chain(self):
+        db = plyvel.DB(self.HEX_PATH, create_if_missing=True)
+        db.put(DBPrefix.SYS_Version, DBSchema.HEX)
+        db.close()
+
+        chain = LevelDBBlockchain(self.HEX_PATH)
+        chain.Persist(Blockchain.GenesisBlock())
+        return chain
+
+    def test_new_chain_is_raw(self):
+        chain = LevelDBBlockchain(self.RAW_PATH)
+        Blockchain.RegisterBlockchain(chain)
+
+        self.assertTrue(chain.RawStorage)
+        self.assertEqual(chain._db.get(DBPrefix.SYS_Version), DBSchema.RAW)
+
+        genesis = Blockchain.GenesisBlock()
+        block = chain.GetBlockByHeight(0)
+        self.assertEqual(block.Hash, genesis.Hash)
+
+        tx, height = chain.GetTransaction(genesis.Transactions[-1].Hash)
+        self.assertEqual(tx.Hash, genesis.Transactions[-1].Hash)
+        self.assertEqual(height, 0)
+
+        self.assertEqual(len(chain.ShowAllAssets()), 2)
+        chain.Dispose()
+
+    def test_hex_chain_still_readable(self):
+        chain = self._create_hex_chain()
+        Blockchain.RegisterBlockchain(chain)
+
+        self.assertFalse(chain.RawStorage)
+        self.assertEqual(chain._db.get(DBPrefix.SYS_Version), DBSchema.HEX)
+
+        block = chain.GetBlockByHeight(0)
+        self.assertEqual(block.Hash, Blockchain.GenesisBlock().Hash)
+        chain.Dispose()
+
+    def test_migrate(self):
+        chain = self._create_hex_chain()
+        hex_items = list(chain._db.iterator())
+        chain.Dispose()
+
+        source = plyvel.DB(self.HEX_PATH)
+        target = plyvel.DB(self.RAW_PATH, create_if_missing=True)
+
+        progress = []
+        count = DBSchema.Migrate(source, target, batch_size=2, progress=progress.append)
+        self.assertEqual(count, len(hex_items) - 1)
+        self.assertEqual(progress[-1], count)
+
+        raw_items = list(target.iterator())
+        self.assertEqual(target.get(DBPrefix.SYS_Version), DBSchema.RAW)
+        self.assertEqual([k for k, v in hex_items], [k for k, v in raw_items])
+
+        size_hex = sum(len(v) for k, v in hex_items if k[0:1] in DBSchema.STATE_PREFIXES)
+        size_raw = sum(len(v) for k, v in raw_items if k[0:1] in DBSchema.STATE_PREFIXES)
+        self.assertEqual(size_hex, size_raw * 2)
+
+        # migrating twice is refused
+        with self.assertRaises(ValueError):
+            DBSchema.Migrate(target, source)
+
+        source.close()
+        target.close()
+
+        chain = LevelDBBlockchain(self.RAW_PATH)
+        Blockchain.RegisterBlockchain(chain)
+        self.assertTrue(chain.RawStorage)
+
+        genesis = Blockchain.GenesisBlock()
+        self.assertEqual(chain.GetBlockByHeight(0).Hash, genesis.Hash)
+        asset = chain.GetAssetState(Blockchain.SystemShare().Hash.ToBytes())
+        self.assertIsInstance(asset, AssetState)
+        self.assertEqual(asset.AssetId, Blockchain.SystemShare().Hash)
+        chain.Dispose()
+
+    def test_header_hash_list(self):
+        hashes = [Blockchain.GenesisBlock().Hash.ToBytes()] * 2000
+
+        for raw in [True, False]:
+            data = DBSchema.SerializeHeaderHashList(hashes, raw)
+            self.assertEqual(len(data), 32 * 2000 if raw else 64 * 2000)
+            self.assertEqual(DBSchema.DeserializeHeaderHashList(data, raw), hashes)
@@ -0,0 +1,77 @@
+from neo.Utils.NeoTestCase import NeoTestCase
+from neo.Implementations.Blockchains.LevelDB.LevelDBBlockchain import LevelDBBlockchain
+from neo.Implementations.Blockchains.LevelDB.DebugStorage import DebugStorage
+from neo.Implementations.Blockchains.LevelDB.DBCollection import DBCollection
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Core.Blockchain import Blockchain
+from neo.Core.State.StorageItem import StorageItem
+from neo.Storage.StorageBackend import StorageBackend
+from neo.Settings import settings
+import os
+
+
+class DebugStorageTest(NeoTestCase):
+    CHAIN_PATH = os.path.join(settings.DATA_DIR_PATH, 'UnitTestDebugStorage')
+
+    @classmethod
+    def setUpClass(cls):
+        settings.setup_unittest_net()
+
+    def setUp(self):
+        Blockchain.DeregisterBlockchain()
+        self.chain = LevelDBBlockchain(self.CHAIN_PATH, backend=StorageBackend.MEMORY)
+        Blockchain.RegisterBlockchain(self.chain)
+
+    def tearDown(self):
+        self.chain.Dispose()
+        Blockchain.DeregisterBlockchain()
+
+    def _storages(self, db):
+        return DBCollection(db, DBPrefix.ST_Storage, StorageItem)
+
+    def test_copy_on_write(self):
+        live = self._storages(self.chain.DB)
+        live.Add(b'live', StorageItem(value=b'\x01'))
+        live.Add(b'other', StorageItem(value=b'\x02'))
+        live.Commit(None)
+
+        debug = DebugStorage()
+        storages = self._storages(debug.db)
+        self.assertEqual(storages.TryGet(b'live').Value, b'\x01')
+
+        storages.GetAndChange(b'live').Value = b'\x03'
+        storages.Add(b'debug', StorageItem(value=b'\x04'))
+        storages.Remove(b'other')
+        storages.Commit(None)
+
+        storages = self._storages(debug.db)
+        self.assertEqual(storages.TryGet(b'live').Value, b'\x03')
+        self.assertEqual(storages.TryGet(b'debug').Value, b'\x04')
+        self.assertIsNone(storages.TryGet(b'other'))
+        self.assertEqual(list(debug.db.iterator(prefix=DBPrefix.ST_Storage, include_value=False)),
+                         [DBPrefix.ST_Storage + b'debug', DBPrefix.ST_Storage + b'live'])
+
+        # the chain is left untouched
+        live = self._storages(self.chain.DB)
+        self.assertEqual(live.TryGet(b'live').Value, b'\x01')
+        self.assertEqual(live.TryGet(b'other').Value, b'\x02')
+        self.assertIsNone(live.TryGet(b'debug'))
+
+        # the next session reads from a new view of the chain, and keeps the changes
+        live.Add(b'new', StorageItem(value=b'\x05'))
+        live.Commit(None)
+        # as persisting a block would
+        self.chain._InvalidateReadView()
+
+        storages = self._storages(debug.db)
+        self.assertEqual(storages.TryGet(b'new').Value, b'\x05')
+        self.assertEqual(storages.TryGet(b'live').Value, b'\x03')
+        self.assertIsNone(storages.TryGet(b'other'))
+
+        # resetting drops the changes
+        debug.reset()
+
+        storages = self._storages(debug.db)
+        self.assertEqual(storages.TryGet(b'live').Value, b'\x01')
+        self.assertEqual(storages.TryGet(b'new').Value, b'\x05')
+        self.assertIsNone(storages.TryGet(b'debug'))
@@ -0,0 +1,155 @@
+from neo.Utils.NeoTestCase import NeoTestCase
+from neo.Implementations.Blockchains.LevelDB.HeaderIndex import HeaderIndex
+from neo.Implementations.Blockchains.LevelDB.LevelDBBlockchain import LevelDBBlockchain
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Implementations.Blockchains.LevelDB.DBSchema import DBSchema
+from neo.Core.Blockchain import Blockchain
+from neo.Settings import settings
+import binascii
+import hashlib
+import plyvel
+import shutil
+import os
+
+
+class HeaderIndexTest(NeoTestCase):
+
+    def _hashes(self, count):
+        return [binascii.hexlify(hashlib.sha256(i.to_bytes(4, 'little')).digest()) for i in range(count)]
+
+    def test_sequence(self):
+        hashes = self._hashes(3000)
+        index = HeaderIndex(hashes[:1])
+        index.append(hashes[1])
+        index.extend(hashes[2:])
+
+        self.assertEqual(len(index), 3000)
+        self.assertEqual(index[0], hashes[0])
+        self.assertEqual(index[2999], hashes[2999])
+        self.assertEqual(index[-1], hashes[-1])
+        self.assertEqual(list(index), hashes)
+
+        with self.assertRaises(IndexError):
+            index[3000]
+
+        part = index[10:2010]
+        self.assertIsInstance(part, HeaderIndex)
+        self.assertEqual(list(part), hashes[10:2010])
+        self.assertEqual(list(index[2990:5000]), hashes[2990:])
+        self.assertEqual(len(index[5000:6000]), 0)
+
+    def test_lookup(self):
+        hashes = self._hashes(5000)
+        index = HeaderIndex(hashes)
+
+        for height in [0, 1, 1023, 1024, 4999]:
+            self.assertEqual(index.IndexOf(hashes[height]), height)
+            self.assertIn(hashes[height], index)
+
+        unknown = binascii.hexlify(hashlib.sha256(b'unknown').digest())
+        self.assertEqual(index.IndexOf(unknown), -1)
+        self.assertNotIn(unknown, index)
+        self.assertNotIn(b'not a hash', index)
+        self.assertNotIn(hashes[0][:32], index)
+
+        # a repeated hash resolves to its first height
+        index.append(hashes[7])
+        self.assertEqual(index.IndexOf(hashes[7]), 7)
+        self.assertEqual(index[-1], hashes[7])
+
+    def test_raw(self):
+        hashes = self._hashes(100)
+        index = HeaderIndex(hashes)
+
+        raw = index.ToRaw()
+        self.assertEqual(len(raw), 100 * HeaderIndex.HASH_SIZE)
+
+        copy = HeaderIndex.FromRaw(raw)
+        self.assertEqual(list(copy), hashes)
+        self.assertEqual(copy.IndexOf(hashes[50]), 50)
+
+        with self.assertRaises(ValueError):
+            index.append(b'abcd')
+
+    def test_snapshot(self):
+        hashes = self._hashes(3000)
+        index = HeaderIndex(hashes)
+
+        path = os.path.join(settings.DATA_DIR_PATH, 'UnitTestHeaderIndex.snapshot')
+        try:
+            index.Save(path, tag=2000)
+            loaded, tag = HeaderIndex.Load(path)
+            self.assertEqual(tag, 2000)
+            self.assertEqual(list(loaded), hashes)
+            self.assertEqual(loaded.IndexOf(hashes[2500]), 2500)
+
+            with open(path, 'r+b') as f:
+                f.truncate(100)
+            with self.assertRaises(ValueError):
+                HeaderIndex.Load(path)
+        finally:
+            os.remove(path)
+
+
+class HeaderSnapshotTest(NeoTestCase):
+    CHAIN_PATH = os.path.join(settings.DATA_DIR_PATH, 'UnitTestHeaderSnapshot')
+
+    @classmethod
+    def setUpClass(cls):
+        settings.setup_unittest_net()
+
+    def setUp(self):
+        Blockchain.DeregisterBlockchain()
+
+        genesis = Blockchain.GenesisBlock()
+        self.hashes = [genesis.Hash.ToBytes()]
+        self.hashes += [binascii.hexlify(hashlib.sha256(i.to_bytes(4, 'little')).digest()) for i in range(1, 4500)]
+
+        # a chain with 4000 headers in hash lists and the current header at 4499
+        db = plyvel.DB(self.CHAIN_PATH, create_if_missing=True)
+        for start in [0, 2000]:
+            db.put(DBPrefix.IX_HeaderHashList + start.to_bytes(4, 'little'),
+                   DBSchema.SerializeHeaderHashList(self.hashes[start:start + 2000], True))
+
+        header = genesis.Header
+        header.Index = 4499
+        db.put(DBPrefix.DATA_Block + self.hashes[-1], bytes(8) + DBSchema.Serialize(header, True))
+        db.put(DBPrefix.SYS_CurrentHeader, self.hashes[-1] + (4499).to_bytes(4, 'little'))
+        db.put(DBPrefix.SYS_CurrentBlock, self.hashes[0] + bytes(4))
+        db.put(DBPrefix.SYS_Version, DBSchema.RAW)
+        db.close()
+
+    def tearDown(self):
+        Blockchain.DeregisterBlockchain()
+        shutil.rmtree(self.CHAIN_PATH)
+
+    def test_snapshot_restores_index(self):
+        chain = LevelDBBlockchain(self.CHAIN_PATH)
+        self.assertEqual(chain._header_snapshot_length, 0)
+        self.assertEqual(list(chain._header_index), self.hashes[:4000])
+
+        # headers beyond the stored hash lists are kept in the snapshot as well
+        chain._header_index.extend(self.hashes[4000:])
+        chain.Dispose()
+
+        chain = LevelDBBlockchain(self.CHAIN_PATH)
+        self.assertEqual(chain._header_snapshot_length, 4500)
+        self.assertEqual(chain._stored_header_count, 4000)
+        self.assertEqual(list(chain._header_index), self.hashes)
+        self.assertEqual(chain.GetHeaderHash(4321), self.hashes[4321])
+        chain.Dispose()
+
+    def test_snapshot_must_match_database(self):
+        chain = LevelDBBlockchain(self.CHAIN_PATH)
+        chain._header_index.extend(self.hashes[4000:])
+        chain.Dispose()
+
+        # the current header no longer matches the last hash of the snapshot
+        db = plyvel.DB(self.CHAIN_PATH)
+        db.put(DBPrefix.SYS_CurrentHeader, self.hashes[-2] + (4499).to_bytes(4, 'little'))
+        db.close()
+
+        chain = LevelDBBlockchain(self.CHAIN_PATH)
+        self.assertEqual(chain._header_snapshot_length, 0)
+        self.assertEqual(list(chain._header_index), self.hashes[:4000])
+        chain.Dispose()
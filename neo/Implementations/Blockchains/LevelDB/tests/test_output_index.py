@@ -0,0 +1,83 @@
+from neo.Utils.NeoTestCase import NeoTestCase
+from neo.Implementations.Blockchains.LevelDB.LevelDBBlockchain import LevelDBBlockchain
+from neo.Implementations.Blockchains.LevelDB.OutputIndex import OutputIndex
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Core.Blockchain import Blockchain
+from neo.Settings import settings
+import shutil
+import os
+
+
+class OutputIndexTest(NeoTestCase):
+    CHAIN_PATH = os.path.join(settings.DATA_DIR_PATH, 'UnitTestOutputIndex')
+
+    @classmethod
+    def setUpClass(cls):
+        settings.setup_unittest_net()
+
+    def setUp(self):
+        Blockchain.DeregisterBlockchain()
+        self.chain = LevelDBBlockchain(self.CHAIN_PATH)
+        Blockchain.RegisterBlockchain(self.chain)
+
+        # the genesis block issues all NEO in its last transaction
+        self.issue_tx = Blockchain.GenesisBlock().Transactions[-1]
+
+    def tearDown(self):
+        self.chain.Dispose()
+        Blockchain.DeregisterBlockchain()
+        shutil.rmtree(self.CHAIN_PATH)
+
+    def _index_keys(self):
+        return list(self.chain._db.iterator(prefix=DBPrefix.IX_Output, include_value=False))
+
+    def test_persist_indexes_outputs(self):
+        self.assertIsNotNone(self.chain._db.get(DBPrefix.SYS_OutputIndex))
+
+        key = OutputIndex.Key(self.issue_tx.Hash.ToBytes(), 0)
+        value = self.chain._db.get(key)
+        self.assertEqual(len(value), OutputIndex.VALUE_SIZE)
+
+        output, height = OutputIndex.Deserialize(value)
+        self.assertEqual(output, self.issue_tx.outputs[0])
+        self.assertEqual(output.Value, self.issue_tx.outputs[0].Value)
+        self.assertEqual(height, 0)
+
+    def test_get_output(self):
+        output, height = self.chain.GetOutput(self.issue_tx.Hash, 0)
+        self.assertEqual(output.AssetId, Blockchain.SystemShare().Hash)
+        self.assertEqual(output.ScriptHash, self.issue_tx.outputs[0].ScriptHash)
+        self.assertEqual(height, 0)
+
+        output, height = self.chain.GetOutput(self.issue_tx.Hash, 1)
+        self.assertIsNone(output)
+        self.assertEqual(height, 0)
+
+        output, height = self.chain.GetOutput(Blockchain.GenesisBlock().Hash, 0)
+        self.assertIsNone(output)
+        self.assertEqual(height, -1)
+
+        unspents = self.chain.GetAllUnspent(self.issue_tx.Hash)
+        self.assertEqual(unspents, self.issue_tx.outputs)
+
+    def test_fallback_and_backfill(self):
+        keys = self._index_keys()
+        self.assertGreater(len(keys), 0)
+
+        with self.chain._db.write_batch() as wb:
+            for key in keys:
+                wb.delete(key)
+            wb.delete(DBPrefix.SYS_OutputIndex)
+
+        # without an index entry the output is read from the transaction
+        output, height = self.chain.GetOutput(self.issue_tx.Hash, 0)
+        self.assertEqual(output, self.issue_tx.outputs[0])
+        self.assertEqual(height, 0)
+
+        progress = []
+        count = OutputIndex.Backfill(self.chain._db, self.chain.RawStorage, batch_size=1, progress=progress.append)
+        self.assertEqual(count, len(Blockchain.GenesisBlock().Transactions))
+        self.assertEqual(progress[-1], count)
+
+        self.assertEqual(self._index_keys(), keys)
+        self.assertIsNotNone(self.chain._db.get(DBPrefix.SYS_OutputIndex))
@@ -0,0 +1,71 @@
+from neo.Utils.NeoTestCase import NeoTestCase
+from neo.Implementations.Blockchains.LevelDB.LevelDBBlockchain import LevelDBBlockchain, LevelDBReadView
+from neo.Implementations.Blockchains.LevelDB.tests import test_initial_db
+from neo.Core.Blockchain import Blockchain
+from neo.IO.Helper import Helper
+from neo.Settings import settings
+import binascii
+import threading
+import shutil
+import os
+
+
+class ReadViewTest(NeoTestCase):
+    CHAIN_PATH = os.path.join(settings.DATA_DIR_PATH, 'UnitTestReadView')
+
+    @classmethod
+    def setUpClass(cls):
+        settings.setup_unittest_net()
+
+    def setUp(self):
+        Blockchain.DeregisterBlockchain()
+        self.chain = LevelDBBlockchain(self.CHAIN_PATH)
+        Blockchain.RegisterBlockchain(self.chain)
+
+        self.block_one = Helper.AsSerializableWithType(binascii.unhexlify(test_initial_db.LevelDBTest.block_one_raw), 'neo.Core.Block.Block')
+
+    def tearDown(self):
+        self.chain.Dispose()
+        Blockchain.DeregisterBlockchain()
+        shutil.rmtree(self.CHAIN_PATH)
+
+    def test_view_is_pinned(self):
+        view = self.chain.GetReadView()
+        self.assertIsInstance(view, LevelDBReadView)
+        self.assertEqual(view.Height, 0)
+
+        self.chain.AddBlock(self.block_one)
+        self.chain.PersistBlocks()
+        self.assertEqual(self.chain.Height, 1)
+
+        # the old view does not see the new block
+        self.assertEqual(view.Height, 0)
+        self.assertEqual(view.CurrentBlockHash, Blockchain.GenesisBlock().Hash.ToBytes())
+        self.assertIsNone(view.GetBlockByHeight(1))
+        self.assertIsNone(view.GetTransaction(self.block_one.Transactions[0].Hash)[0])
+
+        new_view = self.chain.GetReadView()
+        self.assertIsNot(new_view, view)
+        self.assertEqual(new_view.Height, 1)
+        self.assertEqual(new_view.GetBlockByHeight(1).Hash, self.block_one.Hash)
+
+        with self.assertRaises(Exception):
+            view.Persist(self.block_one)
+
+    def test_default_in_read_view(self):
+        with Blockchain.ReadView() as view:
+            self.assertIs(Blockchain.Default(), view)
+            self.assertIs(view, self.chain.GetReadView())
+
+            # other threads still get the chain itself
+            result = []
+            thread = threading.Thread(target=lambda: result.append(Blockchain.Default()))
+            thread.start()
+            thread.join()
+            self.assertIs(result[0], self.chain)
+
+            with Blockchain.ReadView() as nested:
+                self.assertIs(nested, view)
+            self.assertIs(Blockchain.Default(), view)
+
+        self.assertIs(Blockchain.Default(), self.chain)
@@ -0,0 +1,103 @@
+from neo.Utils.NeoTestCase import NeoTestCase
+from neo.Implementations.Blockchains.LevelDB.LevelDBBlockchain import LevelDBBlockchain
+from neo.Implementations.Blockchains.LevelDB.DBCollection import DBCollection
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Implementations.Blockchains.LevelDB.SearchIndex import SearchIndex
+from neo.Core.Blockchain import Blockchain
+from neo.Core.FunctionCode import FunctionCode
+from neo.Core.State.ContractState import ContractState
+from neo.Storage.StorageBackend import StorageBackend
+from neo.Settings import settings
+import os
+
+
+class SearchIndexTest(NeoTestCase):
+    CHAIN_PATH = os.path.join(settings.DATA_DIR_PATH, 'UnitTestSearchIndex')
+
+    @classmethod
+    def setUpClass(cls):
+        settings.setup_unittest_net()
+
+    def setUp(self):
+        Blockchain.DeregisterBlockchain()
+        self.chain = LevelDBBlockchain(self.CHAIN_PATH, backend=StorageBackend.MEMORY)
+        Blockchain.RegisterBlockchain(self.chain)
+
+    def tearDown(self):
+        self.chain.Dispose()
+        Blockchain.DeregisterBlockchain()
+
+    def _contracts(self):
+        return DBCollection(self.chain.DB, DBPrefix.ST_Contract, ContractState, raw=True,
+                            index=SearchIndex(DBPrefix.ST_Contract, True))
+
+    def _add_contract(self, script, name, author):
+        contract = ContractState(FunctionCode(script=script, param_list=bytearray(b'\x07')), 0, name, b'1', author, b'dev@example.com', b'Example')
+        contracts = self._contracts()
+        contracts.Add(contract.Code.ScriptHash().ToBytes(), contract)
+        contracts.Commit(None)
+        return contract
+
+    def test_tokenize(self):
+        self.assertEqual(SearchIndex.Tokenize(b'NEX Template-V3, by nex.io'), {'nex', 'template', 'v3', 'by', 'io'})
+        self.assertEqual(SearchIndex.Tokenize('  !  '), set())
+
+    def test_genesis_assets(self):
+        self.assertIsNotNone(self.chain.DB.get(DBPrefix.SYS_SearchIndex))
+
+        neo = Blockchain.SystemShare().Hash.ToBytes()
+        gas = Blockchain.SystemCoin().Hash.ToBytes()
+        self.assertEqual(SearchIndex.Find(self.chain.DB, DBPrefix.ST_Asset, 'antsh'), [neo])
+
+        self.assertEqual([a.AssetId.ToBytes() for a in self.chain.SearchAssetState('NEO')], [neo])
+        self.assertEqual([a.AssetId.ToBytes() for a in self.chain.SearchAssetState('gas')], [gas])
+        self.assertEqual(len(self.chain.SearchAssetState('AntS')), 1)
+
+        # the search is case sensitive, the index is not
+        self.assertEqual(self.chain.SearchAssetState('antshare'), [])
+
+    def test_contracts(self):
+        first = self._add_contract(b'\x51', b'Token Template', b'Alice')
+        second = self._add_contract(b'\x52', b'Other token', b'Bob Template')
+
+        self.assertEqual(len(self.chain.SearchContracts('template')), 2)
+        self.assertEqual([c.Name for c in self.chain.SearchContracts('TOKEN temp')], [first.Name])
+        self.assertEqual([c.Name for c in self.chain.SearchContracts('bob')], [second.Name])
+        self.assertEqual(self.chain.SearchContracts('token alice'), [])
+        self.assertEqual(self.chain.SearchContracts('missing'), [])
+
+        # a query may start in the middle of a word, as with a scan of all contracts
+        self.assertEqual(len(SearchIndex.Find(self.chain.DB, DBPrefix.ST_Contract, 'oke')), 2)
+        self.assertEqual(len(self.chain.SearchContracts('oke')), 2)
+        self.assertEqual([c.Name for c in self.chain.SearchContracts('ken temp')], [first.Name])
+        self.assertEqual([c.Name for c in self.chain.SearchContracts('ob')], [second.Name])
+
+        # updating a stored contract keeps its entries, deleting it removes them
+        contracts = self._contracts()
+        contracts.GetAndChange(first.Code.ScriptHash().ToBytes())
+        contracts.Commit(None)
+        self.assertEqual(len(self.chain.SearchContracts('alice')), 1)
+
+        entries = len(list(self.chain.DB.iterator(prefix=DBPrefix.IX_Search, include_value=False)))
+        contracts = self._contracts()
+        contracts.Remove(second.Code.ScriptHash().ToBytes())
+        contracts.Commit(None)
+        self.assertEqual([c.Name for c in self.chain.SearchContracts('template')], [first.Name])
+        self.assertEqual(len(list(self.chain.DB.iterator(prefix=DBPrefix.IX_Search, include_value=False))),
+                         entries - len(SearchIndex.Words(DBPrefix.ST_Contract, second)))
+
+    def test_rebuild(self):
+        self._add_contract(b'\x51', b'Token Template', b'Alice')
+        for key in list(self.chain.DB.iterator(prefix=DBPrefix.IX_Search, include_value=False)):
+            self.chain.DB.delete(key)
+        # an index of an older version is not used
+        self.chain.DB.put(DBPrefix.SYS_SearchIndex, b'\x01')
+
+        # without a complete index every contract is checked
+        self.assertEqual(len(self.chain.SearchContracts('alice')), 1)
+
+        SearchIndex.Rebuild(self.chain.DB, True)
+        self.assertEqual(self.chain.DB.get(DBPrefix.SYS_SearchIndex), SearchIndex.VERSION)
+        self.assertEqual(len(SearchIndex.Find(self.chain.DB, DBPrefix.ST_Contract, 'alice')), 1)
+        self.assertEqual(len(SearchIndex.Find(self.chain.DB, DBPrefix.ST_Asset, 'antcoin')), 1)
+        self.assertEqual(len(self.chain.SearchContracts('alice')), 1)
@@ -0,0 +1,120 @@
+from neo.Utils.NeoTestCase import NeoTestCase
+from neo.Implementations.Blockchains.LevelDB.DBCollection import DBCollection
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Implementations.Blockchains.LevelDB.StateCache import StateCache
+from neo.Implementations.Blockchains.LevelDB.LevelDBBlockchain import LevelDBBlockchain
+from neo.Core.Blockchain import Blockchain
+from neo.Core.State.StorageItem import StorageItem
+from neo.Settings import settings
+import plyvel
+import shutil
+import os
+
+
+class StateCacheTest(NeoTestCase):
+    DB_PATH = os.path.join(settings.DATA_DIR_PATH, 'UnitTestStateCache')
+
+    def setUp(self):
+        self.db = plyvel.DB(self.DB_PATH, create_if_missing=True)
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.DB_PATH)
+
+    def _persist(self, cache, items):
+        storages = DBCollection(self.db, DBPrefix.ST_Storage, StorageItem, raw=True, cache=cache)
+        with cache.Transaction(), self.db.write_batch() as wb:
+            for key, value in items.items():
+                storages.GetAndChange(key, StorageItem()).Value = value
+            storages.Commit(wb)
+
+    def test_commit_fills_cache(self):
+        cache = StateCache(10)
+        self._persist(cache, {b'a': b'1', b'b': b'2'})
+        self.assertEqual(len(cache), 2)
+
+        # the next block reads the cached objects instead of the database
+        self.db.put(DBPrefix.ST_Storage + b'a', b'garbage')
+        storages = DBCollection(self.db, DBPrefix.ST_Storage, StorageItem, raw=True, cache=cache)
+        self.assertEqual(storages.TryGet(b'a').Value, b'1')
+        self.assertEqual(cache.Hits, 1)
+
+        self.assertIsNone(storages.TryGet(b'c'))
+        self.assertEqual(cache.Misses, 3)
+
+    def test_failed_block_evicts_touched_keys(self):
+        cache = StateCache(10)
+        self._persist(cache, {b'a': b'1', b'b': b'2'})
+
+        storages = DBCollection(self.db, DBPrefix.ST_Storage, StorageItem, raw=True, cache=cache)
+        with self.assertRaises(ValueError):
+            with cache.Transaction():
+                storages.GetAndChange(b'a').Value = b'changed'
+                raise ValueError()
+
+        self.assertEqual(len(cache), 1)
+        storages = DBCollection(self.db, DBPrefix.ST_Storage, StorageItem, raw=True, cache=cache)
+        self.assertEqual(storages.TryGet(b'a').Value, b'1')
+
+    def test_uncommitted_change_is_evicted(self):
+        cache = StateCache(10)
+        self._persist(cache, {b'a': b'1'})
+
+        # changes that never reach the write batch must not stay in the cache
+        storages = DBCollection(self.db, DBPrefix.ST_Storage, StorageItem, raw=True, cache=cache)
+        with cache.Transaction():
+            storages.GetAndChange(b'a').Value = b'changed'
+
+        self.assertEqual(len(cache), 0)
+
+    def test_delete_and_lru_eviction(self):
+        cache = StateCache(2)
+        self._persist(cache, {b'a': b'1', b'b': b'2'})
+
+        storages = DBCollection(self.db, DBPrefix.ST_Storage, StorageItem, raw=True, cache=cache)
+        with cache.Transaction(), self.db.write_batch() as wb:
+            storages.Remove(b'a')
+            storages.Commit(wb)
+        self.assertEqual(len(cache), 1)
+
+        self._persist(cache, {b'c': b'3', b'd': b'4'})
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.Evictions, 1)
+        self.assertIsNone(cache.Get(DBPrefix.ST_Storage + b'b'))
+
+        stats = cache.ToJson()
+        self.assertEqual(stats['items'], 2)
+        self.assertEqual(stats['max_items'], 2)
+
+    def test_disabled(self):
+        cache = StateCache(0)
+        self.assertFalse(cache.Enabled)
+        self._persist(cache, {b'a': b'1'})
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.Hits + cache.Misses, 0)
+
+
+class StateCacheChainTest(NeoTestCase):
+    CHAIN_PATH = os.path.join(settings.DATA_DIR_PATH, 'UnitTestStateCacheChain')
+
+    @classmethod
+    def setUpClass(cls):
+        settings.setup_unittest_net()
+
+    def tearDown(self):
+        Blockchain.DeregisterBlockchain()
+        if os.path.exists(self.CHAIN_PATH):
+            shutil.rmtree(self.CHAIN_PATH)
+
+    def test_genesis_state_cached(self):
+        Blockchain.DeregisterBlockchain()
+        chain = LevelDBBlockchain(self.CHAIN_PATH)
+        Blockchain.RegisterBlockchain(chain)
+
+        cache = chain.StateCache
+        self.assertGreater(len(cache), 0)
+
+        neo = Blockchain.SystemShare().Hash.ToBytes()
+        self.assertEqual(cache.Get(DBPrefix.ST_Asset + neo).AssetId, Blockchain.SystemShare().Hash)
+        self.assertEqual(chain.GetAssetState(neo).AssetId, Blockchain.SystemShare().Hash)
+        chain.Dispose()
@@ -0,0 +1,87 @@
+from neo.Utils.NeoTestCase import NeoTestCase
+from neo.Implementations.Blockchains.LevelDB.SysFeeIndex import SysFeeIndex
+from neo.Implementations.Blockchains.LevelDB.LevelDBBlockchain import LevelDBBlockchain
+from neo.Implementations.Blockchains.LevelDB.tests import test_initial_db
+from neo.Core.Blockchain import Blockchain
+from neo.IO.Helper import Helper
+from neo.Settings import settings
+import binascii
+import shutil
+import os
+
+
+class SysFeeIndexTest(NeoTestCase):
+
+    def test_extend(self):
+        index = SysFeeIndex()
+        self.assertTrue(index.Extend(0, [0, 10]))
+        self.assertFalse(index.Extend(1, [20]))
+        self.assertTrue(index.Extend(2, [2 ** 64 - 1]))
+
+        self.assertEqual(len(index), 3)
+        self.assertEqual(index[1], 10)
+        self.assertEqual(index[2], 2 ** 64 - 1)
+
+    def test_snapshot(self):
+        index = SysFeeIndex()
+        index.Extend(0, range(0, 5000, 5))
+
+        path = os.path.join(settings.DATA_DIR_PATH, 'UnitTestSysFeeIndex.snapshot')
+        try:
+            index.Save(path)
+            loaded = SysFeeIndex.Load(path)
+            self.assertEqual(list(loaded._amounts), list(range(0, 5000, 5)))
+
+            with open(path, 'r+b') as f:
+                f.truncate(100)
+            with self.assertRaises(ValueError):
+                SysFeeIndex.Load(path)
+        finally:
+            os.remove(path)
+
+
+class SysFeeChainTest(NeoTestCase):
+    CHAIN_PATH = os.path.join(settings.DATA_DIR_PATH, 'UnitTestSysFeeChain')
+
+    @classmethod
+    def setUpClass(cls):
+        settings.setup_unittest_net()
+
+    def setUp(self):
+        Blockchain.DeregisterBlockchain()
+        self.chain = LevelDBBlockchain(self.CHAIN_PATH)
+        Blockchain.RegisterBlockchain(self.chain)
+
+        block_one = Helper.AsSerializableWithType(binascii.unhexlify(test_initial_db.LevelDBTest.block_one_raw), 'neo.Core.Block.Block')
+        self.chain.AddBlock(block_one)
+        self.chain.PersistBlocks()
+
+    def tearDown(self):
+        self.chain.Dispose()
+        Blockchain.DeregisterBlockchain()
+        shutil.rmtree(self.CHAIN_PATH)
+
+    def _stored_amounts(self):
+        return [self.chain.GetSysFeeAmount(self.chain.GetBlockHash(height)) for height in range(self.chain.Height + 1)]
+
+    def test_persist_extends_index(self):
+        self.assertEqual(len(self.chain._sysfee_index), 2)
+        self.assertEqual([self.chain.GetSysFeeAmountByHeight(height) for height in range(2)], self._stored_amounts())
+
+        # heights without a stored block are not indexed
+        self.assertEqual(self.chain.GetSysFeeAmountByHeight(2), 0)
+        self.assertEqual(len(self.chain._sysfee_index), 2)
+
+    def test_fill_from_blocks(self):
+        self.chain._sysfee_index = SysFeeIndex()
+
+        self.assertEqual(self.chain.GetSysFeeAmountByHeight(1), self._stored_amounts()[1])
+        self.assertEqual(len(self.chain._sysfee_index), 2)
+
+    def test_snapshot_restores_index(self):
+        self.chain.Dispose()
+        Blockchain.DeregisterBlockchain()
+
+        self.chain = LevelDBBlockchain(self.CHAIN_PATH)
+        self.assertEqual(self.chain._sysfee_snapshot_length, 2)
+        self.assertEqual(list(self.chain._sysfee_index._amounts), self._stored_amounts())
@@ -1,4 +1,4 @@
-import plyvel
+from neo.Storage.StorageBackend import StorageBackend
 from neo.EventHub import events
 from neo.SmartContract.SmartContractEvent import SmartContractEvent, NotifyEvent, NotifyType
 from neo.Core.State.ContractState import ContractState
@@ -69,7 +69,7 @@ class NotificationDB:
     def __init__(self, path):
 
         try:
-            self._db = plyvel.DB(path, create_if_missing=True)
+            self._db = StorageBackend.Open(path)
             logger.info("Created Notification DB At %s " % path)
         except Exception as e:
             logger.info("Notification leveldb unavailable, you may already be running this process: %s " % e)
@@ -126,12 +126,12 @@ class NotificationDB:
         """
         if len(self._events_to_write):
 
-            addr_db = self.db.prefixed_db(NotificationPrefix.PREFIX_ADDR)
-            block_db = self.db.prefixed_db(NotificationPrefix.PREFIX_BLOCK)
-            contract_db = self.db.prefixed_db(NotificationPrefix.PREFIX_CONTRACT)
+            addr_prefix = NotificationPrefix.PREFIX_ADDR
+            block_prefix = NotificationPrefix.PREFIX_BLOCK
+            contract_prefix = NotificationPrefix.PREFIX_CONTRACT
 
-            block_write_batch = block_db.write_batch()
-            contract_write_batch = contract_db.write_batch()
+            block_write_batch = self.db.write_batch()
+            contract_write_batch = self.db.write_batch()
 
             block_count = 0
             block_bytes = self._events_to_write[0].block_number.to_bytes(4, 'little')
@@ -148,8 +148,8 @@ class NotificationDB:
                 if bytes_to == bytes_from:
                     write_both = False
 
-                total_bytes_to = addr_db.get(bytes_to + NotificationPrefix.PREFIX_COUNT)
-                total_bytes_from = addr_db.get(bytes_from + NotificationPrefix.PREFIX_COUNT)
+                total_bytes_to = self.db.get(addr_prefix + bytes_to + NotificationPrefix.PREFIX_COUNT)
+                total_bytes_from = self.db.get(addr_prefix + bytes_from + NotificationPrefix.PREFIX_COUNT)
 
                 if not total_bytes_to:
                     total_bytes_to = b'\x00'
@@ -160,33 +160,33 @@ class NotificationDB:
                 addr_to_key = bytes_to + total_bytes_to
                 addr_from_key = bytes_from + total_bytes_from
 
-                with addr_db.write_batch() as b:
-                    b.put(addr_to_key, hash_data)
+                with self.db.write_batch() as b:
+                    b.put(addr_prefix + addr_to_key, hash_data)
                     if write_both:
-                        b.put(addr_from_key, hash_data)
+                        b.put(addr_prefix + addr_from_key, hash_data)
                     total_bytes_to = int.from_bytes(total_bytes_to, 'little') + 1
                     total_bytes_from = int.from_bytes(total_bytes_from, 'little') + 1
                     new_bytes_to = total_bytes_to.to_bytes(4, 'little')
                     new_bytes_from = total_bytes_from.to_bytes(4, 'little')
-                    b.put(bytes_to + NotificationPrefix.PREFIX_COUNT, new_bytes_to)
+                    b.put(addr_prefix + bytes_to + NotificationPrefix.PREFIX_COUNT, new_bytes_to)
                     if write_both:
-                        b.put(bytes_from + NotificationPrefix.PREFIX_COUNT, new_bytes_from)
+                        b.put(addr_prefix + bytes_from + NotificationPrefix.PREFIX_COUNT, new_bytes_from)
 
                 # write the event to the per-block database
                 per_block_key = block_bytes + block_count.to_bytes(4, 'little')
-                block_write_batch.put(per_block_key, hash_data)
+                block_write_batch.put(block_prefix + per_block_key, hash_data)
                 block_count += 1
 
                 # write the event to the per-contract database
                 contract_bytes = bytes(evt.contract_hash.Data)
-                count_for_contract = contract_db.get(contract_bytes + NotificationPrefix.PREFIX_COUNT)
+                count_for_contract = self.db.get(contract_prefix + contract_bytes + NotificationPrefix.PREFIX_COUNT)
                 if not count_for_contract:
                     count_for_contract = b'\x00'
                 contract_event_key = contract_bytes + count_for_contract
                 contract_count_int = int.from_bytes(count_for_contract, 'little') + 1
                 new_contract_count = contract_count_int.to_bytes(4, 'little')
-                contract_write_batch.put(contract_bytes + NotificationPrefix.PREFIX_COUNT, new_contract_count)
-                contract_write_batch.put(contract_event_key, hash_data)
+                contract_write_batch.put(contract_prefix + contract_bytes + NotificationPrefix.PREFIX_COUNT, new_contract_count)
+                contract_write_batch.put(contract_prefix + contract_event_key, hash_data)
 
             # finish off the per-block write batch and contract write batch
             block_write_batch.write()
@@ -196,15 +196,13 @@ class NotificationDB:
 
         if len(self._new_contracts_to_write):
 
-            token_db = self.db.prefixed_db(NotificationPrefix.PREFIX_TOKEN)
-
-            token_write_batch = token_db.write_batch()
+            token_write_batch = self.db.write_batch()
 
             for token_event in self._new_contracts_to_write:
                 try:
                     hash_data = token_event.ToByteArray()  # used to fail here
                     hash_key = token_event.contract.Code.ScriptHash().ToBytes()
-                    token_write_batch.put(hash_key, hash_data)
+                    token_write_batch.put(NotificationPrefix.PREFIX_TOKEN + hash_key, hash_data)
                 except Exception as e:
                     logger.debug(f"Failed to write new contract, reason: {e}")
 
@@ -221,10 +219,10 @@ class NotificationDB:
         Returns:
             list: a list of notifications
         """
-        blocklist_snapshot = self.db.prefixed_db(NotificationPrefix.PREFIX_BLOCK).snapshot()
+        blocklist_snapshot = self.db.snapshot()
         block_bytes = block_number.to_bytes(4, 'little')
         results = []
-        for val in blocklist_snapshot.iterator(prefix=block_bytes, include_key=False):
+        for val in blocklist_snapshot.iterator(prefix=NotificationPrefix.PREFIX_BLOCK + block_bytes, include_key=False):
             event = SmartContractEvent.FromByteArray(val)
             results.append(event)
 
@@ -246,10 +244,10 @@ class NotificationDB:
         if not isinstance(addr, UInt160):
             raise Exception("Incorrect address format")
 
-        addrlist_snapshot = self.db.prefixed_db(NotificationPrefix.PREFIX_ADDR).snapshot()
+        addrlist_snapshot = self.db.snapshot()
         results = []
 
-        for val in addrlist_snapshot.iterator(prefix=bytes(addr.Data), include_key=False):
+        for val in addrlist_snapshot.iterator(prefix=NotificationPrefix.PREFIX_ADDR + bytes(addr.Data), include_key=False):
             if len(val) > 4:
                 try:
                     event = SmartContractEvent.FromByteArray(val)
@@ -274,10 +272,10 @@ class NotificationDB:
         if not isinstance(hash, UInt160):
             raise Exception("Incorrect address format")
 
-        contractlist_snapshot = self.db.prefixed_db(NotificationPrefix.PREFIX_CONTRACT).snapshot()
+        contractlist_snapshot = self.db.snapshot()
         results = []
 
-        for val in contractlist_snapshot.iterator(prefix=bytes(hash.Data), include_key=False):
+        for val in contractlist_snapshot.iterator(prefix=NotificationPrefix.PREFIX_CONTRACT + bytes(hash.Data), include_key=False):
             if len(val) > 4:
                 try:
                     event = SmartContractEvent.FromByteArray(val)
@@ -292,9 +290,9 @@ class NotificationDB:
         Returns:
             list: A list of smart contract events with contracts that are NEP5 Tokens
         """
-        tokens_snapshot = self.db.prefixed_db(NotificationPrefix.PREFIX_TOKEN).snapshot()
+        tokens_snapshot = self.db.snapshot()
         results = []
-        for val in tokens_snapshot.iterator(include_key=False):
+        for val in tokens_snapshot.iterator(prefix=NotificationPrefix.PREFIX_TOKEN, include_key=False):
             event = SmartContractEvent.FromByteArray(val)
             results.append(event)
         return results
@@ -308,10 +306,10 @@ class NotificationDB:
         Returns:
             SmartContractEvent: A smart contract event with a contract that is an NEP5 Token
         """
-        tokens_snapshot = self.db.prefixed_db(NotificationPrefix.PREFIX_TOKEN).snapshot()
+        tokens_snapshot = self.db.snapshot()
 
         try:
-            val = tokens_snapshot.get(hash.ToBytes())
+            val = tokens_snapshot.get(NotificationPrefix.PREFIX_TOKEN + hash.ToBytes())
             if val:
                 event = SmartContractEvent.FromByteArray(val)
                 return event
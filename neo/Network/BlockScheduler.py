@@ -0,0 +1,287 @@
+"""
+Hands out the blocks to download to the connected peers.
+
+The download speed of every peer is measured from the blocks it sends. The lowest missing heights always go to the
+fastest peer with room for more requests, and blocks a peer does not send in time are requested from the other peers
+again, before a slow peer can hold up the chain for long.
+"""
+from itertools import islice
+from neo.Core.Blockchain import Blockchain as BC
+from neo.Settings import settings
+from neo.logging import log_manager
+
+logger = log_manager.getLogger('network')
+
+
+class PeerStats:
+    """
+    Download measurements of a peer.
+
+    `Latency` is the time until the first block of a request arrives, `BlockTime` the time between the blocks that
+    follow. Both are moving averages in seconds and None until measured.
+    """
+    __slots__ = ('Peer', 'Latency', 'BlockTime', 'LastReceived', 'InFlight', 'Received', 'Timeouts')
+
+    def __init__(self, peer):
+        self.Peer = peer
+        self.Latency = None
+        self.BlockTime = None
+        self.LastReceived = None
+        self.InFlight = 0
+        self.Received = 0
+        self.Timeouts = 0
+
+    @property
+    def Throughput(self):
+        """
+        Get the measured download speed.
+
+        Returns:
+            float: blocks per second, or None if not measured yet.
+        """
+        if self.BlockTime is None:
+            return None
+        if self.BlockTime == 0:
+            return float('inf')
+        return 1 / self.BlockTime
+
+    def ExpectedTime(self, count):
+        """
+        Get the time the peer is expected to take to send blocks.
+
+        Args:
+            count (int): the number of blocks requested.
+
+        Returns:
+            float: seconds, or None if the peer was not measured yet.
+        """
+        if self.BlockTime is None:
+            return None
+        return (self.Latency or 0) + count * self.BlockTime
+
+
+class BlockRequest:
+    """Blocks requested from a peer at once that were not received yet."""
+    __slots__ = ('Peer', 'Hashes', 'Sent', 'Expected')
+
+    def __init__(self, peer, hashes, sent, expected):
+        self.Peer = peer
+        self.Hashes = hashes
+        self.Sent = sent
+        self.Expected = expected
+
+
+class BlockScheduler:
+    """
+    Schedules the block requests of all peers of a `NodeLeader`.
+
+    The blocks requested are kept in the `BlockRequests` set of the blockchain and the `myblockrequests` set of the
+    peer, as for any other block request.
+    """
+
+    # seconds of downloading handed to a peer at once, bounded by `NodeLeader.BREQPART` blocks
+    REQUEST_TIME = 10
+
+    # blocks requested from a peer that was not measured yet
+    PROBE_SIZE = 10
+    PROBE_TIMEOUT = 30
+
+    # a request is overdue after `SLACK` times its expected time, or `PROBE_TIMEOUT` if the peer was not measured yet,
+    # and right after its expected time when it holds the next block, but never before `MIN_TIMEOUT`
+    SLACK = 3
+    MIN_TIMEOUT = 5
+
+    # weight of a new measurement in the moving averages
+    SMOOTHING = 0.2
+
+    def __init__(self, leader):
+        """
+        Create an instance.
+
+        Args:
+            leader (neo.Network.NodeLeader.NodeLeader): the leader of the peers, its reactor is used as the clock.
+        """
+        self.leader = leader
+        self._peers = {}  # peer id -> PeerStats
+        self._requests = {}  # block hash -> BlockRequest
+        self._pending = set()  # BlockRequest
+
+    def Stats(self, peer):
+        """
+        Get the measurements of a peer.
+
+        Args:
+            peer (neo.Network.NeoNode.NeoNode):
+
+        Returns:
+            PeerStats:
+        """
+        stats = self._peers.get(id(peer))
+        if stats is None:
+            stats = self._peers[id(peer)] = PeerStats(peer)
+        return stats
+
+    def Quota(self, peer):
+        """
+        Get the number of blocks a peer may have requested at once.
+
+        Args:
+            peer (neo.Network.NeoNode.NeoNode):
+
+        Returns:
+            int:
+        """
+        stats = self.Stats(peer)
+        if stats.BlockTime is None:
+            return min(self.PROBE_SIZE, self.leader.BREQPART)
+        if stats.BlockTime == 0:
+            return self.leader.BREQPART
+        count = int((self.REQUEST_TIME - (stats.Latency or 0)) / stats.BlockTime)
+        return max(1, min(count, self.leader.BREQPART))
+
+    def Schedule(self):
+        """
+        Request the lowest missing blocks from the peers with room for more requests, the fastest peer first.
+
+        Overdue requests are released first, so their blocks are requested again, but not from the peers that did not
+        send them in time.
+        """
+        chain = BC.Default()
+        overdue = self._ReleaseOverdue(chain)
+
+        peers = [peer for peer in self.leader.Peers
+                 if peer.handshake_complete and not peer.disconnecting and id(peer) not in overdue]
+        peers.sort(key=lambda peer: self._Order(self.Stats(peer)))
+
+        budget = self.leader.BREQMAX - len(chain.BlockRequests)
+        missing = self._MissingBlocks(chain)
+        for peer in peers:
+            count = min(self.Quota(peer) - self.Stats(peer).InFlight, budget)
+            if count <= 0:
+                continue
+
+            blocks = list(islice(missing, count))
+            if not blocks:
+                break
+            self._Request(peer, blocks)
+            budget -= len(blocks)
+
+    def BlockReceived(self, peer, hash):
+        """
+        Process a block received from a peer.
+
+        Args:
+            peer (neo.Network.NeoNode.NeoNode): the peer that sent the block.
+            hash (bytes): the block hash.
+
+        Returns:
+            bool: True if the block was requested from the peer and it has room for more requests.
+        """
+        request = self._requests.get(hash)
+        if request is None:
+            return False
+
+        self._Release(request, hash)
+        if request.Peer is not peer:
+            # requested again from another peer, or received unrequested
+            return False
+
+        stats = self.Stats(peer)
+        now = self.leader.reactor.seconds()
+        if stats.LastReceived is None or stats.LastReceived <= request.Sent:
+            # the first block since the request was sent
+            stats.Latency = self._Average(stats.Latency, now - request.Sent)
+        else:
+            stats.BlockTime = self._Average(stats.BlockTime, now - stats.LastReceived)
+        stats.LastReceived = now
+        stats.Received += 1
+
+        return stats.InFlight <= self.Quota(peer) // 2
+
+    def RemovePeer(self, peer):
+        """
+        Forget a peer and release the blocks requested from it.
+
+        Args:
+            peer (neo.Network.NeoNode.NeoNode):
+        """
+        for request in [request for request in self._pending if request.Peer is peer]:
+            for hash in list(request.Hashes):
+                self._Release(request, hash)
+        self._peers.pop(id(peer), None)
+
+    def _Order(self, stats):
+        # measured peers first, fastest first
+        if stats.BlockTime is None:
+            return 1, 0
+        return 0, stats.BlockTime
+
+    def _Average(self, average, value):
+        if average is None:
+            return value
+        return average + self.SMOOTHING * (value - average)
+
+    def _MissingBlocks(self, chain):
+        last = chain.HeaderHeight
+        # blocks further ahead would not be accepted by the block cache
+        if settings.BLOCK_CACHE_WINDOW:
+            last = min(last, chain.Height + settings.BLOCK_CACHE_WINDOW)
+
+        for height in range(chain.Height + 1, last + 1):
+            hash = chain.GetHeaderHash(height)
+            if hash is None or hash in chain.BlockRequests or chain.ContainsCachedBlock(hash):
+                continue
+            yield height, hash
+
+    def _Request(self, peer, blocks):
+        stats = self.Stats(peer)
+        hashes = {hash: height for height, hash in blocks}
+        request = BlockRequest(peer, hashes, self.leader.reactor.seconds(), stats.ExpectedTime(len(hashes)))
+
+        self._pending.add(request)
+        for hash in hashes:
+            self._requests[hash] = request
+        BC.Default().BlockRequests.update(hashes)
+        stats.InFlight += len(hashes)
+
+        logger.debug(f"{peer.prefix} requesting {len(hashes)} blocks from {blocks[0][0]} to {blocks[-1][0]}")
+        peer.RequestBlocks(list(hashes))
+
+    def _Release(self, request, hash):
+        del request.Hashes[hash]
+        del self._requests[hash]
+        if not request.Hashes:
+            self._pending.discard(request)
+
+        stats = self._peers.get(id(request.Peer))
+        if stats is not None:
+            stats.InFlight -= 1
+        request.Peer.myblockrequests.discard(hash)
+        BC.Default().BlockRequests.discard(hash)
+
+    def _ReleaseOverdue(self, chain):
+        now = self.leader.reactor.seconds()
+        next_hash = chain.GetHeaderHash(chain.Height + 1)
+        overdue = set()
+
+        for request in list(self._pending):
+            if next_hash in request.Hashes:
+                # the chain is waiting for this request
+                timeout = request.Expected or self.MIN_TIMEOUT
+            elif request.Expected is None:
+                timeout = self.PROBE_TIMEOUT
+            else:
+                timeout = request.Expected * self.SLACK
+            if now < request.Sent + max(timeout, self.MIN_TIMEOUT):
+                continue
+
+            stats = self.Stats(request.Peer)
+            stats.Timeouts += 1
+            # a peer that does not keep up is handed less work
+            stats.BlockTime = stats.BlockTime * 2 if stats.BlockTime else self.REQUEST_TIME
+            logger.debug(f"{request.Peer.prefix} {len(request.Hashes)} requested blocks overdue, requesting them again")
+
+            for hash in list(request.Hashes):
+                self._Release(request, hash)
+            overdue.add(id(request.Peer))
+        return overdue
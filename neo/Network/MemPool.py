@@ -0,0 +1,274 @@
+"""
+Keeps the transactions waiting to be included in a block.
+
+The outputs spent and claimed by the pooled transactions are indexed, so a transaction spending an output that another
+pooled transaction already spends is found by looking up its inputs. Transactions are prioritized by their network fee
+per byte, and the lowest priority ones are evicted when the pool grows over its size limit.
+"""
+import heapq
+import threading
+from itertools import count
+from neo.logging import log_manager
+
+logger = log_manager.getLogger('network')
+
+
+class MemPoolEntry:
+    """A pooled transaction with its priority."""
+    __slots__ = ('Transaction', 'Size', 'Fee', 'FeePerByte', 'Sequence')
+
+    def __init__(self, tx, size, fee, sequence):
+        self.Transaction = tx
+        self.Size = size
+        self.Fee = fee
+        self.FeePerByte = fee / size if size else 0
+        self.Sequence = sequence
+
+    @property
+    def Priority(self):
+        """
+        Get the sort key of the entry, lower is evicted first.
+
+        Returns:
+            tuple: the network fee per byte, and for the same fee the older transaction ranks higher.
+        """
+        return self.FeePerByte, -self.Sequence
+
+
+class MemPool:
+    """
+    The memory pool of a `NodeLeader`, keyed by the transaction hash as bytes like a dict.
+
+    The pool is changed from the reactor thread and from the thread persisting blocks, all access goes through a lock.
+    """
+
+    def __init__(self, max_bytes=0):
+        """
+        Create an instance.
+
+        Args:
+            max_bytes (int): (optional) maximum total size in bytes of the pooled transactions. 0 removes the limit.
+        """
+        self.max_bytes = max_bytes
+        self.Bytes = 0
+
+        self._entries = {}  # tx hash -> MemPoolEntry
+        self._spent = {}  # (prev hash, prev index) -> hash of the pooled tx spending the output
+        self._claimed = {}  # (prev hash, prev index) -> hash of the pooled tx claiming the output
+        self._heap = []  # (priority, tx hash) of the entries, lowest priority first, including removed entries
+        self._sequence = count()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, hash):
+        return hash in self._entries
+
+    def __getitem__(self, hash):
+        return self._entries[hash].Transaction
+
+    def __setitem__(self, hash, tx):
+        self.Add(tx)
+
+    def __delitem__(self, hash):
+        if not self.Remove(hash):
+            raise KeyError(hash)
+
+    def get(self, hash, default=None):
+        entry = self._entries.get(hash)
+        return entry.Transaction if entry else default
+
+    def keys(self):
+        with self._lock:
+            return list(self._entries)
+
+    def values(self):
+        with self._lock:
+            return [entry.Transaction for entry in self._entries.values()]
+
+    def items(self):
+        with self._lock:
+            return [(hash, entry.Transaction) for hash, entry in self._entries.items()]
+
+    def Conflicts(self, tx):
+        """
+        Get the pooled transactions spending or claiming any of the outputs a transaction spends or claims.
+
+        Args:
+            tx (neo.Core.TX.Transaction):
+
+        Returns:
+            set: the hashes of the conflicting transactions as bytes.
+        """
+        with self._lock:
+            conflicts = set()
+            for key in self._Keys(tx.inputs):
+                if key in self._spent:
+                    conflicts.add(self._spent[key])
+            for key in self._Keys(getattr(tx, 'Claims', [])):
+                if key in self._claimed:
+                    conflicts.add(self._claimed[key])
+            conflicts.discard(tx.Hash.ToBytes())
+            return conflicts
+
+    def ConflictingTransactions(self, tx):
+        """
+        Get the pooled transactions spending or claiming any of the outputs a transaction spends or claims.
+
+        These are the only pooled transactions `Transaction.Verify` needs to check a transaction against.
+
+        Args:
+            tx (neo.Core.TX.Transaction):
+
+        Returns:
+            list: of neo.Core.TX.Transaction.
+        """
+        with self._lock:
+            return [self._entries[hash].Transaction for hash in self.Conflicts(tx)]
+
+    def Add(self, tx):
+        """
+        Add a verified transaction to the pool.
+
+        When the pool is over its size limit with the transaction, pooled transactions of a lower priority are evicted
+        to make room for it.
+
+        Args:
+            tx (neo.Core.TX.Transaction):
+
+        Returns:
+            bool: True if added. False if already pooled, spending an output another pooled transaction spends, or not
+                  fitting into the pool.
+        """
+        hash = tx.Hash.ToBytes()
+        size = tx.Size()
+
+        with self._lock:
+            if hash in self._entries or self.Conflicts(tx):
+                return False
+
+            entry = MemPoolEntry(tx, size, tx.NetworkFee().value, next(self._sequence))
+            if not self._MakeRoom(entry):
+                logger.debug(f"Memory pool full, transaction 0x{tx.Hash} not added")
+                return False
+
+            self._entries[hash] = entry
+            for key in self._Keys(tx.inputs):
+                self._spent[key] = hash
+            for key in self._Keys(getattr(tx, 'Claims', [])):
+                self._claimed[key] = hash
+            heapq.heappush(self._heap, (entry.Priority, hash))
+            self.Bytes += size
+            return True
+
+    def Remove(self, hash):
+        """
+        Remove a transaction from the pool.
+
+        Args:
+            hash (bytes): the transaction hash.
+
+        Returns:
+            bool: True if removed. False if not pooled.
+        """
+        with self._lock:
+            entry = self._entries.pop(hash, None)
+            if entry is None:
+                return False
+
+            tx = entry.Transaction
+            for key in self._Keys(tx.inputs):
+                if self._spent.get(key) == hash:
+                    del self._spent[key]
+            for key in self._Keys(getattr(tx, 'Claims', [])):
+                if self._claimed.get(key) == hash:
+                    del self._claimed[key]
+            self.Bytes -= entry.Size
+
+            # removed entries are skipped when evicting, drop them once they make up most of the heap
+            if len(self._heap) > 2 * len(self._entries) + 64:
+                self._heap = [(entry.Priority, hash) for hash, entry in self._entries.items()]
+                heapq.heapify(self._heap)
+            return True
+
+    def RemoveBlockTransactions(self, block):
+        """
+        Remove the transactions of a block from the pool, and the pooled transactions spending or claiming the same
+        outputs, which can no longer be included in a block.
+
+        Args:
+            block (neo.Core.Block.Block): a persisted block.
+
+        Returns:
+            int: the number of transactions removed.
+        """
+        removed = 0
+        with self._lock:
+            for tx in block.Transactions:
+                if self.Remove(tx.Hash.ToBytes()):
+                    removed += 1
+                for hash in self.Conflicts(tx):
+                    if self.Remove(hash):
+                        removed += 1
+        return removed
+
+    def SortedTransactions(self):
+        """
+        Get the pooled transactions by priority.
+
+        Returns:
+            list: of neo.Core.TX.Transaction, the highest network fee per byte first.
+        """
+        with self._lock:
+            entries = sorted(self._entries.values(), key=lambda entry: entry.Priority, reverse=True)
+        return [entry.Transaction for entry in entries]
+
+    def ToJson(self):
+        """
+        Get the pool statistics and the pooled transaction hashes by priority.
+
+        Returns:
+            dict:
+        """
+        with self._lock:
+            return {
+                'count': len(self._entries),
+                'bytes': self.Bytes,
+                'max_bytes': self.max_bytes,
+                'transactions': ["0x%s" % tx.Hash for tx in self.SortedTransactions()],
+            }
+
+    def _Keys(self, references):
+        return [(ref.PrevHash.ToBytes(), ref.PrevIndex) for ref in references]
+
+    def _MakeRoom(self, entry):
+        if not self.max_bytes or self.Bytes + entry.Size <= self.max_bytes:
+            return True
+        if entry.Size > self.max_bytes:
+            return False
+
+        # pop the lowest priority entries until the new one fits, they are put back if it does not outrank enough
+        popped = []
+        freed = 0
+        while self._heap and self.Bytes - freed + entry.Size > self.max_bytes:
+            priority, hash = heapq.heappop(self._heap)
+            pooled = self._entries.get(hash)
+            if pooled is None or pooled.Priority != priority:
+                # removed, or removed and added again
+                continue
+            if priority >= entry.Priority:
+                heapq.heappush(self._heap, (priority, hash))
+                break
+            popped.append((priority, hash))
+            freed += pooled.Size
+
+        if self.Bytes - freed + entry.Size > self.max_bytes:
+            for item in popped:
+                heapq.heappush(self._heap, item)
+            return False
+
+        for priority, hash in popped:
+            logger.debug(f"Memory pool full, evicting transaction 0x{self._entries[hash].Transaction.Hash}")
+            self.Remove(hash)
+        return True
@@ -1,4 +1,4 @@
-import binascii
+import struct
 from neocore.IO.Mixins import SerializableMixin
 from neo.Settings import settings
 from neo.Core.Helper import Helper
@@ -17,6 +17,10 @@ class Message(SerializableMixin):
     PayloadMaxSize = b'\x02000000'
     PayloadMaxSizeInt = int.from_bytes(PayloadMaxSize, 'big')
 
+    # magic, command, payload length and checksum
+    HeaderFormat = struct.Struct('<I12sII')
+    HeaderSize = HeaderFormat.size
+
     Magic = None
 
     Command = None
@@ -33,7 +37,8 @@ class Message(SerializableMixin):
 
         Args:
             command (str): payload command e.g. "inv", "getdata". See NeoNode.MessageReceived() for more commands.
-            payload (bytes): raw bytes of the payload.
+            payload (bytes or neocore.IO.Mixins.SerializableMixin): raw bytes of the payload, or an object to
+                serialize into them.
             print_payload: UNUSED
         """
         self.Command = command
@@ -41,8 +46,8 @@ class Message(SerializableMixin):
 
         if payload is None:
             payload = bytearray()
-        else:
-            payload = binascii.unhexlify(Helper.ToArray(payload))
+        elif not isinstance(payload, (bytes, bytearray)):
+            payload = Helper.ToStream(payload)
 
         self.Checksum = Message.GetChecksum(payload)
         self.Payload = payload
@@ -81,6 +86,44 @@ class Message(SerializableMixin):
         if checksum != self.Checksum:
             raise ChecksumException("checksum mismatch")
 
+    @staticmethod
+    def DeserializeHeader(buffer):
+        """
+        Deserialize the header of a message at the start of a buffer, without copying the buffer.
+
+        Args:
+            buffer (bytes, bytearray or memoryview): holding at least `HeaderSize` bytes.
+
+        Raises:
+            Exception: if the payload is too large.
+
+        Returns:
+            Message: without payload, see `SetPayload`.
+        """
+        m = Message()
+        m.Magic, command, m.Length, m.Checksum = Message.HeaderFormat.unpack_from(buffer)
+        m.Command = command.rstrip(b'\x00').decode('utf-8')
+
+        if m.Length > Message.PayloadMaxSizeInt:
+            raise Exception("invalid format- payload too large")
+
+        return m
+
+    def SetPayload(self, payload):
+        """
+        Set the payload following a deserialized header.
+
+        Args:
+            payload (bytes): `Length` bytes.
+
+        Raises:
+            ChecksumException: if the payload does not match the checksum of the header.
+        """
+        if Message.GetChecksum(payload) != self.Checksum:
+            raise ChecksumException("checksum mismatch")
+
+        self.Payload = payload
+
     @staticmethod
     def GetChecksum(value):
         """
@@ -107,4 +150,14 @@ class Message(SerializableMixin):
         writer.WriteFixedString(self.Command, 12)
         writer.WriteUInt32(len(self.Payload))
         writer.WriteUInt32(self.Checksum)
-        writer.WriteBytes(self.Payload)
+        writer.WriteBytes(self.Payload, unhex=False)
+
+    def ToRawBytes(self):
+        """
+        Serialize the message to the bytes sent to a peer.
+
+        Returns:
+            bytes: not hexlified.
+        """
+        header = Message.HeaderFormat.pack(self.Magic, self.Command.encode('utf-8'), len(self.Payload), self.Checksum)
+        return header + self.Payload
@@ -1,4 +1,3 @@
-import binascii
 import random
 import datetime
 from twisted.internet.protocol import Protocol
@@ -8,11 +7,9 @@ from twisted.internet.address import IPv4Address
 from twisted.internet.defer import CancelledError
 from twisted.internet import error
 from neo.Core.Blockchain import Blockchain as BC
-from neocore.IO.BinaryReader import BinaryReader
+from neo.Core.Blockchain import PrunedDataError
 from neo.Network.Message import Message
-from neo.IO.MemoryStream import StreamManager
 from neo.IO.Helper import Helper as IOHelper
-from neo.Core.Helper import Helper
 from .Payloads.GetBlocksPayload import GetBlocksPayload
 from .Payloads.InvPayload import InvPayload
 from .Payloads.NetworkAddressWithTime import NetworkAddressWithTime
@@ -34,6 +31,9 @@ mode_to_name = {MODE_CATCHUP: 'CATCHUP', MODE_MAINTAIN: 'MAINTAIN'}
 HEARTBEAT_BLOCKS = 'B'
 HEARTBEAT_HEADERS = 'H'
 
+# commands of the messages sending an inventory item, by inventory type
+INVENTORY_COMMANDS = {InventoryType.TXInt: 'tx', InventoryType.BlockInt: 'block', InventoryType.ConsensusInt: 'consensus'}
+
 
 class NeoNode(Protocol):
     Version = None
@@ -311,6 +311,8 @@ class NeoNode(Protocol):
             self.address.last_connection = Address.Now()
 
     def ReleaseBlockRequests(self):
+        self.leader.BlockScheduler.RemovePeer(self)
+
         bcr = BC.Default().BlockRequests
         requests = self.myblockrequests
 
@@ -326,7 +328,8 @@ class NeoNode(Protocol):
     def dataReceived(self, data):
         """ Called from Twisted whenever data is received. """
         self.bytes_in += (len(data))
-        self.buffer_in = self.buffer_in + data
+        # extends the buffer in place, messages are removed from its start as they are processed
+        self.buffer_in += data
 
         while self.CheckDataReceived():
             pass
@@ -334,50 +337,31 @@ class NeoNode(Protocol):
     def CheckDataReceived(self):
         """Tries to extract a Message from the data buffer and process it."""
         currentLength = len(self.buffer_in)
-        if currentLength < 24:
+        if currentLength < Message.HeaderSize:
             return False
-        # Extract the message header from the buffer, and return if not enough
-        # buffer to fully deserialize the message object.
 
         try:
-            # Construct message
-            mstart = self.buffer_in[:24]
-            ms = StreamManager.GetStream(mstart)
-            reader = BinaryReader(ms)
-            m = Message()
-
-            # Extract message metadata
-            m.Magic = reader.ReadUInt32()
-            m.Command = reader.ReadFixedString(12).decode('utf-8')
-            m.Length = reader.ReadUInt32()
-            m.Checksum = reader.ReadUInt32()
-
-            # Return if not enough buffer to fully deserialize object.
-            messageExpectedLength = 24 + m.Length
-            if currentLength < messageExpectedLength:
-                return False
-
+            message = Message.DeserializeHeader(self.buffer_in)
         except Exception as e:
-            logger.debug(f"{self.prefix} Error: could not read message header from stream {e}")
-            # self.Log('Error: Could not read initial bytes %s ' % e)
+            # the end of the message is unknown, so nothing after it can be read either
+            self.buffer_in = bytearray()
+            self.Disconnect(f"Could not read message header: {e}")
             return False
 
-        finally:
-            StreamManager.ReleaseStream(ms)
-            del reader
+        # Return if not enough buffer to fully deserialize object.
+        messageExpectedLength = Message.HeaderSize + message.Length
+        if currentLength < messageExpectedLength:
+            return False
 
-        # The message header was successfully extracted, and we have enough enough buffer
-        # to extract the full payload
-        try:
-            # Extract message bytes from buffer and truncate buffer
-            mdata = self.buffer_in[:messageExpectedLength]
-            self.buffer_in = self.buffer_in[messageExpectedLength:]
+        # The payload is copied out of the buffer once, deserializing it shares that copy. The view has to be
+        # released before the message is removed from the buffer.
+        with memoryview(self.buffer_in) as view:
+            payload = bytes(view[Message.HeaderSize:messageExpectedLength])
+        # removing from the start of a bytearray does not move the rest of it
+        del self.buffer_in[:messageExpectedLength]
 
-            # Deserialize message with payload
-            stream = StreamManager.GetStream(mdata)
-            reader = BinaryReader(stream)
-            message = Message()
-            message.Deserialize(reader)
+        try:
+            message.SetPayload(payload)
 
             if self.incoming_client and self.expect_verack_next:
                 if message.Command != 'verack':
@@ -388,11 +372,6 @@ class NeoNode(Protocol):
 
         except Exception as e:
             logger.debug(f"{self.prefix} Could not extract message {e}")
-            # self.Log('Error: Could not extract message: %s ' % e)
-            return False
-
-        finally:
-            StreamManager.ReleaseStream(stream)
 
         return True
 
@@ -440,6 +419,9 @@ class NeoNode(Protocol):
             return
         logger.debug(f"{self.prefix} On neo Node loop error {err}")
 
+    def OnWorkerError(self, err):
+        logger.debug(f"{self.prefix} Error handling decoded data {err}")
+
     def onThreadDeferredErr(self, err):
         if type(err.value) == CancelledError:
             logger_verbose.debug(f"{self.prefix} onThreadDeferredError cancelled deferred")
@@ -492,43 +474,20 @@ class NeoNode(Protocol):
                 self.DoAskForMoreBlocks()
 
     def DoAskForMoreBlocks(self):
-        hashes = []
-        hashstart = BC.Default().Height + 1
-        current_header_height = BC.Default().HeaderHeight + 1
-
-        do_go_ahead = False
-        if BC.Default().BlockSearchTries > 100 and len(BC.Default().BlockRequests) > 0:
-            do_go_ahead = True
-
-        first = None
-        while hashstart <= current_header_height and len(hashes) < self.leader.BREQPART:
-            hash = BC.Default().GetHeaderHash(hashstart)
-            if not do_go_ahead:
-                if hash is not None and hash not in BC.Default().BlockRequests \
-                        and hash not in self.myblockrequests:
-
-                    if not first:
-                        first = hashstart
-                    BC.Default().BlockRequests.add(hash)
-                    self.myblockrequests.add(hash)
-                    hashes.append(hash)
-            else:
-                if hash is not None:
-                    if not first:
-                        first = hashstart
-                    BC.Default().BlockRequests.add(hash)
-                    self.myblockrequests.add(hash)
-                    hashes.append(hash)
+        self.leader.BlockScheduler.Schedule()
 
-            hashstart += 1
+    def RequestBlocks(self, hashes):
+        """
+        Request blocks from the remote client.
 
-        if len(hashes) > 0:
-            logger.debug(
-                f"{self.prefix} asking for more blocks {first} - {hashstart} ({len(hashes)}) stale count: {BC.Default().BlockSearchTries} "
-                f"BCRLen: {len(BC.Default().BlockRequests)}")
-            self.health_check(HEARTBEAT_BLOCKS)
-            message = Message("getdata", InvPayload(InventoryType.Block, hashes))
-            self.SendSerializedMessage(message)
+        Args:
+            hashes (list): the hashes of the blocks, as handed out by the `BlockScheduler` of the leader.
+        """
+        self.myblockrequests.update(hashes)
+        logger.debug(f"{self.prefix} asking for {len(hashes)} blocks, BCRLen: {len(BC.Default().BlockRequests)}")
+        self.health_check(HEARTBEAT_BLOCKS)
+        message = Message("getdata", InvPayload(InventoryType.Block, hashes))
+        self.SendSerializedMessage(message)
 
     def RequestPeerInfo(self):
         """Request the peer address information from the remote client."""
@@ -643,22 +602,57 @@ class NeoNode(Protocol):
             message (neo.Network.Message):
         """
         try:
-            ba = Helper.ToArray(message)
-            ba2 = binascii.unhexlify(ba)
-            self.bytes_out += len(ba2)
-            self.transport.write(ba2)
+            self.SendRawMessage(message.ToRawBytes())
         except Exception as e:
             logger.debug(f"Could not send serialized message {e}")
 
+    def SendRawMessage(self, data):
+        """
+        Send an already serialized message to the remote client.
+
+        Args:
+            data (bytes): see `neo.Network.Message.ToRawBytes`.
+        """
+        self.bytes_out += len(data)
+        self.transport.write(data)
+
     def HandleBlockHeadersReceived(self, inventory):
         """
         Process a block header inventory payload.
+        The headers are decoded on a worker thread of the leader, see `DecodeHeaders`.
 
         Args:
             inventory (neo.Network.Inventory):
+
+        Returns:
+            Deferred: fires once the headers were processed.
         """
+        d = self.leader.WorkerPool.Submit(NeoNode.DecodeHeaders, inventory)
+        d.addCallback(self.OnHeadersDecoded)
+        d.addErrback(self.OnWorkerError)
+        return d
+
+    @staticmethod
+    def DecodeHeaders(inventory):
+        """
+        Decode a block header inventory payload and hash the headers, on a worker thread.
+
+        Args:
+            inventory (neo.Network.Inventory):
+
+        Returns:
+            HeadersPayload: if deserialization is successful.
+            None: if deserialization failed.
+        """
+        inventory = IOHelper.AsSerializableWithType(inventory, 'neo.Network.Payloads.HeadersPayload.HeadersPayload')
+        if inventory is not None:
+            # the hashes are kept by the headers
+            for header in inventory.Headers:
+                header.Hash
+        return inventory
+
+    def OnHeadersDecoded(self, inventory):
         try:
-            inventory = IOHelper.AsSerializableWithType(inventory, 'neo.Network.Payloads.HeadersPayload.HeadersPayload')
             if inventory is not None:
                 logger.debug(f"{self.prefix} received headers")
                 self.heart_beat(HEARTBEAT_HEADERS)
@@ -670,11 +664,43 @@ class NeoNode(Protocol):
     def HandleBlockReceived(self, inventory):
         """
         Process a Block inventory payload.
+        The block is decoded and checked on a worker thread of the leader, see `DecodeBlock`.
+
+        Args:
+            inventory (neo.Network.Inventory):
+
+        Returns:
+            Deferred: fires once the block was processed.
+        """
+        d = self.leader.WorkerPool.Submit(NeoNode.DecodeBlock, inventory)
+        d.addCallback(self.OnBlockDecoded)
+        d.addErrback(self.OnWorkerError)
+        return d
+
+    @staticmethod
+    def DecodeBlock(inventory):
+        """
+        Decode a Block inventory payload, hash it and verify what does not depend on the chain, on a worker thread.
 
         Args:
             inventory (neo.Network.Inventory):
+
+        Returns:
+            Block: if deserialization and verification are successful.
+            None: otherwise.
         """
         block = IOHelper.AsSerializableWithType(inventory, 'neo.Core.Block.Block')
+        if block is None:
+            return None
+
+        # the hash is kept by the block
+        blockhash = block.Hash.ToBytes()
+        if not block.VerifyFormat():
+            logger.debug(f"Invalid block {block.Index} {blockhash}")
+            return None
+        return block
+
+    def OnBlockDecoded(self, block):
         if not block:
             return
 
@@ -691,8 +717,13 @@ class NeoNode(Protocol):
                 self.myblockrequests.remove(blockhash)
         except KeyError:
             pass
+        needs_blocks = self.leader.BlockScheduler.BlockReceived(self, blockhash)
         self.leader.InventoryReceived(block)
 
+        # ask for more right away instead of waiting for the block loop, unless requests are paused
+        if needs_blocks and self.block_loop and self.block_loop.running:
+            self.AskForMoreBlocks()
+
     def time_expired(self, what):
         now = datetime.datetime.utcnow().timestamp()
         start_time = self.start_outstanding_data_request.get(what)
@@ -798,14 +829,24 @@ class NeoNode(Protocol):
             hash = hash.encode('utf-8')
 
             item = None
-            # try to get the inventory to send from relay cache
+            # try to get the inventory to send from relay cache, it is serialized once for all peers asking for it
 
             if hash in self.leader.RelayCache.keys():
                 item = self.leader.RelayCache[hash]
+                command = INVENTORY_COMMANDS.get(inventory.Type)
+                if command:
+                    try:
+                        self.SendRawMessage(self.leader.GetRelayMessage(command, item))
+                    except Exception as e:
+                        logger.debug(f"Could not send serialized message {e}")
+                    continue
 
             if inventory.Type == InventoryType.TXInt:
                 if not item:
-                    item, index = BC.Default().GetTransaction(hash)
+                    try:
+                        item, index = BC.Default().GetTransaction(hash)
+                    except PrunedDataError:
+                        continue
                 if not item:
                     item = self.leader.GetTransaction(hash)
                 if item:
@@ -814,7 +855,10 @@ class NeoNode(Protocol):
 
             elif inventory.Type == InventoryType.BlockInt:
                 if not item:
-                    item = BC.Default().GetBlock(hash)
+                    try:
+                        item = BC.Default().GetBlock(hash)
+                    except PrunedDataError:
+                        continue
                 if item:
                     message = Message(command='block', payload=item, print_payload=False)
                     self.SendSerializedMessage(message)
@@ -863,9 +907,10 @@ class NeoNode(Protocol):
         Returns:
             bool: True (fixed)
         """
-        inventory = InvPayload(type=inventory.InventoryType, hashes=[inventory.Hash.ToBytes()])
-        m = Message("inv", inventory)
-        self.SendSerializedMessage(m)
+        try:
+            self.SendRawMessage(self.leader.GetRelayMessage('inv', inventory))
+        except Exception as e:
+            logger.debug(f"Could not send serialized message {e}")
 
         return True
 
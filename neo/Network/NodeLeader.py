@@ -7,6 +7,11 @@ from neo.Implementations.Blockchains.LevelDB.TestLevelDBBlockchain import TestLe
 from neo.Core.TX.Transaction import Transaction
 from neo.Core.TX.MinerTransaction import MinerTransaction
 from neo.Network.NeoNode import NeoNode, HEARTBEAT_BLOCKS
+from neo.Network.BlockScheduler import BlockScheduler
+from neo.Network.WorkerPool import WorkerPool
+from neo.Network.MemPool import MemPool
+from neo.Network.Message import Message
+from neo.Network.Payloads.InvPayload import InvPayload
 from neo.Settings import settings
 from twisted.internet.protocol import ReconnectingClientFactory, Factory
 from twisted.internet import error
@@ -36,11 +41,19 @@ class NodeLeader:
     BREQPART = 100
     BREQMAX = 10000
 
+    BlockScheduler = None
+    WorkerPool = None
+
     KnownHashes = []
     MissionsGlobal = []
-    MemPool = {}
+    MemPool = None
     RelayCache = {}
 
+    # serialized messages of relayed inventory, keyed by command and hash, so they are serialized once for all peers
+    RelayMessages = {}
+    RelayMessageBytes = 0
+    MAX_RELAY_MESSAGE_BYTES = 16 * 1024 * 1024
+
     NodeCount = 0
 
     CurrentBlockheight = 0
@@ -53,9 +66,6 @@ class NodeLeader:
     check_bcr_loop = None
     check_bcr_loop_deferred = None
 
-    memcheck_loop = None
-    memcheck_loop_deferred = None
-
     blockheight_loop = None
     blockheight_loop_deferred = None
 
@@ -132,18 +142,6 @@ class NodeLeader:
             logger.debug(f"stop_check_bcr_loop, calling cancel()")
             self.check_bcr_loop_deferred.cancel()
 
-    def start_memcheck_loop(self):
-        self.stop_memcheck_loop()
-        self.memcheck_loop = LoopingCall(self.MempoolCheck, clock=self.reactor)
-        self.memcheck_loop_deferred = self.memcheck_loop.start(240, now=False)
-        self.memcheck_loop_deferred.addErrback(self.OnMemcheckError)
-
-    def stop_memcheck_loop(self, cancel=True):
-        if self.memcheck_loop and self.memcheck_loop.running:
-            self.memcheck_loop.stop()
-        if cancel and self.memcheck_loop_deferred:
-            self.memcheck_loop_deferred.cancel()
-
     def start_blockheight_loop(self):
         self.stop_blockheight_loop()
         self.CurrentBlockheight = BC.Default().Height
@@ -169,16 +167,17 @@ class NodeLeader:
         self.DEAD_ADDRS = []  # addresses that were performing poorly or we could not establish a connection to
         self.MissionsGlobal = []
         self.NodeId = random.randint(1294967200, 4294967200)
+        self.BlockScheduler = BlockScheduler(self)  # hands out the blocks to download to the peers
+        self.WorkerPool = WorkerPool(settings.DECODE_WORKERS)  # decodes received blocks and headers
+        self.MemPool = MemPool(settings.MEMPOOL_MAX_BYTES)
 
     def Restart(self):
         self.stop_peer_check_loop()
         self.stop_check_bcr_loop()
-        self.stop_memcheck_loop()
         self.stop_blockheight_loop()
 
         self.peer_check_loop_deferred = None
         self.check_bcr_loop_deferred = None
-        self.memcheck_loop_deferred = None
         self.blockheight_loop_deferred = None
 
         self.peers_connecting = 0
@@ -262,12 +261,16 @@ class NodeLeader:
                 self.KNOWN_ADDRS.append(addr)
                 self.SetupConnection(addr)
 
-        logger.debug("Starting up nodeleader: starting peer, mempool, and blockheight check loops")
+        logger.debug("Starting up nodeleader: starting peer and blockheight check loops")
         # check in on peers every 10 seconds
         self.start_peer_check_loop()
-        self.start_memcheck_loop()
         self.start_blockheight_loop()
 
+        # remove the transactions of persisted blocks from the memory pool
+        if BC.Default() is not None:
+            BC.Default().PersistCompleted.on_change -= self.OnPersistCompleted
+            BC.Default().PersistCompleted.on_change += self.OnPersistCompleted
+
         if settings.ACCEPT_INCOMING_PEERS and not self.incoming_server_running:
             class OneShotFactory(Factory):
                 def __init__(self, leader):
@@ -350,12 +353,14 @@ class NodeLeader:
         self.stop_check_bcr_loop()
         self.check_bcr_loop_deferred = None
 
-        self.stop_memcheck_loop()
-        self.memcheck_loop_deferred = None
-
         self.stop_blockheight_loop()
         self.blockheight_loop_deferred = None
 
+        self.WorkerPool.Stop()
+
+        if BC.Default() is not None:
+            BC.Default().PersistCompleted.on_change -= self.OnPersistCompleted
+
         for p in self.Peers:
             p.Disconnect()
 
@@ -521,7 +526,7 @@ class NodeLeader:
                 return False
 
         else:
-            if not inventory.Verify(self.MemPool.values()):
+            if not inventory.Verify(self.MemPool.ConflictingTransactions(inventory)):
                 return False
 
     def RelayDirectly(self, inventory):
@@ -550,6 +555,39 @@ class NodeLeader:
 
         return relayed
 
+    def GetRelayMessage(self, command, inventory):
+        """
+        Get a serialized message for relayed inventory, serializing it only the first time.
+
+        The messages kept are bounded to `MAX_RELAY_MESSAGE_BYTES` in total, the oldest ones are dropped first.
+
+        Args:
+            command (str): "inv" to announce the inventory, or the command sending the inventory itself, e.g. "tx".
+            inventory (neo.Network.Inventory):
+
+        Returns:
+            bytes: the message as sent to a peer.
+        """
+        key = (command, inventory.Hash.ToBytes())
+        data = self.RelayMessages.get(key)
+        if data is None:
+            if command == 'inv':
+                payload = InvPayload(type=inventory.InventoryType, hashes=[inventory.Hash.ToBytes()])
+            else:
+                payload = inventory
+            data = Message(command, payload).ToRawBytes()
+
+            if len(data) > self.MAX_RELAY_MESSAGE_BYTES:
+                return data
+
+            while self.RelayMessages and self.RelayMessageBytes + len(data) > self.MAX_RELAY_MESSAGE_BYTES:
+                # dicts keep the insertion order, drop the oldest messages
+                self.RelayMessageBytes -= len(self.RelayMessages.pop(next(iter(self.RelayMessages))))
+            self.RelayMessages[key] = data
+            self.RelayMessageBytes += len(data)
+
+        return data
+
     def Relay(self, inventory):
         """
         Relay the inventory to the remote client.
@@ -588,9 +626,7 @@ class NodeLeader:
         return relayed
 
     def GetTransaction(self, hash):
-        if hash in self.MemPool.keys():
-            return self.MemPool[hash]
-        return None
+        return self.MemPool.get(hash)
 
     def AddTransaction(self, tx):
         """
@@ -605,19 +641,23 @@ class NodeLeader:
         if BC.Default() is None:
             return False
 
-        if tx.Hash.ToBytes() in self.MemPool.keys():
+        if tx.Hash.ToBytes() in self.MemPool:
             return False
 
         if BC.Default().ContainsTransaction(tx.Hash):
             return False
 
-        if not tx.Verify(self.MemPool.values()):
-            logger.error("Verifying tx result... failed")
+        conflicts = self.MemPool.ConflictingTransactions(tx)
+        if conflicts:
+            logger.debug(f"tx 0x{tx.Hash} spends outputs spent by a transaction in the mempool")
             return False
 
-        self.MemPool[tx.Hash.ToBytes()] = tx
+        # the mempool transactions a transaction is verified against are the ones spending or claiming its outputs
+        if not tx.Verify(conflicts):
+            logger.error("Verifying tx result... failed")
+            return False
 
-        return True
+        return self.MemPool.Add(tx)
 
     def RemoveTransaction(self, tx):
         """
@@ -635,27 +675,31 @@ class NodeLeader:
         if not BC.Default().ContainsTransaction(tx.Hash):
             return False
 
-        if tx.Hash.ToBytes() in self.MemPool:
-            del self.MemPool[tx.Hash.ToBytes()]
-            return True
-
-        return False
+        return self.MemPool.Remove(tx.Hash.ToBytes())
 
     def MempoolCheck(self):
         """
         Checks the Mempool and removes any tx found on the Blockchain
         Implemented to resolve https://github.com/CityOfZion/neo-python/issues/703
-        """
-        txs = []
-        values = self.MemPool.values()
-        for tx in values:
-            txs.append(tx)
 
-        for tx in txs:
+        Persisted blocks remove their transactions through `OnPersistCompleted`, this is no longer polled.
+        """
+        for tx in self.MemPool.values():
             res = self.RemoveTransaction(tx)
             if res:
                 logger.debug("found tx 0x%s on the blockchain ...removed from mempool" % tx.Hash)
 
+    def OnPersistCompleted(self, block):
+        """
+        Remove the transactions of a persisted block from the memory pool, and the ones it makes double spends.
+
+        Args:
+            block (neo.Core.Block.Block):
+        """
+        removed = self.MemPool.RemoveBlockTransactions(block)
+        if removed:
+            logger.debug(f"removed {removed} transactions of block {block.Index} from mempool")
+
     def BlockheightCheck(self):
         """
         Checks the current blockheight and finds the peer that prevents advancement
@@ -720,10 +764,15 @@ class NodeLeader:
         NodeLeader.BREQPART = 100
         NodeLeader.BREQMAX = 10000
 
+        NodeLeader.BlockScheduler = None
+        NodeLeader.WorkerPool = None
+
         NodeLeader.KnownHashes = []
         NodeLeader.MissionsGlobal = []
-        NodeLeader.MemPool = {}
+        NodeLeader.MemPool = None
         NodeLeader.RelayCache = {}
+        NodeLeader.RelayMessages = {}
+        NodeLeader.RelayMessageBytes = 0
 
         NodeLeader.NodeCount = 0
 
@@ -737,9 +786,6 @@ class NodeLeader:
         NodeLeader.check_bcr_loop = None
         NodeLeader.check_bcr_loop_deferred = None
 
-        NodeLeader.memcheck_loop = None
-        NodeLeader.memcheck_loop_deferred = None
-
         NodeLeader.blockheight_loop = None
         NodeLeader.blockheight_loop_deferred = None
 
@@ -760,11 +806,6 @@ class NodeLeader:
             return
         logger.debug("Error on Peer check loop %s " % err)
 
-    def OnMemcheckError(self, err):
-        if type(err.value) == CancelledError:
-            return
-        logger.debug("Error on Memcheck check %s " % err)
-
     def OnBlockheightcheckError(self, err):
         if type(err.value) == CancelledError:
             return
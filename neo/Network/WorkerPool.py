@@ -0,0 +1,94 @@
+from collections import deque
+from twisted.internet import defer, threads
+from twisted.python.failure import Failure
+from twisted.python.threadpool import ThreadPool
+from neo.logging import log_manager
+
+logger = log_manager.getLogger('network')
+
+
+class WorkerPool:
+    """
+    Runs work on worker threads instead of the reactor thread, such as decoding the blocks received from peers.
+
+    The results are handed back to the reactor thread through deferreds that fire in the order the work was
+    submitted, whichever worker finishes first. The threads are started with the first work submitted and stopped
+    when the reactor shuts down.
+    """
+
+    def __init__(self, size, reactor=None):
+        """
+        Create an instance.
+
+        Args:
+            size (int): the number of worker threads. With 0 the work is done on the calling thread right away.
+            reactor: (optional) custom reactor the results are handed back to.
+        """
+        if reactor is None:
+            from twisted.internet import reactor
+
+        self.size = size
+        self.reactor = reactor
+        self._threadpool = None
+        self._queue = deque()  # [deferred, finished, result] of the work submitted, oldest first
+
+    def Submit(self, func, *args):
+        """
+        Run `func(*args)` on a worker thread.
+
+        Args:
+            func (callable): the work, it must not touch state that the reactor thread changes.
+            *args: the arguments of `func`.
+
+        Returns:
+            Deferred: fires on the reactor thread with the result of `func`, after the work submitted before it.
+        """
+        if self.size <= 0:
+            return defer.maybeDeferred(func, *args)
+
+        if self._threadpool is None:
+            self.Start()
+
+        d = defer.Deferred()
+        work = [d, False, None]
+        self._queue.append(work)
+        threads.deferToThreadPool(self.reactor, self._threadpool, func, *args).addBoth(self._Finished, work)
+        return d
+
+    @property
+    def Pending(self):
+        """
+        Get the number of results not handed back yet.
+
+        Returns:
+            int:
+        """
+        return len(self._queue)
+
+    def Start(self):
+        """Start the worker threads."""
+        if self._threadpool is not None:
+            return
+        self._threadpool = ThreadPool(minthreads=self.size, maxthreads=self.size, name='neo-worker')
+        self._threadpool.start()
+        self.reactor.addSystemEventTrigger('during', 'shutdown', self.Stop)
+        logger.debug(f"Started {self.size} worker threads")
+
+    def Stop(self):
+        """Stop the worker threads, after the work they are doing."""
+        if self._threadpool is None:
+            return
+        threadpool, self._threadpool = self._threadpool, None
+        threadpool.stop()
+
+    def _Finished(self, result, work):
+        work[1] = True
+        work[2] = result
+
+        # hand back the results that are no longer waiting for earlier work
+        while self._queue and self._queue[0][1]:
+            d, finished, result = self._queue.popleft()
+            if isinstance(result, Failure):
+                d.errback(result)
+            else:
+                d.callback(result)
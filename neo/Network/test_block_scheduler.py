@@ -0,0 +1,166 @@
+from unittest import TestCase
+from mock import patch
+from twisted.internet import task
+from neo.Core.Blockchain import Blockchain
+from neo.Network.NodeLeader import NodeLeader
+from neo.Settings import settings
+
+
+def block_hash(height):
+    return b'%064d' % height
+
+
+class FakeChain(Blockchain):
+
+    def __init__(self, height, header_height):
+        self.height = height
+        self.header_height = header_height
+        self.cached = set()
+        self._blockrequests = set()
+
+    @property
+    def Height(self):
+        return self.height
+
+    @property
+    def HeaderHeight(self):
+        return self.header_height
+
+    def GetHeaderHash(self, height):
+        if height > self.header_height:
+            return None
+        return block_hash(height)
+
+    def ContainsCachedBlock(self, hash):
+        return hash in self.cached
+
+
+class FakePeer:
+
+    def __init__(self, name):
+        self.prefix = f"[{name}]"
+        self.handshake_complete = True
+        self.disconnecting = False
+        self.myblockrequests = set()
+        self.requested = []
+
+    def RequestBlocks(self, hashes):
+        self.myblockrequests.update(hashes)
+        self.requested.append(hashes)
+
+
+class BlockSchedulerTestCase(TestCase):
+
+    def setUp(self):
+        self._chain = Blockchain._instance
+        self.chain = Blockchain._instance = FakeChain(0, 1000)
+
+        self.clock = task.Clock()
+        self.leader = NodeLeader(self.clock)
+        self.scheduler = self.leader.BlockScheduler
+
+    def tearDown(self):
+        Blockchain._instance = self._chain
+
+    def add_peer(self, name, block_time=None):
+        peer = FakePeer(name)
+        self.scheduler.Stats(peer).BlockTime = block_time
+        self.leader.Peers.append(peer)
+        return peer
+
+    def receive(self, peer, height):
+        self.chain.cached.add(block_hash(height))
+        return self.scheduler.BlockReceived(peer, block_hash(height))
+
+    def test_lowest_blocks_to_fastest_peer(self):
+        slow = self.add_peer('slow', 1)
+        fast = self.add_peer('fast', 0.01)
+        new = self.add_peer('new')
+
+        self.scheduler.Schedule()
+
+        # the quota of a peer is the blocks it can send in `REQUEST_TIME`, at most `BREQPART`
+        self.assertEqual(fast.requested, [[block_hash(h) for h in range(1, 101)]])
+        self.assertEqual(slow.requested, [[block_hash(h) for h in range(101, 111)]])
+        self.assertEqual(new.requested, [[block_hash(h) for h in range(111, 121)]])
+        self.assertEqual(len(self.chain.BlockRequests), 120)
+
+        # peers with all of their quota requested are skipped
+        self.scheduler.Schedule()
+        self.assertEqual(len(fast.requested), 1)
+
+    def test_measures_peers(self):
+        peer = self.add_peer('peer')
+        self.scheduler.Schedule()
+
+        self.clock.advance(0.5)
+        self.assertFalse(self.scheduler.BlockReceived(peer, block_hash(1)))
+        self.clock.advance(0.1)
+        self.assertTrue(self.scheduler.BlockReceived(peer, block_hash(2)))
+
+        stats = self.scheduler.Stats(peer)
+        self.assertAlmostEqual(stats.Latency, 0.5)
+        self.assertAlmostEqual(stats.BlockTime, 0.1)
+        self.assertAlmostEqual(stats.Throughput, 10)
+        self.assertEqual(stats.InFlight, 8)
+        self.assertEqual(self.scheduler.Quota(peer), 95)
+        self.assertNotIn(block_hash(1), self.chain.BlockRequests)
+        self.assertNotIn(block_hash(1), peer.myblockrequests)
+
+        # blocks not requested from the peer are not measured
+        self.assertFalse(self.scheduler.BlockReceived(peer, block_hash(500)))
+        self.assertEqual(stats.Received, 2)
+
+    def test_overdue_requests_reassigned(self):
+        stuck = self.add_peer('stuck', 0.1)
+        other = self.add_peer('other')
+        self.scheduler.Schedule()
+        self.assertEqual(stuck.requested[0][0], block_hash(1))
+
+        # the other peer sends its blocks and turns out to be faster
+        self.clock.advance(1)
+        for height in range(101, 111):
+            self.receive(other, height)
+            self.clock.advance(0.05)
+
+        # the request holding the next block is overdue after its expected time of 10 s
+        self.clock.advance(9)
+        self.scheduler.Schedule()
+        self.assertEqual(other.requested[1], [block_hash(h) for h in range(1, 101)])
+        self.assertEqual(len(stuck.requested), 1)
+        self.assertEqual(stuck.myblockrequests, set())
+
+        stats = self.scheduler.Stats(stuck)
+        self.assertEqual(stats.Timeouts, 1)
+        self.assertAlmostEqual(stats.BlockTime, 0.2)
+
+        # the peer is handed less work afterwards
+        self.scheduler.Schedule()
+        self.assertEqual(stuck.requested[1], [block_hash(h) for h in range(111, 161)])
+
+        # a late block of the released request is no longer counted for the peer
+        self.assertFalse(self.scheduler.BlockReceived(stuck, block_hash(1)))
+        self.assertEqual(self.scheduler.Stats(other).InFlight, 99)
+
+    def test_window(self):
+        peer = self.add_peer('peer', 0.01)
+        self.chain.cached = {block_hash(1), block_hash(3)}
+
+        with patch.object(settings, 'BLOCK_CACHE_WINDOW', 5):
+            self.scheduler.Schedule()
+        self.assertEqual(peer.requested, [[block_hash(2), block_hash(4), block_hash(5)]])
+
+        # the window slides with the chain height, and the blocks requested are bounded by `BREQMAX`
+        self.chain.height = 5
+        self.leader.BREQMAX = 10
+        self.scheduler.Schedule()
+        self.assertEqual(peer.requested[1], [block_hash(h) for h in range(6, 13)])
+
+    def test_remove_peer(self):
+        peer = self.add_peer('peer')
+        self.scheduler.Schedule()
+
+        self.scheduler.RemovePeer(peer)
+        self.assertEqual(self.chain.BlockRequests, set())
+        self.assertEqual(peer.myblockrequests, set())
+        self.assertFalse(self.scheduler.BlockReceived(peer, block_hash(1)))
@@ -0,0 +1,111 @@
+from unittest import TestCase
+from neo.Core.Block import Block
+from neo.Core.Blockchain import Blockchain
+from neo.Core.CoinReference import CoinReference
+from neo.Core.TX.ClaimTransaction import ClaimTransaction
+from neo.Core.TX.Transaction import ContractTransaction, TransactionOutput
+from neo.Core.Witness import Witness
+from neo.Network.MemPool import MemPool
+from neocore.Fixed8 import Fixed8
+from neocore.UInt160 import UInt160
+from neocore.UInt256 import UInt256
+
+
+def coin(index):
+    return CoinReference(UInt256(data=bytearray(index.to_bytes(32, 'little'))), 0)
+
+
+def create_tx(inputs, fee, padding=0):
+    asset = Blockchain.SystemCoin().Hash
+    tx = ContractTransaction(inputs=[coin(index) for index in inputs],
+                             outputs=[TransactionOutput(asset, Fixed8(1), UInt160(data=bytearray(20)))])
+    tx.scripts = [Witness(bytearray(b'\x01' * (1 + padding)), bytearray(b'\xac'))]
+    # the network fee needs the referenced outputs from the chain, set it directly
+    tx._network_fee = Fixed8(fee)
+    return tx
+
+
+class MemPoolTestCase(TestCase):
+
+    def test_add_remove(self):
+        pool = MemPool()
+        tx = create_tx([1, 2], 100)
+
+        self.assertTrue(pool.Add(tx))
+        self.assertFalse(pool.Add(tx))
+        self.assertIn(tx.Hash.ToBytes(), pool)
+        self.assertIs(pool[tx.Hash.ToBytes()], tx)
+        self.assertEqual(pool.keys(), [tx.Hash.ToBytes()])
+        self.assertEqual(pool.Bytes, tx.Size())
+
+        self.assertTrue(pool.Remove(tx.Hash.ToBytes()))
+        self.assertFalse(pool.Remove(tx.Hash.ToBytes()))
+        self.assertEqual(len(pool), 0)
+        self.assertEqual(pool.Bytes, 0)
+
+        # the spent outputs are released with the transaction
+        self.assertTrue(pool.Add(create_tx([2], 100)))
+
+    def test_double_spend(self):
+        pool = MemPool()
+        tx = create_tx([1, 2], 100)
+        pool.Add(tx)
+
+        double_spend = create_tx([3, 2], 200)
+        self.assertEqual(pool.Conflicts(double_spend), {tx.Hash.ToBytes()})
+        self.assertEqual(pool.ConflictingTransactions(double_spend), [tx])
+        self.assertFalse(pool.Add(double_spend))
+        self.assertEqual(pool.Conflicts(create_tx([3], 100)), set())
+
+        claim = ClaimTransaction()
+        claim.Claims = [coin(5)]
+        self.assertTrue(pool.Add(claim))
+        double_claim = ClaimTransaction()
+        double_claim.Claims = [coin(5), coin(6)]
+        self.assertEqual(pool.Conflicts(double_claim), {claim.Hash.ToBytes()})
+        self.assertEqual(pool.ConflictingTransactions(double_claim), [claim])
+        self.assertFalse(pool.Add(double_claim))
+
+    def test_priority_and_eviction(self):
+        cheap = create_tx([1], 100)
+        large = create_tx([2], 150, padding=100)
+        expensive = create_tx([3], 300)
+        pool = MemPool(max_bytes=cheap.Size() + large.Size())
+
+        pool.Add(cheap)
+        pool.Add(large)
+        # ordered by fee per byte, the large transaction pays less per byte than the cheap one
+        self.assertEqual(pool.SortedTransactions(), [cheap, large])
+
+        # the pool is full, the lowest fee per byte is evicted for a better transaction
+        self.assertTrue(pool.Add(expensive))
+        self.assertEqual(pool.SortedTransactions(), [expensive, cheap])
+        self.assertLessEqual(pool.Bytes, pool.max_bytes)
+
+        # but not for a worse one
+        self.assertFalse(pool.Add(create_tx([4], 1)))
+        self.assertEqual(len(pool), 2)
+
+        # the evicted outputs may be spent again
+        self.assertEqual(pool.Conflicts(create_tx([2], 1)), set())
+
+        json = pool.ToJson()
+        self.assertEqual(json['count'], 2)
+        self.assertEqual(json['bytes'], expensive.Size() + cheap.Size())
+        self.assertEqual(json['transactions'], ["0x%s" % expensive.Hash, "0x%s" % cheap.Hash])
+
+    def test_remove_block_transactions(self):
+        pool = MemPool()
+        confirmed = create_tx([1], 100)
+        conflicting = create_tx([2], 100)
+        pending = create_tx([3], 100)
+        for tx in [confirmed, conflicting, pending]:
+            pool.Add(tx)
+
+        # the block spends the output `conflicting` spends in another transaction
+        genesis = Blockchain.GenesisBlock()
+        block = Block(genesis.Hash, genesis.Timestamp + 15, 1, 0, genesis.NextConsensus, genesis.Script,
+                      [genesis.Transactions[0], confirmed, create_tx([2, 4], 50)], build_root=True)
+
+        self.assertEqual(pool.RemoveBlockTransactions(block), 2)
+        self.assertEqual(pool.keys(), [pending.Hash.ToBytes()])
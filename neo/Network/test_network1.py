@@ -3,6 +3,7 @@ Test Nodeleader basics: starting and stopping
 
 """
 
+from neo.Core.Blockchain import Blockchain
 from neo.Network.NodeLeader import NodeLeader
 from neo.Network.address import Address
 from twisted.trial import unittest as twisted_unittest
@@ -35,13 +36,13 @@ class NetworkBasicTest(twisted_unittest.TestCase):
 
         self.assertTrue(leader.peer_check_loop.running)
         self.assertTrue(leader.blockheight_loop.running)
-        self.assertTrue(leader.memcheck_loop.running)
+        self.assertIn(leader.OnPersistCompleted, list(Blockchain.Default().PersistCompleted.on_change))
 
         leader.Shutdown()
 
         self.assertFalse(leader.peer_check_loop.running)
         self.assertFalse(leader.blockheight_loop.running)
-        self.assertFalse(leader.memcheck_loop.running)
+        self.assertNotIn(leader.OnPersistCompleted, list(Blockchain.Default().PersistCompleted.on_change))
 
         # cleanup
         twisted_reactor.connectTCP = orig_connectTCP
@@ -60,7 +61,7 @@ class NetworkBasicTest(twisted_unittest.TestCase):
 
         self.assertTrue(leader.peer_check_loop.running)
         self.assertTrue(leader.blockheight_loop.running)
-        self.assertTrue(leader.memcheck_loop.running)
+        self.assertIn(leader.OnPersistCompleted, list(Blockchain.Default().PersistCompleted.on_change))
 
         leader.Shutdown()
 
@@ -4,9 +4,14 @@ from neo.Network.NeoNode import NeoNode
 from mock import patch
 from neo.Network.Payloads.VersionPayload import VersionPayload
 from neo.Network.Message import Message
+from neo.Network.Payloads.InvPayload import InvPayload
+from neo.Core.TX.MinerTransaction import MinerTransaction
 from neo.IO.MemoryStream import StreamManager
 from neocore.IO.BinaryWriter import BinaryWriter
 from neo.Network.NodeLeader import NodeLeader
+from neo.Network.WorkerPool import WorkerPool
+from neo.Core.Block import Block
+from neo.Core.Blockchain import Blockchain
 from twisted.test import proto_helpers
 
 import sys
@@ -108,3 +113,105 @@ class NodeTestCase(TestCase):
         mock.assert_called_once()
 
         self.assertEqual(node.Version.Nonce, payload.Nonce)
+
+    @patch.object(NeoNode, 'MessageReceived')
+    def test_data_received_burst(self, mock):
+        node = NeoNode()
+        node.endpoint = Endpoint('hello.com', 1234)
+        node.host = node.endpoint.host
+        node.port = node.endpoint.port
+
+        messages = [Message('version', payload=VersionPayload(10234, 1234 + i, 'version')) for i in range(5)]
+        # a corrupted message is skipped without losing the ones after it
+        messages[2].Checksum += 1
+        out = b''
+        for message in messages:
+            stream = StreamManager.GetStream()
+            message.Serialize(BinaryWriter(stream))
+            out += stream.getvalue()
+            StreamManager.ReleaseStream(stream)
+
+        for i in range(0, len(out), 7):
+            node.dataReceived(out[i:i + 7])
+
+        self.assertEqual(node.buffer_in, b'')
+        self.assertEqual(node.bytes_in, len(out))
+        received = [call[0][0] for call in mock.call_args_list]
+        self.assertEqual([m.Command for m in received], ['version'] * 4)
+        self.assertEqual([m.Payload for m in received], [m.Payload for i, m in enumerate(messages) if i != 2])
+
+    def test_relay_serializes_once(self):
+        leader = NodeLeader.Instance()
+        NodeLeader.RelayMessages = {}
+
+        nodes = [NeoNode() for i in range(2)]
+        for node in nodes:
+            node.transport = proto_helpers.StringTransport()
+
+        tx = MinerTransaction()
+        tx.Nonce = 1234
+        for node in nodes:
+            node.Relay(tx)
+
+        expected = Message('inv', InvPayload(type=tx.InventoryType, hashes=[tx.Hash.ToBytes()]))
+        stream = StreamManager.GetStream()
+        expected.Serialize(BinaryWriter(stream))
+        self.assertEqual(expected.ToRawBytes(), stream.getvalue())
+        StreamManager.ReleaseStream(stream)
+
+        self.assertEqual(nodes[0].transport.value(), expected.ToRawBytes())
+        self.assertEqual(nodes[1].transport.value(), expected.ToRawBytes())
+        self.assertEqual(nodes[0].bytes_out, len(expected.ToRawBytes()))
+        self.assertIs(leader.GetRelayMessage('inv', tx), leader.RelayMessages[('inv', tx.Hash.ToBytes())])
+        self.assertEqual(len(leader.RelayMessages), 1)
+        self.assertEqual(leader.RelayMessageBytes, len(expected.ToRawBytes()))
+
+        NodeLeader.Reset()
+
+    def test_relay_messages_bounded_by_bytes(self):
+        leader = NodeLeader.Instance()
+        NodeLeader.RelayMessages = {}
+
+        txs = [MinerTransaction() for i in range(3)]
+        for i, tx in enumerate(txs):
+            tx.Nonce = i
+        size = len(leader.GetRelayMessage('tx', txs[0]))
+        NodeLeader.RelayMessages = {}
+        leader.RelayMessageBytes = 0
+
+        with patch.object(NodeLeader, 'MAX_RELAY_MESSAGE_BYTES', 2 * size):
+            for tx in txs:
+                leader.GetRelayMessage('tx', tx)
+
+            # the oldest message is dropped to stay within the limit
+            self.assertEqual(list(leader.RelayMessages), [('tx', tx.Hash.ToBytes()) for tx in txs[1:]])
+            self.assertEqual(leader.RelayMessageBytes, 2 * size)
+
+        # a message over the limit is sent but not kept, and does not drop the others
+        with patch.object(NodeLeader, 'MAX_RELAY_MESSAGE_BYTES', size - 1):
+            self.assertEqual(leader.GetRelayMessage('tx', txs[0]), Message('tx', txs[0]).ToRawBytes())
+            self.assertEqual(len(leader.RelayMessages), 2)
+            self.assertEqual(leader.RelayMessageBytes, 2 * size)
+
+        NodeLeader.Reset()
+
+    def test_block_received(self):
+        leader = NodeLeader.Instance()
+        pool = leader.WorkerPool
+        leader.WorkerPool = WorkerPool(0)
+
+        genesis = Blockchain.GenesisBlock()
+        valid = Block(genesis.Hash, genesis.Timestamp + 15, 1, 0, genesis.NextConsensus, genesis.Script,
+                      [genesis.Transactions[0]], build_root=True)
+        # only the first transaction may be a miner transaction
+        invalid = Block(genesis.Hash, genesis.Timestamp + 15, 1, 0, genesis.NextConsensus, genesis.Script,
+                        [genesis.Transactions[0]] * 2, build_root=True)
+
+        node = NeoNode()
+        with patch.object(leader, 'InventoryReceived') as mock:
+            for block in [invalid, valid]:
+                node.HandleBlockReceived(Message('block', block).Payload)
+
+        leader.WorkerPool = pool
+        mock.assert_called_once()
+        self.assertEqual(mock.call_args[0][0].Hash, valid.Hash)
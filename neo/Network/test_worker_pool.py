@@ -0,0 +1,58 @@
+import threading
+import time
+from twisted.internet import defer
+from twisted.trial import unittest as twisted_unittest
+from neo.Network.WorkerPool import WorkerPool
+
+
+def work(value, delay=0):
+    time.sleep(delay)
+    if value is None:
+        raise ValueError("no value")
+    return value, threading.current_thread().name
+
+
+class WorkerPoolTestCase(twisted_unittest.TestCase):
+
+    def setUp(self):
+        self.pool = WorkerPool(2)
+
+    def tearDown(self):
+        self.pool.Stop()
+
+    def test_results_in_submit_order(self):
+        results = []
+
+        def done(result, index):
+            results.append((index, self.pool.Pending))
+            return result
+
+        # the first work finishes last, but its result is handed back first
+        deferreds = []
+        for index, delay in enumerate([0.2, 0, 0.1]):
+            d = self.pool.Submit(work, index, delay)
+            deferreds.append(d.addCallback(done, index))
+        self.assertEqual(self.pool.Pending, 3)
+
+        def check(values):
+            self.assertEqual([value for value, thread in values], [0, 1, 2])
+            self.assertNotIn(threading.current_thread().name, [thread for value, thread in values])
+            self.assertEqual(results, [(0, 2), (1, 1), (2, 0)])
+
+        return defer.gatherResults(deferreds).addCallback(check)
+
+    def test_errors_in_submit_order(self):
+        results = []
+
+        d1 = self.pool.Submit(work, None, 0.1)
+        d1.addErrback(lambda failure: results.append(failure.check(ValueError)))
+        d2 = self.pool.Submit(work, 2)
+        d2.addCallback(lambda result: results.append(result[0]))
+
+        return defer.gatherResults([d1, d2]).addCallback(lambda _: self.assertEqual(results, [ValueError, 2]))
+
+    def test_without_workers(self):
+        pool = WorkerPool(0)
+        d = pool.Submit(work, 1)
+        self.assertEqual(self.successResultOf(d), (1, threading.current_thread().name))
+        self.failureResultOf(pool.Submit(work, None), ValueError)
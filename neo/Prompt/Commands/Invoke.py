@@ -280,11 +280,11 @@ def test_invoke(script, wallet, outputs, withdrawal_tx=None,
 
     bc = GetBlockchain()
 
-    accounts = DBCollection(bc._db, DBPrefix.ST_Account, AccountState)
-    assets = DBCollection(bc._db, DBPrefix.ST_Asset, AssetState)
-    validators = DBCollection(bc._db, DBPrefix.ST_Validator, ValidatorState)
-    contracts = DBCollection(bc._db, DBPrefix.ST_Contract, ContractState)
-    storages = DBCollection(bc._db, DBPrefix.ST_Storage, StorageItem)
+    accounts = DBCollection(bc.DB, DBPrefix.ST_Account, AccountState)
+    assets = DBCollection(bc.DB, DBPrefix.ST_Asset, AssetState)
+    validators = DBCollection(bc.DB, DBPrefix.ST_Validator, ValidatorState)
+    contracts = DBCollection(bc.DB, DBPrefix.ST_Contract, ContractState)
+    storages = DBCollection(bc.DB, DBPrefix.ST_Storage, StorageItem)
 
     # if we are using a withdrawal tx, don't recreate the invocation tx
     # also, we don't want to reset the inputs / outputs
@@ -412,11 +412,11 @@ def test_deploy_and_invoke(deploy_script, invoke_args, wallet,
                            debug_map=None, invoke_attrs=None, owners=None):
     bc = GetBlockchain()
 
-    accounts = DBCollection(bc._db, DBPrefix.ST_Account, AccountState)
-    assets = DBCollection(bc._db, DBPrefix.ST_Asset, AssetState)
-    validators = DBCollection(bc._db, DBPrefix.ST_Validator, ValidatorState)
-    contracts = DBCollection(bc._db, DBPrefix.ST_Contract, ContractState)
-    storages = DBCollection(bc._db, DBPrefix.ST_Storage, StorageItem)
+    accounts = DBCollection(bc.DB, DBPrefix.ST_Account, AccountState)
+    assets = DBCollection(bc.DB, DBPrefix.ST_Asset, AssetState)
+    validators = DBCollection(bc.DB, DBPrefix.ST_Validator, ValidatorState)
+    contracts = DBCollection(bc.DB, DBPrefix.ST_Contract, ContractState)
+    storages = DBCollection(bc.DB, DBPrefix.ST_Storage, StorageItem)
 
     if settings.USE_DEBUG_STORAGE:
         debug_storage = DebugStorage.instance()
@@ -359,4 +359,4 @@ class CommandSCDebugStorage(CommandBase):
 
     def command_desc(self):
         p1 = ParameterDesc('attribute', 'either "on"|"off" or 1|0, or "reset"')
-        return CommandDesc('debugstorage', 'use a separate database for smart contract storage item debugging', params=[p1])
+        return CommandDesc('debugstorage', 'keep smart contract storage item changes of test invocations in memory for debugging', params=[p1])
@@ -148,7 +148,9 @@ class CommandShowMem(CommandBase):
         total = process.memory_info().rss
         totalmb = total / (1024 * 1024)
         out = "Total: %s MB\n" % totalmb
-        out += "Total buffers: %s\n" % StreamManager.TotalBuffers()
+        stats = StreamManager.ToJson()
+        out += "Total buffers: %s\n" % stats['pooled']
+        out += "Buffers created: %s reused: %s discarded: %s readers: %s\n" % (stats['created'], stats['reused'], stats['discarded'], stats['readers'])
         print(out)
         return out
 
@@ -202,6 +204,15 @@ class CommandShowState(CommandBase):
         out += "Time elapsed %s mins\n" % mins
         out += "Blocks per min %s \n" % bpm
         out += "TPS: %s \n" % tps
+
+        state_cache = Blockchain.Default().StateCache
+        if state_cache is not None and state_cache.Enabled:
+            stats = state_cache.ToJson()
+            out += "State-cache %s / %s items, hit rate %.2f, %s evictions\n" % (stats['items'], stats['max_items'], stats['hit_rate'], stats['evictions'])
+        block_cache = Blockchain.Default().BlockCache
+        if block_cache is not None:
+            stats = block_cache.ToJson()
+            out += "Block-cache %s / %s bytes, %s evictions, %s refused\n" % (stats['bytes'], stats['max_bytes'], stats['evictions'], stats['refused'])
         print(out)
         return out
 
@@ -102,7 +102,36 @@ class SettingsHolder:
 
     ALL_FEES = None
     USE_DEBUG_STORAGE = False
-    DEBUG_STORAGE_PATH = 'Chains/debugstorage'
+
+    # maximum number of state objects kept in memory across blocks while persisting. 0 disables the cache
+    STATE_CACHE_SIZE = 100000
+
+    # maximum total size in bytes of the blocks received ahead of the chain height. 0 removes the limit
+    BLOCK_CACHE_BYTES = 256 * 1024 * 1024
+
+    # blocks further than this many blocks ahead of the chain height are not cached or requested. 0 removes the limit
+    BLOCK_CACHE_WINDOW = 20000
+
+    # number of worker threads decoding the blocks and headers received from peers off the reactor thread. 0 decodes
+    # them on the reactor thread
+    DECODE_WORKERS = 2
+
+    # maximum total size in bytes of the transactions in the memory pool, the lowest network fee per byte is evicted
+    # first. 0 removes the limit
+    MEMPOOL_MAX_BYTES = 64 * 1024 * 1024
+
+    # number of consecutive blocks PersistBlocks applies in memory before writing them in one write batch
+    PERSIST_BATCH_SIZE = 1
+
+    # key-value store for the chain, notification and debug storage databases, 'leveldb' or 'memory'
+    STORAGE_BACKEND = 'leveldb'
+
+    # maintain an index of the unspent outputs of every address while persisting blocks
+    ADDRESS_INDEX = False
+
+    # keep only this many of the most recent blocks in full and drop the older block and spent transaction data.
+    # 0 keeps all blocks
+    PRUNE_KEEP_BLOCKS = 0
 
     ACCEPT_INCOMING_PEERS = False
     CONNECTED_PEER_MAX = 20
@@ -138,11 +167,6 @@ class SettingsHolder:
         self.check_chain_dir_exists()
         return os.path.abspath(os.path.join(self.DATA_DIR_PATH, self.NOTIFICATION_DB_PATH))
 
-    @property
-    def debug_storage_leveldb_path(self):
-        self.check_chain_dir_exists()
-        return os.path.abspath(os.path.join(self.DATA_DIR_PATH, self.DEBUG_STORAGE_PATH))
-
     # Helpers
     @property
     def is_mainnet(self):
@@ -218,8 +242,18 @@ class SettingsHolder:
         Helper.ADDRESS_VERSION = self.ADDRESS_VERSION
 
         self.USE_DEBUG_STORAGE = config.get('DebugStorage', False)
-        self.DEBUG_STORAGE_PATH = config.get('DebugStoragePath', 'Chains/debugstorage')
+        if 'DebugStoragePath' in config:
+            logger.warning("DebugStoragePath is deprecated and ignored, debug storage is kept in memory")
         self.NOTIFICATION_DB_PATH = config.get('NotificationDataPath', 'Chains/notification_data')
+        self.STATE_CACHE_SIZE = config.get('StateCacheSize', 100000)
+        self.BLOCK_CACHE_BYTES = config.get('BlockCacheBytes', 256 * 1024 * 1024)
+        self.BLOCK_CACHE_WINDOW = config.get('BlockCacheWindow', 20000)
+        self.PERSIST_BATCH_SIZE = config.get('PersistBatchSize', 1)
+        self.DECODE_WORKERS = config.get('DecodeWorkers', 2)
+        self.MEMPOOL_MAX_BYTES = config.get('MemPoolMaxBytes', 64 * 1024 * 1024)
+        self.STORAGE_BACKEND = config.get('StorageBackend', 'leveldb')
+        self.ADDRESS_INDEX = config.get('AddressIndex', False)
+        self.PRUNE_KEEP_BLOCKS = config.get('PruneKeepBlocks', 0)
         self.SERVICE_ENABLED = config.get('ServiceEnabled', self.ACCEPT_INCOMING_PEERS)
         self.COMPILER_NEP_8 = config.get('CompilerNep8', False)
         self.REST_SERVER = config.get('RestServer', self.DEFAULT_REST_SERVER)
@@ -573,11 +573,11 @@ class ApplicationEngine(ExecutionEngine):
 
         bc = Blockchain.Default()
 
-        accounts = DBCollection(bc._db, DBPrefix.ST_Account, AccountState)
-        assets = DBCollection(bc._db, DBPrefix.ST_Asset, AssetState)
-        validators = DBCollection(bc._db, DBPrefix.ST_Validator, ValidatorState)
-        contracts = DBCollection(bc._db, DBPrefix.ST_Contract, ContractState)
-        storages = DBCollection(bc._db, DBPrefix.ST_Storage, StorageItem)
+        accounts = DBCollection(bc.DB, DBPrefix.ST_Account, AccountState)
+        assets = DBCollection(bc.DB, DBPrefix.ST_Asset, AssetState)
+        validators = DBCollection(bc.DB, DBPrefix.ST_Validator, ValidatorState)
+        contracts = DBCollection(bc.DB, DBPrefix.ST_Contract, ContractState)
+        storages = DBCollection(bc.DB, DBPrefix.ST_Storage, StorageItem)
 
         script_table = CachedScriptTable(contracts)
         service = StateMachine(accounts, validators, assets, contracts, storages, None)
@@ -131,7 +131,7 @@ class SmartContractEvent(SerializableMixin):
 
     @staticmethod
     def FromByteArray(data):
-        stream = StreamManager.GetStream(data=data)
+        stream = StreamManager.GetReader(data)
         reader = BinaryReader(stream)
 
         etype = reader.ReadVarString().decode('utf-8')
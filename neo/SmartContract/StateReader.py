@@ -4,7 +4,7 @@ from neo.SmartContract.Contract import Contract
 from neo.SmartContract.NotifyEventArgs import NotifyEventArgs
 from neo.SmartContract.StorageContext import StorageContext
 from neo.Core.State.StorageKey import StorageKey
-from neo.Core.Blockchain import Blockchain
+from neo.Core.Blockchain import Blockchain, PrunedDataError
 from neocore.Cryptography.Crypto import Crypto
 from neocore.BigInteger import BigInteger
 from neocore.UInt160 import UInt160
@@ -434,7 +434,7 @@ class StateReader(InteropService):
     def Runtime_Deserialize(self, engine: ExecutionEngine):
         data = engine.CurrentContext.EvaluationStack.Pop().GetByteArray()
 
-        ms = StreamManager.GetStream(data=data)
+        ms = StreamManager.GetReader(data)
         reader = BinaryReader(ms)
         try:
             stack_item = StackItem.DeserializeStackItem(reader)
@@ -536,7 +536,10 @@ class StateReader(InteropService):
         height = -1
 
         if Blockchain.Default() is not None:
-            tx, height = Blockchain.Default().GetTransaction(UInt256(data=data))
+            try:
+                tx, height = Blockchain.Default().GetTransaction(UInt256(data=data))
+            except PrunedDataError as e:
+                height = e.Height
 
         engine.CurrentContext.EvaluationStack.PushT(height)
         return True
@@ -0,0 +1,24 @@
+import plyvel
+from neo.Storage.StorageBackend import StorageBackend
+
+# plyvel implements the backend interface natively, register it instead of wrapping every call
+StorageBackend.register(plyvel.DB)
+
+
+class LevelDBBackend:
+    """
+    LevelDB storage backend, the default.
+    """
+
+    @staticmethod
+    def Open(path):
+        """
+        Open or create a LevelDB database.
+
+        Args:
+            path (str): database directory.
+
+        Returns:
+            plyvel.DB:
+        """
+        return plyvel.DB(path, create_if_missing=True)
@@ -0,0 +1,164 @@
+import threading
+from bisect import bisect_left, insort
+from neo.Storage.StorageBackend import StorageBackend
+
+
+class MemoryBackend(StorageBackend):
+    """
+    Storage backend keeping everything in memory, in a dict with a sorted list of its keys for ordered iteration.
+
+    Nothing is written to disk, which makes it suited to benchmarks and tests. Snapshots share the data with the
+    database until the next write, which then copies it.
+    """
+
+    def __init__(self):
+        self._data = {}
+        self._keys = []
+
+        # set while a snapshot references the current data, the next write has to copy it
+        self._shared = False
+
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        return self._data.get(key, default)
+
+    def put(self, key, value):
+        self._Write({key: value})
+
+    def delete(self, key):
+        self._Write({key: None})
+
+    def iterator(self, prefix=None, start=None, stop=None, include_key=True, include_value=True):
+        with self._lock:
+            items = self._Range(self._data, self._keys, prefix, start, stop)
+        return self._Select(items, include_key, include_value)
+
+    def snapshot(self):
+        with self._lock:
+            self._shared = True
+            return MemorySnapshot(self._data, self._keys)
+
+    def write_batch(self, transaction=False):
+        return MemoryWriteBatch(self, transaction)
+
+    def close(self):
+        with self._lock:
+            self._data = {}
+            self._keys = []
+            self._shared = False
+
+    def _Write(self, changes):
+        """
+        Apply changes to the database.
+
+        Args:
+            changes (dict): new values by key, None for keys to delete.
+        """
+        with self._lock:
+            data, keys = self._data, self._keys
+            if self._shared:
+                data, keys = dict(data), list(keys)
+
+            for key, value in changes.items():
+                key = bytes(key)
+                if value is None:
+                    if data.pop(key, None) is not None:
+                        del keys[bisect_left(keys, key)]
+                else:
+                    if key not in data:
+                        insort(keys, key)
+                    data[key] = bytes(value)
+
+            self._data, self._keys, self._shared = data, keys, False
+
+    @staticmethod
+    def _Range(data, keys, prefix=None, start=None, stop=None):
+        # iterators work on a copy of the requested range, so later writes do not affect them
+        if prefix:
+            if start is not None or stop is not None:
+                raise TypeError("'prefix' cannot be used together with 'start' or 'stop'")
+
+            items = []
+            for i in range(bisect_left(keys, prefix), len(keys)):
+                key = keys[i]
+                if not key.startswith(prefix):
+                    break
+                items.append((key, data[key]))
+            return items
+
+        first = 0 if start is None else bisect_left(keys, start)
+        last = len(keys) if stop is None else bisect_left(keys, stop)
+        return [(key, data[key]) for key in keys[first:last]]
+
+    @staticmethod
+    def _Select(items, include_key, include_value):
+        if include_key and include_value:
+            return iter(items)
+        if include_key:
+            return (key for key, value in items)
+        return (value for key, value in items)
+
+
+class MemorySnapshot:
+    """
+    Read only view of a `MemoryBackend` at the time it was taken.
+    """
+
+    def __init__(self, data, keys):
+        self._data = data
+        self._keys = keys
+
+    def get(self, key, default=None):
+        return self._data.get(key, default)
+
+    def iterator(self, prefix=None, start=None, stop=None, include_key=True, include_value=True):
+        items = MemoryBackend._Range(self._data, self._keys, prefix, start, stop)
+        return MemoryBackend._Select(items, include_key, include_value)
+
+    def close(self):
+        self._data = {}
+        self._keys = []
+
+    def release(self):
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class MemoryWriteBatch:
+    """
+    Write batch of a `MemoryBackend`, applied to the database at once by `write`.
+    """
+
+    def __init__(self, db, transaction=False):
+        self._db = db
+        self._transaction = transaction
+        self._changes = {}
+
+    def put(self, key, value):
+        self._changes[key] = value
+
+    def delete(self, key):
+        self._changes[key] = None
+
+    def clear(self):
+        self._changes = {}
+
+    def write(self):
+        self._db._Write(self._changes)
+        self._changes = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None or not self._transaction:
+            self.write()
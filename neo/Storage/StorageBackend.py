@@ -0,0 +1,108 @@
+from abc import ABC, abstractmethod
+
+
+class StorageBackend(ABC):
+    """
+    Key-value store holding the chain, notification and debug storage databases.
+
+    The interface is the subset of the plyvel API used throughout the code base, so a `plyvel.DB` is a backend as
+    is. Keys and values are bytes. Iteration is in ascending key order and, like a snapshot, is not affected by
+    writes made while iterating.
+
+    Backends are selected by name with the `StorageBackend` config key, see `Open`.
+    """
+
+    LEVELDB = 'leveldb'
+    MEMORY = 'memory'
+
+    @staticmethod
+    def Open(path, name=None):
+        """
+        Open a database.
+
+        Args:
+            path (str): location of the database. Not used by backends that are not stored on disk.
+            name (str): (Optional) backend to use, `LEVELDB` or `MEMORY`. Defaults to `settings.STORAGE_BACKEND`.
+
+        Raises:
+            ValueError: if the backend is unknown.
+
+        Returns:
+            StorageBackend:
+        """
+        if name is None:
+            from neo.Settings import settings
+            name = settings.STORAGE_BACKEND
+
+        if name == StorageBackend.LEVELDB:
+            from neo.Storage.LevelDBBackend import LevelDBBackend
+            return LevelDBBackend.Open(path)
+
+        if name == StorageBackend.MEMORY:
+            from neo.Storage.MemoryBackend import MemoryBackend
+            return MemoryBackend()
+
+        raise ValueError("Unknown storage backend %s" % name)
+
+    @abstractmethod
+    def get(self, key, default=None):
+        pass
+
+    @abstractmethod
+    def put(self, key, value):
+        pass
+
+    @abstractmethod
+    def delete(self, key):
+        pass
+
+    @abstractmethod
+    def iterator(self, prefix=None, start=None, stop=None, include_key=True, include_value=True):
+        """
+        Iterate over the stored keys in ascending order.
+
+        Args:
+            prefix (bytes): (Optional) only iterate over keys starting with this prefix. Cannot be combined with
+                            `start` or `stop`.
+            start (bytes): (Optional) first key of the range to iterate over.
+            stop (bytes): (Optional) end of the range to iterate over, not included.
+            include_key (bool): yield keys.
+            include_value (bool): yield values.
+
+        Returns:
+            iterator: of (key, value) tuples, or of keys or values only if one of them is excluded.
+        """
+        pass
+
+    @abstractmethod
+    def snapshot(self):
+        """
+        Get a read only, consistent view of the database, offering `get` and `iterator`.
+        """
+        pass
+
+    @abstractmethod
+    def write_batch(self, transaction=False):
+        """
+        Get a write batch, offering `put`, `delete` and `write`.
+
+        Used as a context manager the batch is written when the context exits. If `transaction` is set, it is
+        discarded instead when the context exits with an exception.
+        """
+        pass
+
+    def compact_range(self, start=None, stop=None):
+        """
+        Compact the underlying storage for a key range, reclaiming the space of deleted and overwritten values.
+
+        Nothing to do for backends that do not need compactions.
+
+        Args:
+            start (bytes): (Optional) first key of the range.
+            stop (bytes): (Optional) end of the range.
+        """
+        pass
+
+    @abstractmethod
+    def close(self):
+        pass
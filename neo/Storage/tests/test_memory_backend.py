@@ -0,0 +1,114 @@
+from neo.Utils.NeoTestCase import NeoTestCase
+from neo.Storage.StorageBackend import StorageBackend
+from neo.Storage.MemoryBackend import MemoryBackend
+from neo.Implementations.Blockchains.LevelDB.LevelDBBlockchain import LevelDBBlockchain
+from neo.Implementations.Blockchains.LevelDB.tests import test_initial_db
+from neo.Core.Blockchain import Blockchain
+from neo.IO.Helper import Helper
+from neo.Settings import settings
+import binascii
+import os
+
+
+class MemoryBackendTest(NeoTestCase):
+
+    def setUp(self):
+        self.db = StorageBackend.Open(None, StorageBackend.MEMORY)
+        self.db.put(b'a3', b'3')
+        self.db.put(b'a1', b'1')
+        self.db.put(b'b1', b'1')
+
+    def test_open(self):
+        self.assertIsInstance(self.db, MemoryBackend)
+        self.assertIsInstance(self.db, StorageBackend)
+
+        with self.assertRaises(ValueError):
+            StorageBackend.Open(None, 'unknown')
+
+    def test_get_put_delete(self):
+        self.assertEqual(self.db.get(b'a1'), b'1')
+        self.assertIsNone(self.db.get(b'a2'))
+        self.assertEqual(self.db.get(b'a2', b'x'), b'x')
+
+        self.db.put(b'a1', bytearray(b'11'))
+        self.assertEqual(self.db.get(b'a1'), b'11')
+
+        self.db.delete(b'a1')
+        self.db.delete(b'a2')
+        self.assertIsNone(self.db.get(b'a1'))
+        self.assertEqual(len(self.db), 2)
+
+    def test_iterator(self):
+        self.assertEqual(list(self.db.iterator()), [(b'a1', b'1'), (b'a3', b'3'), (b'b1', b'1')])
+        self.assertEqual(list(self.db.iterator(prefix=b'a', include_value=False)), [b'a1', b'a3'])
+        self.assertEqual(list(self.db.iterator(prefix=b'b', include_key=False)), [b'1'])
+        self.assertEqual(list(self.db.iterator(prefix=b'c')), [])
+        self.assertEqual(list(self.db.iterator(start=b'a2', stop=b'b1')), [(b'a3', b'3')])
+        self.assertEqual(list(self.db.iterator(start=b'a3', include_key=False)), [b'3', b'1'])
+
+        # writes made while iterating do not show up
+        for key in self.db.iterator(include_value=False):
+            self.db.delete(key)
+            self.db.put(key + b'0', b'0')
+        self.assertEqual(list(self.db.iterator(include_value=False)), [b'a10', b'a30', b'b10'])
+
+    def test_snapshot(self):
+        snapshot = self.db.snapshot()
+        self.db.put(b'a2', b'2')
+        self.db.delete(b'a1')
+
+        self.assertEqual(snapshot.get(b'a1'), b'1')
+        self.assertIsNone(snapshot.get(b'a2'))
+        self.assertEqual(list(snapshot.iterator(prefix=b'a', include_value=False)), [b'a1', b'a3'])
+        self.assertEqual(list(self.db.iterator(prefix=b'a', include_value=False)), [b'a2', b'a3'])
+
+    def test_write_batch(self):
+        with self.db.write_batch() as wb:
+            wb.put(b'c1', b'1')
+            wb.delete(b'a1')
+            self.assertIsNone(self.db.get(b'c1'))
+        self.assertEqual(self.db.get(b'c1'), b'1')
+        self.assertIsNone(self.db.get(b'a1'))
+
+        # like plyvel, only transactional batches are discarded on an exception
+        with self.assertRaises(ValueError):
+            with self.db.write_batch(transaction=True) as wb:
+                wb.put(b'c2', b'2')
+                raise ValueError()
+        self.assertIsNone(self.db.get(b'c2'))
+
+        with self.assertRaises(ValueError):
+            with self.db.write_batch() as wb:
+                wb.put(b'c3', b'3')
+                raise ValueError()
+        self.assertEqual(self.db.get(b'c3'), b'3')
+
+
+class MemoryBlockchainTest(NeoTestCase):
+    CHAIN_PATH = os.path.join(settings.DATA_DIR_PATH, 'UnitTestMemoryChain')
+
+    @classmethod
+    def setUpClass(cls):
+        settings.setup_unittest_net()
+
+    def setUp(self):
+        Blockchain.DeregisterBlockchain()
+
+    def tearDown(self):
+        Blockchain.DeregisterBlockchain()
+
+    def test_persist(self):
+        chain = LevelDBBlockchain(self.CHAIN_PATH, backend=StorageBackend.MEMORY)
+        Blockchain.RegisterBlockchain(chain)
+        self.assertIsInstance(chain.DB, MemoryBackend)
+
+        block_one = Helper.AsSerializableWithType(binascii.unhexlify(test_initial_db.LevelDBTest.block_one_raw), 'neo.Core.Block.Block')
+        chain.AddBlock(block_one)
+        chain.PersistBlocks()
+
+        self.assertEqual(chain.Height, 1)
+        self.assertEqual(chain.GetBlockByHeight(1).Hash, block_one.Hash)
+        self.assertEqual(chain.GetReadView().Height, 1)
+
+        chain.Dispose()
+        self.assertFalse(os.path.exists(self.CHAIN_PATH))
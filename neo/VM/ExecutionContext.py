@@ -51,7 +51,7 @@ class ExecutionContext:
 
     def __init__(self, engine=None, script=None, rvcount=0):
         self.Script = script
-        self.__mstream = StreamManager.GetStream(self.Script)
+        self.__mstream = StreamManager.GetReader(self.Script)
         self.__OpReader = BinaryReader(self.__mstream)
         self._EvaluationStack = RandomAccessStack(name='Evaluation')
         self._AltStack = RandomAccessStack(name='Alt')
@@ -1193,6 +1193,9 @@ class Wallet:
         """
         success = False
 
+        # the item is signed as it is now, and its scripts are set from the signatures afterwards
+        context.Verifiable.ResetWireData()
+
         for hash in context.ScriptHashes:
 
             contract = self.GetContract(hash)
@@ -14,7 +14,7 @@ from json.decoder import JSONDecodeError
 from klein import Klein
 
 from neo.Settings import settings
-from neo.Core.Blockchain import Blockchain
+from neo.Core.Blockchain import Blockchain, PrunedDataError
 from neo.api.utils import json_response, cors_header
 from neo.Core.State.AccountState import AccountState
 from neo.Core.TX.Transaction import Transaction, TransactionOutput, \
@@ -101,7 +101,10 @@ class JsonRpcApi:
                 raise JsonRpcError.invalidRequest("Field 'method' is missing")
 
             params = body["params"] if "params" in body else None
-            result = self.json_rpc_method_handler(body["method"], params)
+
+            # serve the whole request from one snapshot of the chain, without waiting on block persistence
+            with Blockchain.ReadView():
+                result = self.json_rpc_method_handler(body["method"], params)
             return {
                 "jsonrpc": "2.0",
                 "id": request_id,
@@ -111,6 +114,9 @@ class JsonRpcApi:
         except JsonRpcError as e:
             return self.get_custom_error_payload(request_id, e.code, e.message)
 
+        except PrunedDataError as e:
+            return self.get_custom_error_payload(request_id, -100, str(e))
+
         except Exception as e:
             error = JsonRpcError.internalError(str(e))
             return self.get_custom_error_payload(request_id, error.code, error.message)
@@ -251,7 +257,10 @@ class JsonRpcApi:
             return contract.ToJson()
 
         elif method == "getrawmempool":
-            return list(map(lambda hash: "0x%s" % hash.decode('utf-8'), NodeLeader.Instance().MemPool.keys()))
+            mempool = NodeLeader.Instance().MemPool.ToJson()
+            if params and params[0]:
+                return mempool
+            return mempool['transactions']
 
         elif method == "getversion":
             return {
@@ -396,6 +396,23 @@ class JsonRpcApiTestCase(BlockchainFixtureTestCase):
                 self.assertEqual(entry[0:2], "0x")
                 self.assertEqual(len(entry), 66)
 
+    def test_get_raw_mempool_without_params(self):
+        req = {"jsonrpc": "2.0", "id": 2, "method": "getrawmempool"}
+        mock_req = mock_post_request(json.dumps(req).encode("utf-8"))
+        res = json.loads(self.app.home(mock_req))
+        self.assertNotIn('error', res)
+        self.assertIsInstance(res['result'], list)
+
+    def test_get_raw_mempool_verbose(self):
+        req = self._gen_post_rpc_req("getrawmempool", params=[True])
+        mock_req = mock_post_request(json.dumps(req).encode("utf-8"))
+        res = json.loads(self.app.home(mock_req))
+        mempool = res['result']
+
+        self.assertEqual(mempool['count'], len(mempool['transactions']))
+        self.assertEqual(mempool['count'] == 0, mempool['bytes'] == 0)
+        self.assertEqual(mempool['max_bytes'], settings.MEMPOOL_MAX_BYTES)
+
     def test_get_version(self):
         # TODO: what's the nonce? on testnet live server response it's always 771199013
         req = self._gen_post_rpc_req("getversion", params=[])
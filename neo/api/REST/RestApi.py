@@ -149,7 +149,7 @@ class RestApi:
     def get_by_tx(self, request, tx_hash):
         request.setHeader('Content-Type', 'application/json')
 
-        bc = Blockchain.Default()  # type: Blockchain
+        bc = Blockchain.Default().GetReadView()  # type: Blockchain
         notifications = []
         try:
             hash = UInt256.ParseString(tx_hash)
@@ -5,6 +5,8 @@ from neo.Core.Block import Block
 from neo.IO.MemoryStream import MemoryStream
 from neo.Implementations.Blockchains.LevelDB.LevelDBBlockchain import LevelDBBlockchain
 from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Implementations.Blockchains.LevelDB.DBSchema import DBSchema
+from neo.Implementations.Blockchains.LevelDB.HeaderIndex import HeaderIndex
 from neo.Settings import settings
 from neocore.IO.BinaryReader import BinaryReader
 from neocore.IO.BinaryWriter import BinaryWriter
@@ -71,7 +73,7 @@ def main():
     if args.notifications:
         store_notifications = True
 
-    header_hash_list = []
+    header_hash_list = HeaderIndex()
 
     with open(file_path, 'rb') as file_input:
 
@@ -153,7 +155,7 @@ def main():
     chain = Blockchain.Default()
 
     # reset header hash list
-    chain._db.delete(DBPrefix.IX_HeaderHashList)
+    chain.DB.delete(DBPrefix.IX_HeaderHashList)
 
     total = len(header_hash_list)
 
@@ -162,19 +164,15 @@ def main():
     print("storing header hash list...")
 
     while total - 2000 >= chain._stored_header_count:
-        ms = StreamManager.GetStream()
-        w = BinaryWriter(ms)
         headers_to_write = chain._header_index[chain._stored_header_count:chain._stored_header_count + 2000]
-        w.Write2000256List(headers_to_write)
-        out = ms.ToArray()
-        StreamManager.ReleaseStream(ms)
-        with chain._db.write_batch() as wb:
+        out = DBSchema.SerializeHeaderHashList(headers_to_write, chain.RawStorage)
+        with chain.DB.write_batch() as wb:
             wb.put(DBPrefix.IX_HeaderHashList + chain._stored_header_count.to_bytes(4, 'little'), out)
 
         chain._stored_header_count += 2000
 
     last_index = len(header_hash_list)
-    chain._db.put(DBPrefix.SYS_CurrentHeader, header_hash_list[-1] + last_index.to_bytes(4, 'little'))
+    chain.DB.put(DBPrefix.SYS_CurrentHeader, header_hash_list[-1] + last_index.to_bytes(4, 'little'))
 
     print("Imported %s blocks to %s " % (total_blocks, target_dir))
 
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+
+from neo.Settings import settings
+from neo.Implementations.Blockchains.LevelDB.DBSchema import DBSchema
+from neo.Implementations.Blockchains.LevelDB.DBPrefix import DBPrefix
+from neo.Implementations.Blockchains.LevelDB.OutputIndex import OutputIndex
+from neo.Implementations.Blockchains.LevelDB.AddressIndex import AddressIndex
+import argparse
+import os
+import shutil
+import plyvel
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a hex encoded chain database to the raw storage format")
+    parser.add_argument("-m", "--mainnet", action="store_true", default=False,
+                        help="use MainNet instead of the default TestNet")
+    parser.add_argument("-c", "--config", action="store", help="Use a specific config file")
+
+    # Where to store stuff
+    parser.add_argument("--datadir", action="store",
+                        help="Absolute path to use for database directories")
+
+    parser.add_argument("-o", "--output", action="store",
+                        help="Where to write the converted database. Defaults to the chain directory with a '.raw' suffix")
+
+    parser.add_argument("-r", "--replace", action="store_true", default=False,
+                        help="Replace the chain directory with the converted database. The original is kept with a '.hex' suffix")
+
+    parser.add_argument("-b", "--batchsize", action="store", type=int, default=10000,
+                        help="Number of records per write batch")
+
+    parser.add_argument("-i", "--index-outputs", action="store_true", default=False,
+                        help="Build the transaction output index of the chain in place instead of converting it")
+
+    parser.add_argument("-a", "--index-addresses", action="store_true", default=False,
+                        help="Rebuild the index of unspent outputs by address of the chain in place instead of converting it")
+
+    args = parser.parse_args()
+
+    if args.mainnet and args.config:
+        print("Cannot use both --config and --mainnet parameters, please use only one.")
+        exit(1)
+
+    # Setting the datadir must come before setting the network, else the wrong path is checked at net setup.
+    if args.datadir:
+        settings.set_data_dir(args.datadir)
+
+    # Setup depending on command line arguments. By default, the testnet settings are already loaded.
+    if args.config:
+        settings.setup(args.config)
+    elif args.mainnet:
+        settings.setup_mainnet()
+
+    source_path = settings.chain_leveldb_path
+    target_path = args.output if args.output else source_path + '.raw'
+
+    if not os.path.isdir(source_path):
+        print("Could not find chain database at %s" % source_path)
+        exit(1)
+
+    if os.path.exists(target_path):
+        print("Output path %s already exists, please remove it first" % target_path)
+        exit(1)
+
+    try:
+        source = plyvel.DB(source_path)
+    except Exception as e:
+        print("Could not open %s, make sure no other process is using it: %s" % (source_path, e))
+        exit(1)
+
+    version = source.get(DBPrefix.SYS_Version)
+
+    if args.index_outputs or args.index_addresses:
+        if version not in DBSchema.VERSIONS:
+            print("Unsupported chain database schema %s" % version)
+            source.close()
+            exit(1)
+
+        def index_progress(count):
+            print("\rIndexed %s transactions" % count, end='', flush=True)
+
+        if args.index_outputs:
+            print("Indexing transaction outputs of %s" % source_path)
+            total = OutputIndex.Backfill(source, version == DBSchema.RAW, batch_size=args.batchsize, progress=index_progress)
+            print("")
+            print("Indexed the outputs of %s transactions" % total)
+
+        if args.index_addresses:
+            print("Indexing unspent outputs by address of %s" % source_path)
+            total = AddressIndex.Rebuild(source, version == DBSchema.RAW, batch_size=args.batchsize, progress=index_progress)
+            print("")
+            print("Indexed %s unspent outputs, set AddressIndex in the config to keep the index up to date" % total)
+
+        source.close()
+        return
+
+    if version == DBSchema.RAW:
+        print("Chain database at %s already uses the raw storage format" % source_path)
+        source.close()
+        return
+
+    target = plyvel.DB(target_path, create_if_missing=True, error_if_exists=True)
+
+    def progress(count):
+        print("\rConverted %s records" % count, end='', flush=True)
+
+    try:
+        print("Converting %s to %s" % (source_path, target_path))
+        total = DBSchema.Migrate(source, target, batch_size=args.batchsize, progress=progress)
+        print("")
+    except Exception as e:
+        print("\nMigration failed: %s" % e)
+        target.close()
+        source.close()
+        shutil.rmtree(target_path)
+        exit(1)
+
+    target.close()
+    source.close()
+
+    if args.replace:
+        backup_path = source_path + '.hex'
+        os.rename(source_path, backup_path)
+        os.rename(target_path, source_path)
+        print("Migrated %s records. The original database was moved to %s" % (total, backup_path))
+    else:
+        print("Migrated %s records to %s" % (total, target_path))
+
+
+if __name__ == "__main__":
+    main()
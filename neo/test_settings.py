@@ -1,6 +1,9 @@
 from neo.Utils.NeoTestCase import NeoTestCase
-from neo.Settings import SettingsHolder, ROOT_INSTALL_PATH
+from neo.Settings import SettingsHolder, ROOT_INSTALL_PATH, FILENAME_SETTINGS_UNITTEST_NET
+import json
+import logging
 import os
+import tempfile
 
 
 class SettingsTestCase(NeoTestCase):
@@ -43,10 +46,25 @@ class SettingsTestCase(NeoTestCase):
 
         self.assertEqual(_settings.chain_leveldb_path, os.path.abspath(os.path.join(ROOT_INSTALL_PATH, _settings.LEVELDB_PATH)))
         self.assertEqual(_settings.notification_leveldb_path, os.path.abspath(os.path.join(ROOT_INSTALL_PATH, _settings.NOTIFICATION_DB_PATH)))
-        self.assertEqual(_settings.debug_storage_leveldb_path, os.path.abspath(os.path.join(ROOT_INSTALL_PATH, _settings.DEBUG_STORAGE_PATH)))
 
         _settings.DATA_DIR_PATH = '/tmp/whatever'
 
         self.assertEqual(_settings.chain_leveldb_path, os.path.abspath(os.path.join('/tmp/whatever', _settings.LEVELDB_PATH)))
         self.assertEqual(_settings.notification_leveldb_path, os.path.abspath(os.path.join('/tmp/whatever', _settings.NOTIFICATION_DB_PATH)))
-        self.assertEqual(_settings.debug_storage_leveldb_path, os.path.abspath(os.path.join('/tmp/whatever', _settings.DEBUG_STORAGE_PATH)))
+
+    def test_deprecated_debug_storage_path(self):
+        _settings = SettingsHolder()
+
+        with open(FILENAME_SETTINGS_UNITTEST_NET) as data_file:
+            data = json.load(data_file)
+        data['ApplicationConfiguration']['DebugStoragePath'] = 'Chains/debugstorage'
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config_file = os.path.join(tmpdir, 'protocol.json')
+            with open(config_file, 'w') as data_file:
+                json.dump(data, data_file)
+
+            with self.assertLogHandler('generic', logging.WARNING) as log:
+                _settings.setup(config_file)
+
+        self.assertIn("DebugStoragePath is deprecated", log.output[0])